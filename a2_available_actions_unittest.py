@@ -0,0 +1,151 @@
+"""
+Unittests for the cached available actions of the Characters in A2.
+
+These tests check that available_actions always matches the skills a
+Character can afford, that it's shared instead of built again, and that
+clones and copies keep it.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import ManualPlaystyle
+from a2_battle_queue import BattleQueue
+from a2_characters import Character
+from a2_skills import MageAttack, RogueSpecial
+
+
+class Brawler(Character):
+    """
+    A Character that sets its skills in __init__, like A2's original
+    Characters did.
+    """
+    def __init__(self, name, battle_queue, playstyle):
+        super().__init__(name, battle_queue, playstyle)
+        self._character_type = 'brawler'
+        self._skills['A'] = MageAttack()
+        self._skills['S'] = RogueSpecial()
+
+
+def find_available_actions(character):
+    """
+    Return the actions that character can afford, found skill by skill.
+    """
+    return [action for action in ['A', 'S']
+            if character.get_skill(action).get_sp_cost() <= character.get_sp()]
+
+
+def set_up_character(key):
+    """
+    Return a new character of class key, as keyed in CHARACTER_CLASSES,
+    fighting a new Mage.
+    """
+    battle_queue = BattleQueue()
+    playstyle = ManualPlaystyle(battle_queue)
+    character = CHARACTER_CLASSES[key]("P1", battle_queue, playstyle)
+    character.enemy = CHARACTER_CLASSES['m']("P2", battle_queue, playstyle)
+    character.enemy.enemy = character
+    battle_queue.add(character)
+    battle_queue.add(character.enemy)
+    return character
+
+
+class AvailableActionsUnitTests(unittest.TestCase):
+    def test_matches_skill_costs(self):
+        """
+        Test to make sure available_actions, get_available_actions,
+        is_valid_action and is_exhausted match the skills a character can
+        afford at any SP, whether it's set directly or spent.
+        """
+        rng = random.Random(48)
+        for key in 'mrvs':
+            character = set_up_character(key)
+            for _ in range(100):
+                if rng.random() < 0.5:
+                    character.set_sp(rng.randint(0, 40))
+                else:
+                    character.reduce_sp(rng.randint(0, 10))
+                expected = find_available_actions(character)
+                self.assertEqual(tuple(expected), character.available_actions,
+                                 "available_actions on {}".format(character))
+                self.assertEqual(expected, character.get_available_actions())
+                for action in ['A', 'S', 'X']:
+                    self.assertEqual(action in expected,
+                                     character.is_valid_action(action))
+                self.assertEqual(expected == [], character.is_exhausted())
+
+    def test_actions_are_shared(self):
+        """
+        Test to make sure characters of a class that can afford the same
+        actions share available_actions, and that get_available_actions
+        returns a new list every time.
+        """
+        for key in 'mrvs':
+            character = set_up_character(key)
+            other = set_up_character(key)
+            self.assertIs(character.available_actions, other.available_actions)
+            other.set_sp(1)
+            other.set_sp(100)
+            self.assertIs(character.available_actions, other.available_actions)
+            actions = character.get_available_actions()
+            actions.append('X')
+            self.assertEqual(('A', 'S'), character.available_actions,
+                             "Changing the returned list shouldn't change "
+                             "the character.")
+            self.assertIsNot(actions, character.get_available_actions())
+
+    def test_clones_and_copies_keep_actions(self):
+        """
+        Test to make sure clones and copies can afford the same actions as
+        the character they were made from.
+        """
+        for key in 'mrvs':
+            for sp in [0, 3, 10, 40, 100]:
+                character = set_up_character(key)
+                character.set_sp(sp)
+                for other in [character.clone(BattleQueue()),
+                              character.copy(BattleQueue())]:
+                    self.assertIs(character.available_actions,
+                                  other.available_actions)
+                    self.assertEqual(character.is_exhausted(),
+                                     other.is_exhausted())
+
+    def test_subclass_sets_skills_in_init(self):
+        """
+        Test to make sure a Character subclass that sets its skills in
+        __init__ can be made, and its available actions match those skills.
+        """
+        class Blank(Character):
+            pass
+
+        battle_queue = BattleQueue()
+        playstyle = ManualPlaystyle(battle_queue)
+        brawler = Brawler("P1", battle_queue, playstyle)
+        brawler.enemy = CHARACTER_CLASSES['m']("P2", battle_queue, playstyle)
+        brawler.enemy.enemy = brawler
+        self.assertEqual(Character._skills, {'A': None, 'S': None},
+                         "Brawler changed the skills of Character")
+        for sp in [100, 10, 7, 4, 0]:
+            brawler.set_sp(sp)
+            expected = find_available_actions(brawler)
+            self.assertEqual(tuple(expected), brawler.available_actions,
+                             "available_actions at {} SP".format(sp))
+            self.assertEqual(expected, brawler.get_available_actions())
+            self.assertEqual(not expected, brawler.is_exhausted())
+            for action in ['A', 'S']:
+                self.assertEqual(action in expected,
+                                 brawler.is_valid_action(action))
+        brawler.set_sp(7)
+        clone = brawler.clone(BattleQueue())
+        clone.set_sp(100)
+        self.assertEqual(('A', 'S'), clone.available_actions,
+                         "The clone's actions don't match its skills")
+        self.assertEqual(('A',), brawler.available_actions,
+                         "The clone changed the actions of brawler")
+        self.assertEqual((), Blank("P3", battle_queue,
+                                   playstyle).available_actions,
+                         "A Character with no skills has actions")
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -8,13 +8,71 @@ BattleQueue has been completed for you, and the class header for
 RestrictedBattleQueue has been provided. You must implement
 RestrictedBattleQueue and document it accordingly.
 """
-from typing import Union, List
+from collections import deque
+from itertools import groupby
+from typing import Callable, Deque, Dict, Iterable, List, Union, Tuple
+from weakref import WeakKeyDictionary
+from adts import PersistentQueue
+
+# The structure of each skill decision tree fingerprinted so far, so it's
+# only found once per tree.
+_TREE_STRUCTURES = WeakKeyDictionary()
+
+
+def _get_tree_structure(tree: Union[None, 'SkillDecisionTree']) \
+        -> Union[None, Tuple]:
+    """
+    Return tree's structure, as given by SkillDecisionTree.get_structure, or
+    None if there's no tree.
+    """
+    if tree is None:
+        return None
+    if tree not in _TREE_STRUCTURES:
+        _TREE_STRUCTURES[tree] = tree.get_structure()
+    return _TREE_STRUCTURES[tree]
+
+
+def _get_fingerprint(characters: List['Character'],
+                     runs: Iterable[Tuple['Character', bool, int]]) -> Tuple:
+    """
+    Return the fingerprint of a game between characters whose entries are
+    runs, as described in BattleQueue.fingerprint.
+
+    A Sorcerer's skill decision tree is told apart by its structure, so
+    equal trees built separately give the same fingerprint.
+    """
+    indexes = {character: i for i, character in enumerate(characters)}
+    return tuple(None if character is None else
+                 (type(character).__name__, character.get_hp(),
+                  character.get_sp(),
+                  _get_tree_structure(getattr(character, 'tree', None)))
+                 for character in characters) + \
+        (tuple((indexes[character], can_add, count)
+               for character, can_add, count in runs),)
 
 
 class BattleQueue:
     """
     A class representing a BattleQueue.
+
+    The entries are kept in a deque of runs of the same character, so taking
+    them off the front stays quick however long the BattleQueue grows, and
+    copying it only costs as much as its number of runs. Every entry of a
+    BattleQueue is able to add.
+
+    fingerprint is cached until this BattleQueue or one of its players
+    changes.
+
+    _runs - the runs of entries in this BattleQueue, from front to back, as
+            (character, able to add, number of entries) tuples
+    _version - the number of times the entries of this BattleQueue have
+               changed
+    _results - the cached results of fingerprint, each with the version they
+               were found at, as returned by _get_version
     """
+    _runs: Deque[Tuple['Character', bool, int]]
+    _version: int
+    _results: Dict[str, Tuple[Tuple, object]]
 
     def __init__(self) -> None:
         """
@@ -24,9 +82,100 @@ class BattleQueue:
         >>> bq.is_empty()
         True
         """
-        self._content = []
+        self._runs = deque()
         self._p1 = None
         self._p2 = None
+        self._version = 0
+        self._results = {}
+
+    def _get_version(self) -> Tuple:
+        """
+        Return the versions of the entries and both players of this
+        BattleQueue. They only change when the result of fingerprint may have
+        changed.
+        """
+        if self._p1 is None:
+            return self._version, None, None
+        return (self._version, self._p1.get_version(),
+                self._p2.get_version())
+
+    def _get_cached(self, name: str, find: Callable[[], object]) -> object:
+        """
+        Return the result that find returns for this BattleQueue, cached
+        under name until the version of this BattleQueue changes.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq._get_cached('test', lambda: c.get_hp())
+        100
+        >>> bq._get_cached('test', lambda: 0)
+        100
+        >>> c2.set_hp(50)
+        >>> bq._get_cached('test', lambda: 0)
+        0
+        """
+        version = self._get_version()
+        if name in self._results and self._results[name][0] == version:
+            return self._results[name][1]
+        result = find()
+        # find may have cleaned the queue, which changes its version.
+        self._results[name] = (self._get_version(), result)
+        return result
+
+    @property
+    def _content(self) -> List['Character']:
+        """
+        Return the character of each entry in this BattleQueue, from front to
+        back.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.remove().special_attack()
+        >>> bq._content
+        [r2 (Rogue): 90/100, r (Rogue): 100/90, r (Rogue): 100/90]
+        >>> list(bq._runs)
+        [(r2 (Rogue): 90/100, True, 1), (r (Rogue): 100/90, True, 2)]
+        """
+        return [character for character, _, count in self._runs
+                for _ in range(count)]
+
+    def _push(self, character: 'Character', can_add: bool = True) -> None:
+        """
+        Add an entry of character, able to add if can_add, to the back of
+        this BattleQueue, extending the last run if it matches.
+        """
+        if self._runs and self._runs[-1][0] == character and \
+                self._runs[-1][1] == can_add:
+            self._runs[-1] = (character, can_add, self._runs[-1][2] + 1)
+        else:
+            self._runs.append((character, can_add, 1))
+        self._version += 1
+
+    def _pop(self) -> Tuple['Character', bool]:
+        """
+        Remove the entry at the front of this BattleQueue and return its
+        character and whether it was able to add.
+        """
+        character, can_add, count = self._runs[0]
+        if count == 1:
+            self._runs.popleft()
+        else:
+            self._runs[0] = (character, can_add, count - 1)
+        self._version += 1
+        return character, can_add
 
     def _clean_queue(self) -> None:
         """
@@ -45,13 +194,19 @@ class BattleQueue:
         >>> bq.is_empty()
         False
         """
-        while self._content and self._content[0].get_available_actions() == []:
-            self._content.pop(0)
+        # A run is all one character, so it can be dropped at once.
+        while self._runs and not self._runs[0][0].available_actions:
+            self._runs.popleft()
+            self._version += 1
 
     def add(self, character: 'Character') -> None:
         """
         Add character to this BattleQueue.
 
+        A character that can't afford any of its skills isn't added, since
+        its entry could only be skipped, and it isn't added later if set_sp
+        raises its SP again, as described in purge.
+
         >>> bq = BattleQueue()
         >>> from a2_characters import Rogue
         >>> from a2_playstyle import ManualPlaystyle
@@ -62,13 +217,20 @@ class BattleQueue:
         >>> bq.add(c)
         >>> bq.is_empty()
         False
+        >>> c2.set_sp(2)
+        >>> bq.add(c2)
+        >>> c2.set_sp(100)
+        >>> bq
+        Sophia (Rogue): 100/100
         """
-        self._content.append(character)
-
         if not self._p1:
             self._p1 = character
             self._p2 = character.enemy
 
+        # A character that can't act would only be skipped at the front.
+        if character.available_actions:
+            self._push(character)
+
     def remove(self) -> 'Character':
         """
         Remove and return the character at the front of this BattleQueue.
@@ -88,7 +250,68 @@ class BattleQueue:
         """
         self._clean_queue()
 
-        return self._content.pop(0)
+        return self._pop()[0]
+
+    def purge(self, character: 'Character') -> None:
+        """
+        Remove every entry of character from this BattleQueue at once, once
+        it can't afford any of its skills, and join the runs that were on
+        either side of its entries. The other entries keep their order.
+
+        Characters call this when their SP runs out, so later operations and
+        copies never have to skip their entries. Raising a character's SP
+        again with set_sp doesn't bring its entries back.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> for character in [c, c2, c, c2, c]:
+        ...     bq.add(character)
+        >>> c2.set_sp(2)
+        >>> bq
+        r (Rogue): 100/100 -> r (Rogue): 100/100 -> r (Rogue): 100/100
+        >>> list(bq._runs)
+        [(r (Rogue): 100/100, True, 3)]
+        """
+        if all(run[0] is not character for run in self._runs):
+            return
+        runs = deque()
+        for run in self._runs:
+            if run[0] is character:
+                continue
+            if runs and runs[-1][:2] == run[:2]:
+                runs[-1] = (run[0], run[1], runs[-1][2] + run[2])
+            else:
+                runs.append(run)
+        self._runs = runs
+        self._version += 1
+
+    def clear(self) -> None:
+        """
+        Remove every character from this BattleQueue at once, leaving it as
+        removing them one at a time would.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.clear()
+        >>> bq.is_empty()
+        True
+        >>> bq.peek() is c
+        True
+        """
+        self._runs = deque()
+        self._version += 1
 
     def is_empty(self) -> bool:
         """
@@ -101,7 +324,7 @@ class BattleQueue:
         """
         self._clean_queue()
 
-        return self._content == []
+        return not self._runs
 
     def peek(self) -> 'Character':
         """
@@ -126,8 +349,8 @@ class BattleQueue:
         """
         self._clean_queue()
 
-        if self._content:
-            return self._content[0]
+        if self._runs:
+            return self._runs[0][0]
 
         return self._p1
 
@@ -155,6 +378,9 @@ class BattleQueue:
         >>> bq.add(c)
         >>> bq.is_over()
         False
+        >>> c2.set_hp(0)
+        >>> bq.is_over()
+        True
         """
         if self.is_empty():
             return True
@@ -178,6 +404,9 @@ class BattleQueue:
         >>> c2.enemy = c
         >>> bq.add(c)
         >>> bq.get_winner()
+        >>> c2.set_hp(0)
+        >>> bq.get_winner()
+        Sophia (Rogue): 100/100
         """
         if not self.is_over():
             return None
@@ -189,6 +418,24 @@ class BattleQueue:
 
         return None
 
+    def same_side(self, first: 'Character', second: 'Character') -> bool:
+        """
+        Return whether first and second fight on the same side of the game in
+        this BattleQueue, so that a win for one is a win for the other. In a
+        BattleQueue, that's only when they're the same character.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> bq.same_side(c, c)
+        True
+        >>> bq.same_side(c, c2)
+        False
+        """
+        return first == second
+
     def copy(self) -> 'BattleQueue':
         """
         Return a copy of this BattleQueue. The copy contains copies of the
@@ -212,23 +459,34 @@ class BattleQueue:
         r (Rogue): 100/100 -> r2 (Rogue): 100/100
         """
         new_battle_queue = BattleQueue()
+        self._copy_into(new_battle_queue)
+        return new_battle_queue
+
+    def _copy_into(self, new_battle_queue: 'BattleQueue') \
+            -> Dict['Character', 'Character']:
+        """
+        Fill the empty new_battle_queue with copies of this BattleQueue's
+        players, in the same order, and return a dict mapping each player to
+        its copy.
 
-        p1_copy = self._p1.copy(new_battle_queue)
-        p2_copy = self._p2.copy(new_battle_queue)
+        The order is built in one pass without calling add, since the
+        entries are already known to be valid. The players are cloned, so
+        their playstyles are only copied if the copies use them.
+        """
+        if self._p1 is None:
+            return {}
+        p1_copy = self._p1.clone(new_battle_queue)
+        p2_copy = self._p2.clone(new_battle_queue)
         p1_copy.enemy = p2_copy
         p2_copy.enemy = p1_copy
 
-        new_battle_queue.add(p1_copy)
-        if not new_battle_queue.is_empty():
-            new_battle_queue.remove()
-
-        for character in self._content:
-            if character == self._p1:
-                new_battle_queue.add(p1_copy)
-            else:
-                new_battle_queue.add(p2_copy)
-
-        return new_battle_queue
+        copies = {self._p1: p1_copy, self._p2: p2_copy}
+        new_battle_queue._p1 = p1_copy
+        new_battle_queue._p2 = p2_copy
+        new_battle_queue._runs = deque(
+            (copies[character], can_add, count)
+            for character, can_add, count in self._runs)
+        return copies
 
     def __repr__(self) -> str:
         """
@@ -248,13 +506,162 @@ class BattleQueue:
         """
         return " -> ".join([repr(character) for character in self._content])
 
+    def fingerprint(self) -> Tuple:
+        """
+        Return a hashable summary of the game in this BattleQueue: the class,
+        HP, SP and skill decision tree (None for all but a Sorcerer) of both
+        players, with the player at the front first, followed by the runs of
+        entries of this BattleQueue as (player, able to add, number of
+        entries) tuples, where 0 stands for the player at the front and 1 for
+        the other.
+
+        Unlike snapshot, names and which player was added first are left out,
+        so the same position reached in different games, or with the players
+        the other way round, has the same fingerprint. It is built from the
+        runs of entries and cached until this BattleQueue or one of its
+        players changes.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Mage("m", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.remove().special_attack()
+        >>> bq.fingerprint()  # doctest: +NORMALIZE_WHITESPACE
+        (('Mage', 88, 100, None), ('Rogue', 100, 90, None),
+         ((0, True, 1), (1, True, 2)))
+        """
+        return self._get_cached('fingerprint', self._find_fingerprint)
+
+    def _find_fingerprint(self) -> Tuple:
+        """
+        Return the fingerprint of this BattleQueue, as described in
+        fingerprint, without using the cache.
+        """
+        self._clean_queue()
+        players = [self._p1, self._p2]
+        if self._runs and self._runs[0][0] is self._p2:
+            players.reverse()
+        return _get_fingerprint(players, self._runs)
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Return whether this BattleQueue and other are the same kind of
+        BattleQueue holding the same game, as described in fingerprint.
+
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> bqs = [BattleQueue(), BattleQueue()]
+        >>> for bq, names in zip(bqs, [("r", "m"), ("r2", "m2")]):
+        ...     c = Rogue(names[0], bq, ManualPlaystyle(bq))
+        ...     c2 = Mage(names[1], bq, ManualPlaystyle(bq))
+        ...     c.enemy = c2
+        ...     c2.enemy = c
+        ...     bq.add(c)
+        ...     bq.add(c2)
+        >>> bqs[0] == bqs[1]
+        True
+        >>> bqs[0].remove().attack()
+        >>> bqs[0] == bqs[1]
+        False
+        >>> bqs[0] == bqs[0].copy()
+        True
+        """
+        return type(self) is type(other) and \
+            self.fingerprint() == other.fingerprint()
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of the game in this BattleQueue, as described in
+        fingerprint. The hash changes as the game goes on, so a BattleQueue
+        shouldn't be changed while it is in a set or a dict.
+
+        >>> bq = BattleQueue()
+        >>> hash(bq) == hash(BattleQueue())
+        True
+        """
+        return hash(self.fingerprint())
+
+    def snapshot(self) -> Tuple:
+        """
+        Return the state of the game in this BattleQueue as plain data: the
+        class, name, HP and SP of both players (None for a player that hasn't
+        been added yet) followed by the order of this BattleQueue, where 0
+        stands for the first player and 1 for the second.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> c.attack()
+        >>> bq.snapshot()
+        (('Rogue', 'r', 100, 97), ('Rogue', 'r2', 95, 100), (0, 1, 0))
+        """
+        players = tuple(None if player is None else
+                        (type(player).__name__, player.get_name(),
+                         player.get_hp(), player.get_sp())
+                        for player in [self._p1, self._p2])
+        return players + (tuple(0 if character == self._p1 else 1
+                                for character in self._content),)
+
+    def restore(self, snapshot: Tuple) -> None:
+        """
+        Set the players and order of this BattleQueue to match snapshot, which
+        was returned by snapshot() on a BattleQueue with the same two players,
+        in either order.
+
+        >>> bq = BattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.restore((('Rogue', 'r2', 28, 100), ('Rogue', 'r', 40, 12),
+        ...             (0, 1, 1)))
+        >>> bq
+        r2 (Rogue): 28/100 -> r (Rogue): 40/12 -> r (Rogue): 40/12
+        >>> bq.peek() == c2
+        True
+        """
+        players = [self._p1, self._p2]
+        if (type(self._p1).__name__, self._p1.get_name()) != snapshot[0][:2]:
+            players.reverse()
+        self._p1, self._p2 = players
+        for player, (_, _, hp, sp) in zip(players, snapshot[:2]):
+            player.set_hp(hp)
+            player.set_sp(sp)
+        self._runs = deque()
+        self._version += 1
+        for i in snapshot[2]:
+            self._push(players[i])
+
 
 class RestrictedBattleQueue(BattleQueue):
     """
     A class representing a RestrictedBattleQueue.
 
     able_to_add - a list with information whther a character is able to add
-                  himself or its enemy to a RestrictedBattleQueue
+                  himself or its enemy to a RestrictedBattleQueue, read from
+                  and written to the runs of entries
+    _entries - the number of entries of each character in this
+               RestrictedBattleQueue
+    _addable - the number of entries of each character in this
+               RestrictedBattleQueue that are able to add
+    _dead - the number of entries of each character, counted from the front,
+            that were added or purged while it couldn't afford any of its
+            skills, so they are skipped even if its SP is raised again
 
     Rules for a RestrictedBattleQueue:
     - The first time each character is added to the RestrictedBattleQueue,
@@ -287,7 +694,9 @@ class RestrictedBattleQueue(BattleQueue):
       Character order: A -> B -> A -> A
       Able to add:     Y    Y    N    Y
     """
-    able_to_add: List[bool]
+    _entries: Dict['Character', int]
+    _addable: Dict['Character', int]
+    _dead: Dict['Character', int]
 
     def __init__(self) -> None:
         """
@@ -309,10 +718,10 @@ class RestrictedBattleQueue(BattleQueue):
         >>> s.special_attack()
         >>> bq
         S (Sorcerer): 100/80 -> V (Vampire): 78/100 -> S (Sorcerer): 100/80
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True, True, True]
         >>> bq.add(s)
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True, True, True, False]
         >>> bq.remove()
         S (Sorcerer): 100/80
@@ -321,11 +730,82 @@ class RestrictedBattleQueue(BattleQueue):
         >>> v.attack()
         >>> bq
         V (Vampire): 88/85 -> S (Sorcerer): 90/80 -> S (Sorcerer): 90/80 -> V (Vampire): 88/85
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True, True, False, True]
         """
         super().__init__()
-        self.able_to_add = []
+        self._entries = {}
+        self._addable = {}
+        self._dead = {}
+
+    def _count(self, character: 'Character', can_add: bool,
+               change: int) -> None:
+        """
+        Change the counts of character's entries, and of its entries that
+        are able to add if can_add, by change.
+        """
+        self._entries[character] = self._entries.get(character, 0) + change
+        if can_add:
+            self._addable[character] = \
+                self._addable.get(character, 0) + change
+
+    def _recount(self) -> None:
+        """
+        Count the entries of each character in this RestrictedBattleQueue
+        again, after its content or able_to_add was replaced.
+        """
+        self._entries = {}
+        self._addable = {}
+        for character, can_add, count in self._runs:
+            self._count(character, can_add, count)
+
+    @property
+    def able_to_add(self) -> List[bool]:
+        """
+        Return whether each entry in this RestrictedBattleQueue is able to
+        add, from front to back.
+
+        >>> bq = RestrictedBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.add(c2)
+        >>> bq.able_to_add
+        [True, True, False]
+        """
+        return [can_add for _, can_add, count in self._runs
+                for _ in range(count)]
+
+    @able_to_add.setter
+    def able_to_add(self, able_to_add: List[bool]) -> None:
+        """
+        Set whether each entry in this RestrictedBattleQueue is able to add,
+        from front to back, to able_to_add.
+
+        >>> bq = RestrictedBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.able_to_add = [True, False]
+        >>> list(bq._runs)
+        [(r (Rogue): 100/100, True, 1), (r2 (Rogue): 100/100, False, 1)]
+        """
+        characters = self._content
+        self._runs = deque()
+        self._version += 1
+        for character, can_add in zip(characters, able_to_add):
+            self._push(character, can_add)
+        self._recount()
 
     def _clean_queue(self) -> None:
         """
@@ -344,7 +824,7 @@ class RestrictedBattleQueue(BattleQueue):
         >>> bq.add(c)
         >>> bq
         Sophia (Rogue): 100/100
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True]
         >>> bq.remove()
         Sophia (Rogue): 100/100
@@ -352,17 +832,89 @@ class RestrictedBattleQueue(BattleQueue):
         True
         >>> bq
         <BLANKLINE>
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         []
         """
-        while self._content and self._content[0].get_available_actions() == []:
-            self._content.pop(0)
-            self.able_to_add.pop(0)
+        while self._runs:
+            character, can_add, count = self._runs[0]
+            if not character.available_actions:
+                skipped = count
+            elif self._dead and character in self._dead:
+                skipped = min(count, self._dead[character])
+            else:
+                return
+            if skipped == count:
+                self._runs.popleft()
+            else:
+                self._runs[0] = (character, can_add, count - skipped)
+            self._count(character, can_add, -skipped)
+            self._bury(character, -skipped)
+            self._version += 1
+
+    def _bury(self, character: 'Character', change: int) -> None:
+        """
+        Change the number of dead entries of character by change, never
+        leaving it below 0.
+        """
+        dead = max(self._dead.get(character, 0) + change, 0)
+        if dead:
+            self._dead[character] = dead
+        else:
+            self._dead.pop(character, None)
+
+    def purge(self, character: 'Character') -> None:
+        """
+        Make every entry of character, which can't afford any of its skills,
+        dead for good, like BattleQueue.purge: they are skipped when they
+        reach the front even if set_sp raises its SP again.
+
+        Whether an entry is able to add depends on the entry at the front
+        when it's added, even one that can't act, and on how many entries its
+        character has, so the dead entries are kept in place, and still shown,
+        until _clean_queue skips them.
+
+        Overrides the super
+
+        >>> bq = RestrictedBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> c2.set_sp(2)
+        >>> bq
+        r (Rogue): 100/100 -> r2 (Rogue): 100/2
+        >>> c2.set_sp(100)
+        >>> bq.remove()
+        r (Rogue): 100/100
+        >>> bq.is_empty()
+        True
+        """
+        entries = self._entries.get(character, 0)
+        self._bury(character, entries - self._dead.get(character, 0))
+
+    def _append(self, character: 'Character', can_add: bool) -> None:
+        """
+        Add an entry of character, able to add if can_add, to the back of
+        this RestrictedBattleQueue, dead for good if character can't afford
+        any of its skills.
+        """
+        self._push(character, can_add)
+        self._count(character, can_add, 1)
+        if not character.available_actions:
+            self._bury(character, 1)
 
     def add(self, character: 'Character') -> None:
         """
         Add character to this BattleQueue.
 
+        A character that can't afford any of its skills is still added, since
+        its entry decides what later entries are able to add when it reaches
+        the front, but the entry is dead for good, as described in purge.
+
         Overrides the super
 
         >>> bq = RestrictedBattleQueue()
@@ -378,19 +930,17 @@ class RestrictedBattleQueue(BattleQueue):
         >>> bq.add(c)
         >>> bq
         Sophia (Rogue): 100/100 -> Sophia (Rogue): 100/100 -> Alex (Mage): 100/100 -> Sophia (Rogue): 100/100
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True, True, True, False]
-        >>> bq._content.pop(0)
+        >>> bq.remove()
         Sophia (Rogue): 100/100
-        >>> bq.able_to_add.pop(0)
-        True
         >>> bq
         Sophia (Rogue): 100/100 -> Alex (Mage): 100/100 -> Sophia (Rogue): 100/100
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True, True, False]
         >>> bq.add(c)
         >>> bq.add(c)
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True, True, False, True, False]
         """
         if not self._p1:
@@ -398,34 +948,24 @@ class RestrictedBattleQueue(BattleQueue):
             self._p2 = character.enemy
 
         # first time adding
-        # if len(self.able_to_add) <= 1 and character not in self._content:
-        if character not in self._content:
-            self._content.append(character)
-            self.able_to_add.append(True)
+        if not self._entries.get(character, 0):
+            self._append(character, True)
             return
 
+        front, front_can_add, _ = self._runs[0]
         # character can't add
-        if not self.able_to_add[0]:
+        if not front_can_add:
             return
 
         # caster adding the enemy -- enemy will not be able to add
-        if self._content[0] != character and self.able_to_add[0]:
-            self._content.append(character)
-            self.able_to_add.append(False)
+        if front != character and front_can_add:
+            self._append(character, False)
             return
 
         # if count character is 2 and they can both add the next one can't
-        if self._content[0] == character and self.able_to_add[0]:
-            counter = 0
-            for i in range(len(self._content)):
-                if self._content[i] == character \
-                        and self.able_to_add[i] is True:
-                    counter += 1
-            self._content.append(character)
-            if counter < 2:
-                self.able_to_add.append(True)
-            else:
-                self.able_to_add.append(False)
+        if front == character and front_can_add:
+            can_add = self._addable.get(character, 0) < 2
+            self._append(character, can_add)
             return
 
     def get_winner(self) -> Union['Character', None]:
@@ -433,49 +973,37 @@ class RestrictedBattleQueue(BattleQueue):
         Return the winner of the game being carried out in this BattleQueue
         if the game is over. Otherwise, return None.
 
+        A player only wins if it has HP left and is still in this
+        RestrictedBattleQueue, which the entry counts tell without looking
+        through the queue.
+
         Overrides the super
 
         >>> bq = RestrictedBattleQueue()
         >>> from a2_characters import Rogue
         >>> from a2_playstyle import ManualPlaystyle
         >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
-        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Alex", bq, ManualPlaystyle(bq))
         >>> c.enemy = c2
         >>> c2.enemy = c
         >>> bq.add(c)
         >>> bq.get_winner()
+        >>> c2.set_hp(0)
+        >>> bq.get_winner()
+        Sophia (Rogue): 100/100
+        >>> c.set_hp(0)
+        >>> c2.set_hp(100)
+        >>> print(bq.get_winner())
+        None
         """
-        i_hp = 0
-        i_sp = 0
-        return_char = None
-        if self._content == []:
-            return None
         if not self.is_over():
             return None
-
-        if self.is_over():
-            for character in self._content:
-                if character.get_hp() != 0:
-                    return_char = character
-
-        for character in self._content:
-            # two players have 0 hp case
-            if character.get_hp() == 0:
-                i_hp += 1
-            # two players have 0 sp case
-            if character.get_available_actions() == []:
-                i_sp += 1
-        if i_hp == len(self._content):
-            if return_char is not None:
-                return return_char
-            return None
-        if i_sp == len(self._content):
-            if return_char is not None:
-                return return_char
-            return None
-
-        if return_char is not None:
-            return return_char
+        # Once the game is over, at most one player with HP left can still
+        # be in this RestrictedBattleQueue, and only then does it win.
+        for player in [self._p1, self._p2]:
+            if player is not None and player.get_hp() != 0 and \
+                    self._entries.get(player, 0) > 0:
+                return player
         return None
 
     def remove(self) -> 'Character':
@@ -494,7 +1022,7 @@ class RestrictedBattleQueue(BattleQueue):
         >>> bq.add(c)
         >>> bq
         Sophia (Rogue): 100/100
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         [True]
         >>> bq.remove()
         Sophia (Rogue): 100/100
@@ -502,20 +1030,48 @@ class RestrictedBattleQueue(BattleQueue):
         True
         >>> bq
         <BLANKLINE>
-        >>> bq.able_to_add
+        >>> list(bq.able_to_add)
         []
         """
         self._clean_queue()
-        self.able_to_add.pop(0)
-        return self._content.pop(0)
+        character, can_add = self._pop()
+        self._count(character, can_add, -1)
+        return character
 
-    def copy(self) -> 'BattleQueue':
+    def clear(self) -> None:
         """
-        Return a copy of this BattleQueue. The copy contains copies of the
-        characters inside this BattleQueue, so any changes that rely on
-        the copy do not affect this BattleQueue.
+        Remove every character from this RestrictedBattleQueue at once, so
+        the next time each character is added counts as its first.
 
-        Overrides the super
+        Extends the super
+
+        >>> bq = RestrictedBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.add(c2)
+        >>> bq.clear()
+        >>> bq.add(c2)
+        >>> bq.able_to_add
+        [True]
+        """
+        super().clear()
+        self._entries = {}
+        self._addable = {}
+        self._dead = {}
+
+    def copy(self) -> 'BattleQueue':
+        """
+        Return a copy of this BattleQueue. The copy contains copies of the
+        characters inside this BattleQueue, so any changes that rely on
+        the copy do not affect this BattleQueue.
+
+        Overrides the super
 
         >>> bq = RestrictedBattleQueue()
         >>> from a2_characters import Rogue
@@ -534,25 +1090,752 @@ class RestrictedBattleQueue(BattleQueue):
         r (Rogue): 100/100 -> r2 (Rogue): 100/100
         """
         new_battle_queue = RestrictedBattleQueue()
+        copies = self._copy_into(new_battle_queue)
+        if new_battle_queue._runs:
+            # Like adding the copies one by one would, make the copy's first
+            # player the one at the front of the queue.
+            front = new_battle_queue._runs[0][0]
+            new_battle_queue._p1 = front
+            new_battle_queue._p2 = front.enemy
+        new_battle_queue._entries = {copies[character]: count for
+                                     character, count in self._entries.items()}
+        new_battle_queue._addable = {copies[character]: count for
+                                     character, count in self._addable.items()}
+        new_battle_queue._dead = {copies[character]: count for
+                                  character, count in self._dead.items()}
+        return new_battle_queue
 
-        p1_copy = self._p1.copy(new_battle_queue)
-        p2_copy = self._p2.copy(new_battle_queue)
-        p1_copy.enemy = p2_copy
-        p2_copy.enemy = p1_copy
+    def snapshot(self) -> Tuple:
+        """
+        Return the state of the game in this RestrictedBattleQueue as plain
+        data, followed by which entries are able to add.
 
-        able_to_add_copy = []
-        for el in self.able_to_add:
-            able_to_add_copy.append(el)
+        Extends the super
 
-        for character in self._content:
-            if character == self._p1:
-                new_battle_queue.add(p1_copy)
-            else:
-                new_battle_queue.add(p2_copy)
-        new_battle_queue.able_to_add = able_to_add_copy
+        >>> bq = RestrictedBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.add(c2)
+        >>> bq.snapshot()[2:]
+        ((0, 1, 1), (True, True, False))
+        """
+        return super().snapshot() + (tuple(self.able_to_add),)
+
+    def restore(self, snapshot: Tuple) -> None:
+        """
+        Set the players, order and able_to_add of this RestrictedBattleQueue to
+        match snapshot, which was returned by snapshot() on a
+        RestrictedBattleQueue with the same players.
+
+        Extends the super
+
+        >>> bq = RestrictedBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.restore((('Rogue', 'r', 100, 90), ('Rogue', 'r2', 88, 100),
+        ...             (1, 0, 0), (True, True, True)))
+        >>> bq
+        r2 (Rogue): 88/100 -> r (Rogue): 100/90 -> r (Rogue): 100/90
+        >>> list(bq.able_to_add)
+        [True, True, True]
+        """
+        super().restore(snapshot)
+        self._dead = {}
+        self.able_to_add = list(snapshot[3])
+
+
+class PersistentBattleQueue(BattleQueue):
+    """
+    A BattleQueue whose order is kept in a PersistentQueue of player numbers,
+    0 for the first player and 1 for the second, instead of a deque of
+    characters.
+
+    Copies share the order with the BattleQueue they were copied from, so
+    copy only has to copy the two players, however long the order is.
+
+    _order - the order of this PersistentBattleQueue
+    """
+    _order: PersistentQueue
+
+    def __init__(self) -> None:
+        """
+        Initialize this PersistentBattleQueue.
+
+        Extends the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> bq.is_empty()
+        True
+        """
+        super().__init__()
+        self._order = PersistentQueue()
+
+    def _clean_queue(self) -> None:
+        """
+        Remove all characters from the front of the Queue that don't have
+        any actions available to them.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> c.set_sp(2)
+        >>> bq.is_empty()
+        True
+        """
+        players = (self._p1, self._p2)
+        while not self._order.is_empty() and \
+                not players[self._order.peek()].available_actions:
+            self._order = self._order.remove()[1]
+            self._version += 1
+
+    def add(self, character: 'Character') -> None:
+        """
+        Add character to this PersistentBattleQueue.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.is_empty()
+        False
+        """
+        if not self._p1:
+            self._p1 = character
+            self._p2 = character.enemy
+        if character.available_actions:
+            self._order = self._order.add(0 if character == self._p1 else 1)
+            self._version += 1
+
+    def purge(self, character: 'Character') -> None:
+        """
+        Remove every entry of character from this PersistentBattleQueue at
+        once, as described in BattleQueue.purge. The order is built again,
+        so it is no longer shared with copies.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> for character in [c, c2, c, c2]:
+        ...     bq.add(character)
+        >>> c.set_sp(2)
+        >>> bq
+        r2 (Rogue): 100/100 -> r2 (Rogue): 100/100
+        """
+        if character not in (self._p1, self._p2):
+            return
+        player = 0 if character is self._p1 else 1
+        order = PersistentQueue()
+        for other in self._order:
+            if other != player:
+                order = order.add(other)
+        if len(order) != len(self._order):
+            self._order = order
+            self._version += 1
+
+    def remove(self) -> 'Character':
+        """
+        Remove and return the character at the front of this
+        PersistentBattleQueue.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.remove()
+        Sophia (Rogue): 100/100
+        >>> bq.is_empty()
+        True
+        """
+        self._clean_queue()
+        player, self._order = self._order.remove()
+        self._version += 1
+        return (self._p1, self._p2)[player]
+
+    def clear(self) -> None:
+        """
+        Remove every character from this PersistentBattleQueue at once.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.clear()
+        >>> bq.is_empty()
+        True
+        """
+        self._order = PersistentQueue()
+        self._version += 1
+
+    def is_empty(self) -> bool:
+        """
+        Return whether this PersistentBattleQueue is empty (i.e. has no
+        players or has no players that can perform any actions).
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> bq.is_empty()
+        True
+        """
+        self._clean_queue()
+        return self._order.is_empty()
+
+    def peek(self) -> 'Character':
+        """
+        Return the character at the front of this PersistentBattleQueue but
+        does not remove them.
+
+        If this PersistentBattleQueue is empty, returns the first player who
+        was added to this PersistentBattleQueue.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("Sophia", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c2)
+        >>> bq.peek()
+        Sophia (Rogue): 100/100
+        >>> bq.peek() is c2
+        True
+        """
+        self._clean_queue()
+        if self._order.is_empty():
+            return self._p1
+        return (self._p1, self._p2)[self._order.peek()]
+
+    def copy(self) -> 'BattleQueue':
+        """
+        Return a copy of this PersistentBattleQueue. The copy contains copies
+        of the characters inside this PersistentBattleQueue and shares its
+        order, so any changes that rely on the copy do not affect this
+        PersistentBattleQueue.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> new_bq = bq.copy()
+        >>> new_bq.peek().attack()
+        >>> new_bq
+        r (Rogue): 100/97 -> r2 (Rogue): 95/100 -> r (Rogue): 100/97
+        >>> bq
+        r (Rogue): 100/100 -> r2 (Rogue): 100/100
+        """
+        new_battle_queue = PersistentBattleQueue()
+        if self._p1 is None:
+            return new_battle_queue
+        new_battle_queue._p1 = self._p1.clone(new_battle_queue)
+        new_battle_queue._p2 = self._p2.clone(new_battle_queue)
+        new_battle_queue._p1.enemy = new_battle_queue._p2
+        new_battle_queue._p2.enemy = new_battle_queue._p1
+        new_battle_queue._order = self._order
+        return new_battle_queue
+
+    def __repr__(self) -> str:
+        """
+        Return a representation of this PersistentBattleQueue.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq
+        r (Rogue): 100/100 -> r2 (Rogue): 100/100
+        """
+        players = (self._p1, self._p2)
+        return " -> ".join([repr(players[player]) for player in self._order])
+
+    def _find_fingerprint(self) -> Tuple:
+        """
+        Return the fingerprint of this PersistentBattleQueue, as described in
+        BattleQueue.fingerprint, without using the cache. The runs are
+        found by grouping the order.
 
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.remove().special_attack()
+        >>> bq._find_fingerprint()[2]
+        ((0, True, 1), (1, True, 2))
+        """
+        self._clean_queue()
+        players = [self._p1, self._p2]
+        runs = [(players[player], True, len(list(entries)))
+                for player, entries in groupby(self._order)]
+        if runs and runs[0][0] is self._p2:
+            players.reverse()
+        return _get_fingerprint(players, runs)
+
+    def snapshot(self) -> Tuple:
+        """
+        Return the state of the game in this PersistentBattleQueue as plain
+        data, as described in BattleQueue.snapshot.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> c.attack()
+        >>> bq.snapshot()
+        (('Rogue', 'r', 100, 97), ('Rogue', 'r2', 95, 100), (0, 1, 0))
+        """
+        return super().snapshot()[:2] + (tuple(self._order),)
+
+    def restore(self, snapshot: Tuple) -> None:
+        """
+        Set the players and order of this PersistentBattleQueue to match
+        snapshot, as described in BattleQueue.restore.
+
+        Overrides the super
+
+        >>> bq = PersistentBattleQueue()
+        >>> from a2_characters import Rogue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> c.enemy = c2
+        >>> c2.enemy = c
+        >>> bq.add(c)
+        >>> bq.add(c2)
+        >>> bq.restore((('Rogue', 'r2', 28, 100), ('Rogue', 'r', 40, 12),
+        ...             (0, 1, 1)))
+        >>> bq
+        r2 (Rogue): 28/100 -> r (Rogue): 40/12 -> r (Rogue): 40/12
+        >>> bq.peek() == c2
+        True
+        """
+        super().restore(snapshot[:2] + ((),))
+        order = PersistentQueue()
+        for player in snapshot[2]:
+            order = order.add(player)
+        self._order = order
+        self._version += 1
+
+
+# The most characters a team in a TeamBattleQueue can have.
+MAX_TEAM_SIZE = 16
+
+
+class TeamBattleQueue(BattleQueue):
+    """
+    A BattleQueue for a battle between two teams of up to MAX_TEAM_SIZE
+    characters each.
+
+    Whenever a character reaches the front, its enemy is set to the first
+    character of the other team with HP left. Characters with no HP left are
+    skipped like characters with no actions, and a team is beaten once none
+    of its characters have HP left. Both are found by moving a pointer past
+    each team's fallen characters, so peek and is_over stay O(1) amortized
+    however big the teams grow. A character with no HP left is out of the
+    battle for good.
+
+    The minimax playstyles score a win by any character of a team as a win
+    for the whole team, as same_side describes.
+
+    _teams - the characters of each team, in order
+    _team_of - the index in _teams of each character's team
+    _leaders - the index in each team of its first character that may still
+               have HP left
+    """
+    _teams: List[List['Character']]
+    _team_of: Dict['Character', int]
+    _leaders: List[int]
+
+    def __init__(self) -> None:
+        """
+        Initialize this TeamBattleQueue.
+
+        Extends the super
+
+        >>> bq = TeamBattleQueue()
+        >>> bq.is_empty()
+        True
+        """
+        super().__init__()
+        self._teams = [[], []]
+        self._team_of = {}
+        self._leaders = [0, 0]
+
+    def set_teams(self, team_1: List['Character'],
+                  team_2: List['Character']) -> None:
+        """
+        Set up this empty TeamBattleQueue for a battle between team_1 and
+        team_2, adding their characters in turn, one from each team.
+
+        Raise a ValueError if a team is empty or has more than MAX_TEAM_SIZE
+        characters.
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> r2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r, r2], [m])
+        >>> bq
+        r (Rogue): 100/100 -> m (Mage): 100/100 -> r2 (Rogue): 100/100
+        >>> r2.enemy
+        m (Mage): 100/100
+        >>> m.enemy
+        r (Rogue): 100/100
+        """
+        for team in [team_1, team_2]:
+            if not 0 < len(team) <= MAX_TEAM_SIZE:
+                raise ValueError("teams must have 1 to {} characters, not "
+                                 "{}".format(MAX_TEAM_SIZE, len(team)))
+        self._teams = [list(team_1), list(team_2)]
+        self._team_of = {}
+        for i, team in enumerate(self._teams):
+            for character in team:
+                self._team_of[character] = i
+                character.enemy = self._teams[1 - i][0]
+        for i in range(max(len(team_1), len(team_2))):
+            for team in self._teams:
+                if i < len(team):
+                    self.add(team[i])
+
+    def get_teams(self) -> List[List['Character']]:
+        """
+        Return the characters of each team in this TeamBattleQueue, in order.
+        """
+        return [team[:] for team in self._teams]
+
+    def same_side(self, first: 'Character', second: 'Character') -> bool:
+        """
+        Return whether first and second fight on the same side of the battle
+        in this TeamBattleQueue: whether they're the same character or on the
+        same team.
+
+        Overrides the super
+
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> bq = TeamBattleQueue()
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> r2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r, r2], [m])
+        >>> bq.same_side(r, r2)
+        True
+        >>> bq.same_side(r, m)
+        False
+        """
+        if first in self._team_of and second in self._team_of:
+            return self._team_of[first] == self._team_of[second]
+        return first == second
+
+    def _get_leader(self, team: int) -> Union[None, 'Character']:
+        """
+        Return the first character of team with HP left, or None if the whole
+        team has fallen.
+        """
+        members = self._teams[team]
+        while self._leaders[team] < len(members) and \
+                members[self._leaders[team]].get_hp() == 0:
+            self._leaders[team] += 1
+        if self._leaders[team] == len(members):
+            return None
+        return members[self._leaders[team]]
+
+    def _clean_queue(self) -> None:
+        """
+        Remove all characters from the front of the Queue that don't have
+        any actions available to them or have no HP left, and point the
+        character left at the front at the other team.
+
+        Overrides the super
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> m2 = Mage("m2", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r], [m, m2])
+        >>> m.set_hp(0)
+        >>> bq.remove()
+        r (Rogue): 100/100
+        >>> bq.peek()
+        m2 (Mage): 100/100
+        >>> r.enemy
+        m2 (Mage): 100/100
+        """
+        while self._runs and (self._runs[0][0].get_hp() == 0 or
+                              not self._runs[0][0].available_actions):
+            self._runs.popleft()
+            self._version += 1
+        if self._runs and self._runs[0][0] in self._team_of:
+            front = self._runs[0][0]
+            target = self._get_leader(1 - self._team_of[front])
+            if target is not None:
+                front.enemy = target
+
+    def _get_cached(self, name: str, find: Callable[[], object]) -> object:
+        """
+        Return the result that find returns for this TeamBattleQueue.
+
+        The versions of every character on both teams would have to be
+        checked to use a cached result, so results are found again each time.
+
+        Overrides the super
+        """
+        return find()
+
+    def is_over(self) -> bool:
+        """
+        Return whether the battle in this TeamBattleQueue is over: when the
+        TeamBattleQueue is empty, or when either team has no HP left.
+
+        Overrides the super
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> m2 = Mage("m2", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r], [m, m2])
+        >>> m.set_hp(0)
+        >>> bq.is_over()
+        False
+        >>> m2.set_hp(0)
+        >>> bq.is_over()
+        True
+        """
+        if self.is_empty():
+            return True
+        return self._get_leader(0) is None or self._get_leader(1) is None
+
+    def get_winner(self) -> Union['Character', None]:
+        """
+        Return the first character with HP left on the team that won the
+        battle in this TeamBattleQueue if it is over, or None if it isn't
+        over or neither team was beaten.
+
+        Overrides the super
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> r2 = Rogue("r2", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r, r2], [m])
+        >>> r.set_hp(0)
+        >>> m.set_hp(0)
+        >>> bq.get_winner()
+        r2 (Rogue): 100/100
+        """
+        if not self.is_over():
+            return None
+        leaders = [self._get_leader(0), self._get_leader(1)]
+        if leaders[0] is not None and leaders[1] is None:
+            return leaders[0]
+        if leaders[1] is not None and leaders[0] is None:
+            return leaders[1]
+        return None
+
+    def _find_fingerprint(self) -> Tuple:
+        """
+        Return the fingerprint of this TeamBattleQueue, as described in
+        BattleQueue.fingerprint, but with every character, team by team, in
+        place of the two players.
+
+        Overrides the super
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> m2 = Mage("m2", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r], [m, m2])
+        >>> bq.remove().attack()
+        >>> bq.fingerprint()[3]
+        ((1, True, 1), (2, True, 1), (0, True, 1))
+        """
+        self._clean_queue()
+        return _get_fingerprint(self._teams[0] + self._teams[1], self._runs)
+
+    def copy(self) -> 'BattleQueue':
+        """
+        Return a copy of this TeamBattleQueue. The copy contains copies of
+        the characters on both teams, so any changes that rely on the copy do
+        not affect this TeamBattleQueue.
+
+        Overrides the super
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> m2 = Mage("m2", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r], [m, m2])
+        >>> new_bq = bq.copy()
+        >>> new_bq.remove().attack()
+        >>> new_bq
+        m (Mage): 93/100 -> m2 (Mage): 100/100 -> r (Rogue): 100/97
+        >>> bq
+        r (Rogue): 100/100 -> m (Mage): 100/100 -> m2 (Mage): 100/100
+        """
+        new_battle_queue = TeamBattleQueue()
+        copies = {}
+        for team in self._teams:
+            for character in team:
+                copies[character] = character.clone(new_battle_queue)
+        for character, character_copy in copies.items():
+            if character.enemy is not None:
+                character_copy.enemy = copies[character.enemy]
+        new_battle_queue._teams = [[copies[character] for character in team]
+                                   for team in self._teams]
+        new_battle_queue._team_of = {copies[character]: team for
+                                     character, team in self._team_of.items()}
+        new_battle_queue._leaders = self._leaders[:]
+        new_battle_queue._p1 = copies.get(self._p1)
+        new_battle_queue._p2 = copies.get(self._p2)
+        new_battle_queue._runs = deque(
+            (copies[character], can_add, count)
+            for character, can_add, count in self._runs)
         return new_battle_queue
 
+    def snapshot(self) -> Tuple:
+        """
+        Return the state of the battle in this TeamBattleQueue as plain data:
+        the class, name, HP and SP of every character, team by team, followed
+        by the order of this TeamBattleQueue as indexes into those
+        characters.
+
+        Overrides the super
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> m2 = Mage("m2", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r], [m, m2])
+        >>> bq.remove().attack()
+        >>> bq.snapshot()  # doctest: +NORMALIZE_WHITESPACE
+        (('Rogue', 'r', 100, 97), ('Mage', 'm', 93, 100),
+         ('Mage', 'm2', 100, 100), (1, 2, 0))
+        """
+        characters = self._teams[0] + self._teams[1]
+        indexes = {character: i for i, character in enumerate(characters)}
+        return tuple((type(character).__name__, character.get_name(),
+                      character.get_hp(), character.get_sp())
+                     for character in characters) + \
+            (tuple(indexes[character] for character in self._content),)
+
+    def restore(self, snapshot: Tuple) -> None:
+        """
+        Set the characters and order of this TeamBattleQueue to match
+        snapshot, which was returned by snapshot() on a TeamBattleQueue with
+        the same teams.
+
+        Overrides the super
+
+        >>> bq = TeamBattleQueue()
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> m2 = Mage("m2", bq, ManualPlaystyle(bq))
+        >>> bq.set_teams([r], [m, m2])
+        >>> bq.restore((('Rogue', 'r', 100, 97), ('Mage', 'm', 0, 100),
+        ...             ('Mage', 'm2', 100, 100), (2, 0)))
+        >>> bq
+        m2 (Mage): 100/100 -> r (Rogue): 100/97
+        >>> bq.is_over()
+        False
+        """
+        characters = self._teams[0] + self._teams[1]
+        for character, (_, _, hp, sp) in zip(characters, snapshot[:-1]):
+            character.set_hp(hp)
+            character.set_sp(sp)
+        self._leaders = [0, 0]
+        self._runs = deque()
+        self._version += 1
+        for i in snapshot[-1]:
+            self._push(characters[i])
+
 
 if __name__ == '__main__':
     import python_ta
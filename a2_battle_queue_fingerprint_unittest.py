@@ -0,0 +1,189 @@
+"""
+Unittests for the fingerprints of the BattleQueues in A2.
+
+These tests check that fingerprint matches one found entry by entry from
+snapshot, and that equal games compare and hash equal across queue classes,
+player names and the order the players were added in.
+"""
+import random
+import unittest
+from itertools import groupby
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import ManualPlaystyle
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue, \
+    PersistentBattleQueue
+from a2_skill_decision_tree import create_default_tree
+
+QUEUE_CLASSES = [BattleQueue, RestrictedBattleQueue, PersistentBattleQueue]
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue,
+                   names=("P1", "P2"), tree=None):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES, with
+    names. Sorcerers get tree, or a new default tree if tree is None.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key](names[0], battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key](names[1], battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(
+                create_default_tree() if tree is None else tree)
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+def find_fingerprint(battle_queue):
+    """
+    Return the fingerprint of battle_queue, found entry by entry from its
+    snapshot.
+    """
+    battle_queue.is_empty()
+    snapshot = battle_queue.snapshot()
+    players = [battle_queue._p1, battle_queue._p2]
+    order = list(snapshot[2])
+    able = list(snapshot[3]) if len(snapshot) > 3 else [True] * len(order)
+    if order and order[0] == 1:
+        players.reverse()
+        snapshot = (snapshot[1], snapshot[0])
+        order = [1 - player for player in order]
+    runs = tuple((player, can_add, len(list(entries)))
+                 for (player, can_add), entries in groupby(zip(order, able)))
+    trees = [getattr(player, 'tree', None) for player in players]
+    return tuple((name, hp, sp, None if tree is None else tree.get_structure())
+                 for tree, (name, _, hp, sp) in zip(trees, snapshot)) + \
+        (runs,)
+
+
+def play(battle_queue, rng):
+    """
+    Make the next character in battle_queue use a random available action.
+    """
+    character = battle_queue.remove()
+    if rng.choice(character.get_available_actions()) == 'A':
+        character.attack()
+    else:
+        character.special_attack()
+
+
+class FingerprintUnitTests(unittest.TestCase):
+    def test_matches_snapshot(self):
+        """
+        Test to make sure fingerprint matches the fingerprint found from
+        snapshot throughout random games, including after HP and SP are set
+        directly.
+        """
+        rng = random.Random(44)
+        for queue_class in QUEUE_CLASSES:
+            for _ in range(100):
+                battle_queue = set_up_matchup(rng.choice('mrvs'),
+                                              rng.choice('mrvs'), queue_class)
+                while not battle_queue.is_over():
+                    self.assertEqual(find_fingerprint(battle_queue),
+                                     battle_queue.fingerprint(),
+                                     "fingerprint on {}".format(battle_queue))
+                    if rng.random() < 0.1:
+                        player = rng.choice([battle_queue.peek(),
+                                             battle_queue.peek().enemy])
+                        player.set_hp(rng.randint(1, 100))
+                        player.set_sp(rng.randint(0, 100))
+                    else:
+                        play(battle_queue, rng)
+                self.assertEqual(find_fingerprint(battle_queue),
+                                 battle_queue.fingerprint())
+
+    def test_same_game_is_equal(self):
+        """
+        Test to make sure the same game compares and hashes equal whatever
+        the players are called and whichever was added first, and that
+        BattleQueue and PersistentBattleQueue fingerprints agree.
+        """
+        rng = random.Random(4)
+        for queue_class in QUEUE_CLASSES:
+            for _ in range(50):
+                keys = rng.choice('mrvs'), rng.choice('mrvs')
+                tree = create_default_tree()
+                battle_queue = set_up_matchup(*keys, queue_class, tree=tree)
+                other = set_up_matchup(*keys, queue_class, ("A", "B"), tree)
+                plain = set_up_matchup(*keys, BattleQueue, tree=tree)
+                seed = rng.random()
+                while not battle_queue.is_over():
+                    self.assertEqual(battle_queue, other)
+                    self.assertEqual(hash(battle_queue), hash(other))
+                    if queue_class is PersistentBattleQueue:
+                        self.assertEqual(plain.fingerprint(),
+                                         battle_queue.fingerprint())
+                    for bq in [battle_queue, other, plain]:
+                        play(bq, random.Random(seed))
+                    seed = rng.random()
+
+                swapped = set_up_matchup(keys[1], keys[0], queue_class,
+                                         tree=tree)
+                swapped.add(swapped.remove())
+                self.assertEqual(set_up_matchup(*keys, queue_class, tree=tree),
+                                 swapped,
+                                 "The player at the front should come first.")
+
+    def test_equal_trees_are_equal(self):
+        """
+        Test to make sure Sorcerers with equal skill decision trees built
+        separately give the same fingerprint, and ones with different trees
+        don't.
+        """
+        for queue_class in QUEUE_CLASSES:
+            battle_queue = set_up_matchup('s', 'm', queue_class)
+            other = set_up_matchup('s', 'm', queue_class)
+            self.assertIsNot(battle_queue.peek().tree, other.peek().tree)
+            self.assertEqual(battle_queue, other,
+                             "Equal trees should give equal fingerprints.")
+            self.assertEqual(hash(battle_queue), hash(other))
+
+            tree = create_default_tree()
+            tree.children.pop()
+            other.peek().set_skill_decision_tree(tree)
+            self.assertNotEqual(battle_queue, other,
+                                "Different trees should give different "
+                                "fingerprints.")
+
+    def test_restricted_matches_battle_queue(self):
+        """
+        Test to make sure a RestrictedBattleQueue has the same fingerprint as
+        a BattleQueue holding the same game while all of its entries are able
+        to add, but still doesn't compare equal to it.
+        """
+        battle_queue = set_up_matchup('r', 'm')
+        restricted = set_up_matchup('r', 'm', RestrictedBattleQueue)
+        self.assertEqual(battle_queue.fingerprint(), restricted.fingerprint())
+        self.assertNotEqual(battle_queue, restricted,
+                            "The queues follow different rules.")
+        for _ in range(2):
+            restricted.add(restricted.peek())
+        self.assertEqual(((0, True, 1), (1, True, 1), (0, True, 1),
+                          (0, False, 1)), restricted.fingerprint()[2])
+
+    def test_deduplicates_copies(self):
+        """
+        Test to make sure copies of a game are one element of a set, and that
+        the cached fingerprint changes with the game.
+        """
+        for queue_class in QUEUE_CLASSES:
+            battle_queue = set_up_matchup('v', 's', queue_class)
+            copies = {battle_queue.copy() for _ in range(10)}
+            self.assertEqual(1, len(copies))
+            self.assertIn(battle_queue, copies)
+            fingerprint = battle_queue.fingerprint()
+            battle_queue.peek().enemy.set_hp(50)
+            self.assertNotEqual(fingerprint, battle_queue.fingerprint(),
+                                "Setting HP should change the fingerprint.")
+            self.assertNotIn(battle_queue, copies)
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,213 @@
+"""
+Unittests for purging the entries of characters that run out of SP from the
+BattleQueues in A2.
+
+These tests check that purging keeps the order of the entries that can act
+exactly as skipping them at the front did, that no entry that can't act is
+left behind, and that every queue class keeps purged entries dead.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import ManualPlaystyle
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue, \
+    PersistentBattleQueue
+from a2_skill_decision_tree import create_default_tree
+
+QUEUE_CLASSES = [BattleQueue, PersistentBattleQueue]
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+class LazyQueue:
+    """
+    A queue of characters that only skips characters that can't act once
+    they reach the front, as BattleQueue did before purging.
+    """
+
+    def __init__(self, characters):
+        """
+        Initialize this LazyQueue holding characters, from front to back.
+        """
+        self.content = list(characters)
+
+    def add(self, character):
+        """
+        Add character to the back of this LazyQueue.
+        """
+        self.content.append(character)
+
+    def clean(self):
+        """
+        Remove the characters that can't act from the front of this
+        LazyQueue.
+        """
+        while self.content and \
+                self.content[0].get_available_actions() == []:
+            self.content.pop(0)
+
+    def remove(self):
+        """
+        Remove and return the first character in this LazyQueue that can act.
+        """
+        self.clean()
+        return self.content.pop(0)
+
+    def clear(self):
+        """
+        Remove every character from this LazyQueue.
+        """
+        self.content = []
+
+    def get_order(self):
+        """
+        Return the characters in this LazyQueue that can act, from front to
+        back.
+        """
+        return [character for character in self.content
+                if character.get_available_actions() != []]
+
+
+def get_order(battle_queue):
+    """
+    Return the characters of the entries in battle_queue, from front to back.
+    """
+    if isinstance(battle_queue, PersistentBattleQueue):
+        players = (battle_queue._p1, battle_queue._p2)
+        return [players[player] for player in battle_queue._order]
+    return battle_queue._content
+
+
+def act(battle_queue, lazy, character, move):
+    """
+    Make character use move, adding and clearing in lazy as character's
+    skill does in battle_queue.
+    """
+    add, clear = battle_queue.add, battle_queue.clear
+
+    def lazy_add(other):
+        lazy.add(other)
+        add(other)
+
+    def lazy_clear():
+        lazy.clear()
+        clear()
+    battle_queue.add, battle_queue.clear = lazy_add, lazy_clear
+    if move == 'A':
+        character.attack()
+    else:
+        character.special_attack()
+    del battle_queue.add, battle_queue.clear
+
+
+class PurgeUnitTests(unittest.TestCase):
+    def test_order_matches_lazy_queue(self):
+        """
+        Test to make sure the entries left in random games are always the
+        entries of a lazily cleaned queue that can still act, whether
+        characters act before or after being removed.
+        """
+        rng = random.Random(45)
+        for queue_class in QUEUE_CLASSES:
+            for _ in range(200):
+                battle_queue = set_up_matchup(rng.choice('mrvs'),
+                                              rng.choice('mrvs'), queue_class)
+                lazy = LazyQueue(get_order(battle_queue))
+                act_first = rng.random() < 0.5
+                while not battle_queue.is_over():
+                    self.assertEqual(lazy.get_order(),
+                                     get_order(battle_queue))
+                    character = battle_queue.peek()
+                    lazy.clean()
+                    self.assertIs(lazy.content[0], character)
+                    move = rng.choice(character.get_available_actions())
+                    if not act_first:
+                        battle_queue.remove()
+                        lazy.remove()
+                    act(battle_queue, lazy, character, move)
+                    if act_first and character.get_available_actions():
+                        battle_queue.remove()
+                        lazy.remove()
+                self.assertEqual(lazy.get_order(), get_order(battle_queue))
+
+    def test_copies_carry_no_dead_entries(self):
+        """
+        Test to make sure a character's entries are all purged as soon as its
+        SP runs out, so copies don't carry them.
+        """
+        for queue_class in QUEUE_CLASSES:
+            battle_queue = set_up_matchup('r', 'm', queue_class)
+            rogue = battle_queue.peek()
+            for _ in range(3):
+                battle_queue.remove().special_attack()
+            self.assertIn(rogue, get_order(battle_queue))
+            rogue.set_sp(0)
+            self.assertNotIn(rogue, get_order(battle_queue.copy()),
+                             "Purged entries shouldn't be copied.")
+            battle_queue.add(rogue)
+            self.assertNotIn(rogue, get_order(battle_queue),
+                             "A character that can't act shouldn't be added.")
+
+    def test_restricted_keeps_entries(self):
+        """
+        Test to make sure a RestrictedBattleQueue keeps the entries that
+        decide which later entries are able to add.
+        """
+        battle_queue = set_up_matchup('r', 'm', RestrictedBattleQueue)
+        snapshot = battle_queue.snapshot()
+        battle_queue.restore(snapshot[:2] + ((0, 1, 0, 1), (True,) * 4))
+        battle_queue.peek().enemy.set_sp(0)
+        battle_queue.remove().attack()
+        self.assertEqual([True, True, True, False], battle_queue.able_to_add,
+                         "The Mage at the front decides that the Rogue "
+                         "can't add.")
+
+    def test_purged_entries_stay_dead(self):
+        """
+        Test to make sure every queue class skips the entries a character had,
+        or was given, while it couldn't act, even once its SP is raised
+        again, but not the entries it's given after that.
+        """
+        for queue_class in QUEUE_CLASSES + [RestrictedBattleQueue]:
+            battle_queue = set_up_matchup('r', 'm', queue_class)
+            rogue = battle_queue.peek()
+            mage = rogue.enemy
+            snapshot = battle_queue.snapshot()
+            battle_queue.restore(snapshot[:2] + ((0, 1, 0, 1),) +
+                                 ((True,) * 4,) * (len(snapshot) - 3))
+            mage.set_sp(0)
+            battle_queue.remove()
+            battle_queue.add(mage)
+            mage.set_sp(100)
+            self.assertIs(rogue, battle_queue.peek(),
+                          "{}: the Mage's entries should stay dead."
+                          .format(queue_class.__name__))
+            battle_queue.add(mage)
+            removed = []
+            while not battle_queue.is_empty():
+                removed.append(battle_queue.remove())
+            self.assertEqual([rogue, mage], removed,
+                             "{}: only the Mage's last entry can act."
+                             .format(queue_class.__name__))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,299 @@
+"""
+Benchmarks for A2.
+
+Run this file to time the searches and BattleQueues on the standard
+matchups. Each benchmark prints one line per measurement.
+
+Do NOT run PythonTA on this file.
+"""
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_characters import Mage, Rogue, Vampire, Sorcerer
+from a2_playstyle import ManualPlaystyle, RandomPlaystyle, get_state_score
+from a2_skill_decision_tree import create_default_tree
+
+# The matchups that the benchmarks are run on, each at full HP and SP.
+STANDARD_MATCHUPS = [(Rogue, Mage), (Mage, Rogue), (Vampire, Rogue),
+                     (Sorcerer, Mage), (Vampire, Sorcerer)]
+
+
+def set_up_matchup(p1_class: type, p2_class: type,
+                   queue_class: type = BattleQueue) -> 'BattleQueue':
+    """
+    Return a new queue_class holding a new p1_class followed by a new
+    p2_class, both at full HP and SP.
+    """
+    battle_queue = queue_class()
+    p1 = p1_class("P1", battle_queue, ManualPlaystyle(battle_queue))
+    p2 = p2_class("P2", battle_queue, ManualPlaystyle(battle_queue))
+    for character in [p1, p2]:
+        if isinstance(character, Sorcerer):
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+def time_call(function: Callable[[], object], repeat: int = 1) \
+        -> Tuple[float, object]:
+    """
+    Return the fastest of repeat timings of calling function, in seconds, and
+    the value it returned.
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+def benchmark_frontier(matchups: List[Tuple[type, type]] = None) -> None:
+    """
+    Compare solve_frontier with get_state_score on matchups, which defaults
+    to STANDARD_MATCHUPS.
+    """
+    from a2_frontier import solve_frontier
+
+    for queue_class in [BattleQueue, RestrictedBattleQueue]:
+        for p1_class, p2_class in matchups or STANDARD_MATCHUPS:
+            battle_queue = set_up_matchup(p1_class, p2_class, queue_class)
+            frontier_time, score = time_call(
+                lambda: solve_frontier(battle_queue), 3)
+            search_time, expected = time_call(
+                lambda: get_state_score(battle_queue))
+            assert score == expected
+            print("frontier {} {} v {}: score {}, get_state_score {:.3f}s, "
+                  "solve_frontier {:.4f}s ({:.0f}x)".format(
+                      queue_class.__name__, p1_class.__name__,
+                      p2_class.__name__, score, search_time, frontier_time,
+                      search_time / frontier_time))
+
+
+class ListBattleQueue:
+    """
+    The BattleQueue as it was before its entries were kept in runs: a list
+    of characters, taken off the front with list.pop(0). Only what
+    benchmark_long_queues needs is kept.
+
+    _content - the characters in this ListBattleQueue, from front to back
+    """
+    _content: List['Character']
+
+    def __init__(self) -> None:
+        """
+        Initialize this ListBattleQueue.
+        """
+        self._content = []
+
+    def _clean_queue(self) -> None:
+        """
+        Remove all characters from the front of the queue that don't have
+        any actions available to them.
+        """
+        while self._content and self._content[0].get_available_actions() == []:
+            self._content.pop(0)
+
+    def add(self, character: 'Character') -> None:
+        """
+        Add character to this ListBattleQueue.
+        """
+        self._content.append(character)
+
+    def remove(self) -> 'Character':
+        """
+        Remove and return the character at the front of this ListBattleQueue.
+        """
+        self._clean_queue()
+        return self._content.pop(0)
+
+    def is_empty(self) -> bool:
+        """
+        Return whether this ListBattleQueue has no characters that can act.
+        """
+        self._clean_queue()
+        return self._content == []
+
+
+def benchmark_long_queues(lengths: List[int] = None) -> None:
+    """
+    Time draining a BattleQueue and a RestrictedBattleQueue of each length in
+    lengths, which defaults to 1000, 10000 and 100000 entries, against the
+    old list-based ListBattleQueue holding the same entries. The entries
+    alternate between the two players, so none of them share a run.
+    """
+    for length in lengths or [1000, 10000, 100000]:
+        for queue_class in [BattleQueue, RestrictedBattleQueue]:
+            battle_queue = set_up_matchup(Rogue, Mage, queue_class)
+            players = [battle_queue.peek(), battle_queue.peek().enemy]
+            # Fill the queue through restore, since every add to a
+            # RestrictedBattleQueue scans it.
+            snapshot = battle_queue.snapshot()
+            snapshot = snapshot[:2] + \
+                (tuple(i % 2 for i in range(length)),) + \
+                ((True,) * length,) * (len(snapshot) - 3)
+            old_queue = ListBattleQueue()
+
+            def drain() -> None:
+                """
+                Remove every entry from battle_queue.
+                """
+                battle_queue.restore(snapshot)
+                while not battle_queue.is_empty():
+                    battle_queue.remove()
+
+            def drain_old() -> None:
+                """
+                Remove every entry from old_queue, filled with the same
+                entries as battle_queue.
+                """
+                for i in snapshot[2]:
+                    old_queue.add(players[i])
+                while not old_queue.is_empty():
+                    old_queue.remove()
+
+            queue_time, _ = time_call(drain, 3)
+            old_time, _ = time_call(drain_old, 3)
+            print("long queue {} {}: remove {:.2f}us/entry, "
+                  "old BattleQueue {:.2f}us/entry ({:.1f}x)".format(
+                      queue_class.__name__, length,
+                      queue_time / length * 1e6, old_time / length * 1e6,
+                      old_time / queue_time))
+
+
+def copy_by_adding(battle_queue: 'BattleQueue') -> 'BattleQueue':
+    """
+    Return a copy of battle_queue built by adding each entry to a new queue
+    in turn, as copy used to, to compare the bulk copy against.
+    """
+    new_battle_queue = type(battle_queue)()
+    p1, p2 = battle_queue._p1, battle_queue._p2
+    p1_copy = p1.copy(new_battle_queue)
+    p2_copy = p2.copy(new_battle_queue)
+    p1_copy.enemy = p2_copy
+    p2_copy.enemy = p1_copy
+    for character in battle_queue._content:
+        new_battle_queue.add(p1_copy if character == p1 else p2_copy)
+    if isinstance(battle_queue, RestrictedBattleQueue):
+        new_battle_queue.able_to_add = battle_queue.able_to_add
+    return new_battle_queue
+
+
+def benchmark_copy(lengths: List[int] = None, copies: int = 10000) -> None:
+    """
+    Time copies copies of a Rogue v Mage queue with each number of entries in
+    lengths, which defaults to 2, 8 and 32, using copy and copy_by_adding.
+    """
+    for length in lengths or [2, 8, 32]:
+        for queue_class in [BattleQueue, RestrictedBattleQueue]:
+            battle_queue = set_up_matchup(Rogue, Mage, queue_class)
+            snapshot = battle_queue.snapshot()
+            order = tuple(i % 2 for i in range(length))
+            battle_queue.restore(snapshot[:2] + (order,) +
+                                 ((True,) * length,) * (len(snapshot) - 3))
+
+            def run(copy: Callable[[], object]) -> Callable[[], None]:
+                """
+                Return a function that calls copy copies times.
+                """
+                def repeat() -> None:
+                    """
+                    Call copy copies times.
+                    """
+                    for _ in range(copies):
+                        copy()
+                return repeat
+
+            copy_time, _ = time_call(run(battle_queue.copy), 3)
+            add_time, _ = time_call(
+                run(lambda: copy_by_adding(battle_queue)), 3)
+            print("copy {} {} entries: copy {:.2f}us, by adding {:.2f}us "
+                  "({:.1f}x)".format(queue_class.__name__, length,
+                                     copy_time / copies * 1e6,
+                                     add_time / copies * 1e6,
+                                     add_time / copy_time))
+
+
+def benchmark_solve_memory(matchups: List[Tuple[type, type]] = None,
+                           copies: int = 10000) -> None:
+    """
+    Time a full get_state_score on each of matchups, which defaults to
+    STANDARD_MATCHUPS, and measure the most memory it held at once, along
+    with the time and memory each copy and each clone of a character takes.
+    """
+    for p1_class, p2_class in matchups or STANDARD_MATCHUPS:
+        battle_queue = set_up_matchup(p1_class, p2_class)
+        search_time, score = time_call(lambda: get_state_score(battle_queue))
+
+        tracemalloc.start()
+        get_state_score(battle_queue)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        player = battle_queue.peek()
+        measures = []
+        for copy in [player.copy, player.clone]:
+            copy_time, _ = time_call(
+                lambda: [copy(battle_queue) for _ in range(copies)], 3)
+            tracemalloc.start()
+            kept = [copy(battle_queue) for _ in range(copies)]
+            size = tracemalloc.get_traced_memory()[0] / len(kept)
+            tracemalloc.stop()
+            measures.append((copy_time / copies * 1e6, size))
+        print("solve {} v {}: score {}, {:.3f}s, peak {:.1f}MB; {} copy "
+              "{:.2f}us, {:.0f}B, clone {:.2f}us, {:.0f}B".format(
+                  p1_class.__name__, p2_class.__name__, score, search_time,
+                  peak / 1e6, p1_class.__name__, *measures[0], *measures[1]))
+
+
+def benchmark_random_games(matchups: List[Tuple[type, type]] = None,
+                           games: int = 10000) -> None:
+    """
+    Time games games with random moves on each of matchups, which defaults
+    to STANDARD_MATCHUPS, played one at a time with a RandomPlaystyle and
+    all at once by a RandomGameSimulator.
+    """
+    from a2_simulator import RandomGameSimulator
+
+    for queue_class in [BattleQueue, RestrictedBattleQueue]:
+        for p1_class, p2_class in matchups or STANDARD_MATCHUPS:
+            battle_queue = set_up_matchup(p1_class, p2_class, queue_class)
+
+            def play_one_at_a_time() -> None:
+                """
+                Play games games on copies of battle_queue.
+                """
+                for _ in range(games):
+                    bq = battle_queue.copy()
+                    playstyle = RandomPlaystyle(bq)
+                    while not bq.is_over():
+                        if playstyle.select_attack() == 'A':
+                            bq.remove().attack()
+                        else:
+                            bq.remove().special_attack()
+
+            loop_time, _ = time_call(play_one_at_a_time)
+            simulator_time, _ = time_call(
+                lambda: RandomGameSimulator(battle_queue, games).run(), 3)
+            print("random games {} {} v {}: one at a time {:.1f}us/game, "
+                  "simulator {:.2f}us/game ({:.0f}x)".format(
+                      queue_class.__name__, p1_class.__name__,
+                      p2_class.__name__, loop_time / games * 1e6,
+                      simulator_time / games * 1e6,
+                      loop_time / simulator_time))
+
+
+if __name__ == '__main__':
+    benchmark_frontier()
+    benchmark_long_queues()
+    benchmark_copy()
+    benchmark_solve_memory()
+    benchmark_random_games()
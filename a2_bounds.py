@@ -0,0 +1,150 @@
+"""
+Static score bounds for A2.
+
+get_score_bounds finds, from the HP, SP, skills and defense of the two
+characters alone, a range that the score of a state (as described in
+get_state_score) must lie in. A character can only win if the most damage
+its SP can still buy covers its enemy's HP, and the HP it wins with can only
+have grown by lifesteal or by its enemy dealing less damage than its
+defense. The minimax searches use these bounds to skip the parts of the
+game that can't change their score.
+"""
+from typing import Tuple, Union
+from a2_battle_queue import TeamBattleQueue
+from a2_endgame import get_max_damage
+
+# A bound beyond the score of any state.
+INFINITY = float('inf')
+
+# The bounds found by _get_damage_bounds so far.
+_DAMAGE_BOUNDS = {}
+
+
+def get_damage_range(character: 'Character', action: str) -> Tuple[int, int]:
+    """
+    Return the least and the most damage, before defense, that character's
+    Skill for action can deal. A Sorcerer's attack deals the damage of any
+    Skill in its skill decision tree.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Sorcerer
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> from a2_skill_decision_tree import create_default_tree
+    >>> s = Sorcerer("s", BattleQueue(), ManualPlaystyle(BattleQueue()))
+    >>> s.set_skill_decision_tree(create_default_tree())
+    >>> get_damage_range(s, 'A')
+    (15, 40)
+    >>> get_damage_range(s, 'S')
+    (25, 25)
+    """
+    skill = character.get_skill(action)
+    if not skill.uses_tree() or character.tree is None:
+        return skill.get_damage(), skill.get_damage()
+
+    damages = []
+    to_visit = [character.tree]
+    while to_visit:
+        tree = to_visit.pop()
+        damages.append(tree.value.get_damage())
+        to_visit.extend(tree.children)
+    return min(damages), max(damages)
+
+
+def _get_damage_bounds(caster: 'Character', target: 'Character') \
+        -> Tuple[Union[int, float], Union[int, float]]:
+    """
+    Return the most damage that caster can still deal to target, and the
+    most HP that caster can still give target by dealing less damage than
+    target's defense.
+
+    The bounds only depend on the cost and damage of caster's skills, its
+    skill decision tree, its SP and target's defense, so they are remembered
+    in _DAMAGE_BOUNDS for each of those.
+    """
+    key = (tuple((skill.get_sp_cost(), skill.get_damage(), skill.uses_tree())
+                 for skill in [caster.get_skill('A'), caster.get_skill('S')]),
+           getattr(caster, 'tree', None), caster.get_sp(),
+           target.get_defense())
+    if key in _DAMAGE_BOUNDS:
+        return _DAMAGE_BOUNDS[key]
+
+    costs = tuple(caster.get_skill(action).get_sp_cost()
+                  for action in ['A', 'S'])
+    if min(costs) <= 0:
+        bounds = (INFINITY, INFINITY)
+    else:
+        ranges = [get_damage_range(caster, action) for action in ['A', 'S']]
+        damages = tuple(max(most - target.get_defense(), 0)
+                        for _, most in ranges)
+        heals = tuple(max(target.get_defense() - least, 0)
+                      for least, _ in ranges)
+        bounds = (get_max_damage(caster.get_sp(), costs, damages),
+                  get_max_damage(caster.get_sp(), costs, heals))
+    _DAMAGE_BOUNDS[key] = bounds
+    return bounds
+
+
+def _get_best_win(caster: 'Character', target: 'Character') \
+        -> Union[int, float]:
+    """
+    Return the most HP that caster can win the game against target with, or
+    0 if caster can't win.
+    """
+    damage = _get_damage_bounds(caster, target)[0]
+    if damage < target.get_hp():
+        return 0
+    hp = caster.get_hp() + _get_damage_bounds(target, caster)[1]
+    if any(caster.get_skill(action).has_lifesteal() for action in ['A', 'S']):
+        # Lifesteal heals caster by at most the damage it deals.
+        hp += damage
+    return hp
+
+
+def get_score_bounds(battle_queue: 'BattleQueue') \
+        -> Tuple[Union[int, float], Union[int, float]]:
+    """
+    Return a lower and an upper bound on the score that the next player in
+    battle_queue can guarantee, as described in get_state_score. Both bounds
+    are the score itself if the game is over. A game in a TeamBattleQueue
+    that isn't over has no bounds, since any character left may still win.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(r)
+    >>> bq.add(m)
+    >>> get_score_bounds(bq)
+    (-100, 100)
+    >>> m.set_sp(29)
+    >>> get_score_bounds(bq)
+    (0, 100)
+    >>> r.set_sp(40)
+    >>> get_score_bounds(bq)
+    (0, 0)
+    >>> m.set_hp(0)
+    >>> get_score_bounds(bq)
+    (100, 100)
+    """
+    if battle_queue.is_over():
+        winner = battle_queue.get_winner()
+        if winner is None:
+            return 0, 0
+        if battle_queue.same_side(winner, battle_queue.peek()):
+            return winner.get_hp(), winner.get_hp()
+        return -winner.get_hp(), -winner.get_hp()
+    if isinstance(battle_queue, TeamBattleQueue):
+        return -INFINITY, INFINITY
+
+    player = battle_queue.peek()
+    return -_get_best_win(player.enemy, player), \
+        _get_best_win(player, player.enemy)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
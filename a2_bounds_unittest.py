@@ -0,0 +1,143 @@
+"""
+Unittests for the static score bounds in A2.
+
+These tests check that get_score_bounds always contains the score of a full
+search, and that pruning with it never changes the score get_state_score
+returns.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import get_state_score, ManualPlaystyle, SearchControl
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_bounds import get_score_bounds
+from a2_characters import make_character_class
+from a2_frontier import solve_frontier
+from a2_skills import SKILL_TABLE, make_skill
+from a2_skill_decision_tree import create_default_tree
+from a2_specs import SPECS
+
+# Two spec characters with the same kind of skills but different damage.
+CUSTOM_SKILLS = {'Poke': {'cost': 5, 'damage': 9, 'effects': ['add_caster']},
+                 'Smash': {'cost': 5, 'damage': 40,
+                           'effects': ['add_caster']}}
+CUSTOM_CHARACTERS = {'weakling': {'defense': 5,
+                                  'skills': {'A': 'Poke', 'S': 'Poke'}},
+                     'brute': {'defense': 5,
+                               'skills': {'A': 'Smash', 'S': 'Smash'}}}
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+class ScoreBoundsUnitTests(unittest.TestCase):
+    def test_bounds_contain_score(self):
+        """
+        Test to make sure the score of a full search always lies between the
+        bounds found by get_score_bounds, on random states of both kinds of
+        Battle Queue.
+        """
+        rng = random.Random(32)
+        exact = 0
+        for _ in range(400):
+            queue_class = rng.choice([BattleQueue, RestrictedBattleQueue])
+            battle_queue = set_up_matchup(rng.choice('mrvs'),
+                                          rng.choice('mrvs'), queue_class)
+            p1 = battle_queue.peek()
+            characters = [p1, p1.enemy]
+            for character in characters:
+                character.set_hp(rng.randint(0, 100))
+                character.set_sp(rng.randint(0, 60))
+            for _ in range(rng.randint(0, 4)):
+                battle_queue.add(rng.choice(characters))
+
+            lower, upper = get_score_bounds(battle_queue)
+            score = solve_frontier(battle_queue)
+            self.assertTrue(lower <= score <= upper,
+                            ("The score of:\n{}\nIs {}, outside the bounds " +
+                             "({}, {}).").format(battle_queue, score, lower,
+                                                 upper))
+            if lower == upper:
+                exact += 1
+        self.assertGreater(exact, 0)
+
+    def test_pruning_keeps_score(self):
+        """
+        Test to make sure get_state_score finds the same score with and
+        without pruning, searching fewer nodes and counting its cutoffs.
+        """
+        for p1_key, p2_key in [('r', 'v'), ('v', 's'), ('m', 'm')]:
+            for queue_class in [BattleQueue, RestrictedBattleQueue]:
+                battle_queue = set_up_matchup(p1_key, p2_key, queue_class)
+                battle_queue.peek().set_sp(50)
+                full = SearchControl(prune=False)
+                pruned = SearchControl()
+                expected = get_state_score(battle_queue, full)
+                actual = get_state_score(battle_queue, pruned)
+
+                self.assertEqual(expected, actual,
+                                 ("Pruning changed the score of:\n{}\nFrom " +
+                                  "{} to {}.").format(battle_queue, expected,
+                                                      actual))
+                self.assertLess(pruned.nodes, full.nodes)
+                self.assertGreater(pruned.bound_cutoffs +
+                                   pruned.exact_bounds, 0)
+                self.assertEqual(0, full.bound_cutoffs + full.exact_bounds,
+                                 "A search without pruning can't cut off.")
+
+    def test_pruning_keeps_score_of_spec_characters(self):
+        """
+        Test to make sure characters made from different specs, whose skills
+        are all SpecSkills, don't share their bounds.
+        """
+        SPECS['skills'].update(CUSTOM_SKILLS)
+        SPECS['characters'].update(CUSTOM_CHARACTERS)
+        for name in CUSTOM_SKILLS:
+            self.addCleanup(SPECS['skills'].pop, name)
+        for spec_type, spec in CUSTOM_CHARACTERS.items():
+            SKILL_TABLE[spec_type] = {action: make_skill(name)
+                                      for action, name in
+                                      spec['skills'].items()}
+            self.addCleanup(SPECS['characters'].pop, spec_type)
+            self.addCleanup(SKILL_TABLE.pop, spec_type)
+
+        for spec_type in ['weakling', 'brute']:
+            battle_queue = BattleQueue()
+            playstyle = ManualPlaystyle(battle_queue)
+            p1 = make_character_class(spec_type)("P1", battle_queue,
+                                                 playstyle)
+            p2 = CHARACTER_CLASSES['m']("P2", battle_queue, playstyle)
+            p1.enemy = p2
+            p2.enemy = p1
+            battle_queue.add(p1)
+            battle_queue.add(p2)
+            p1.set_sp(20)
+            p2.set_sp(20)
+            p2.set_hp(30)
+            expected = get_state_score(battle_queue,
+                                       SearchControl(prune=False))
+            actual = get_state_score(battle_queue)
+            self.assertEqual(expected, actual,
+                             "Pruning changed the score of a {} from {} to "
+                             "{}.".format(spec_type, expected, actual))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
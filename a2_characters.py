@@ -1,7 +1,8 @@
 """
 The Character classes for A2.
 
-See a2_skills for how skills are handled.
+See a2_skills for how skills are handled, and a2_specs for the specs that
+describe each kind of character.
 Character, Mage, and Rogue have all been provided to you, with full
 documentation.
 
@@ -11,9 +12,55 @@ in a2.pdf, as well as writing all documentation for them.
 Sorcerers must have a method called set_skill_decision_tree which takes in
 a SkillDecisionTree to be used whenever the Sorcerer attacks.
 """
-from typing import List, Union
-from a2_skills import MageAttack, MageSpecial, RogueAttack, RogueSpecial, \
-    VampireAttack, VampireSpecial, SorcererAttack, SorcererSpecial
+from bisect import bisect_right
+from functools import wraps
+from typing import Callable, Dict, List, Tuple, Union
+from a2_skills import SKILL_TABLE, MageAttack, VampireAttack
+from a2_specs import SPECS
+
+# The action tables found by _get_action_tables so far, by skills.
+_ACTION_TABLES = {}
+
+
+def _get_action_tables(skills: Dict[str, 'Skill']) -> Tuple:
+    """
+    Return the _action_bits, _sp_thresholds, _masks_by_level and
+    _actions_by_mask of a Character with skills, as described in Character.
+    An action whose Skill is None can never be afforded.
+
+    >>> _get_action_tables({'A': MageAttack(), 'S': None})[1:3]
+    ([5], (0, 1))
+    """
+    key = tuple(skills.items())
+    if key not in _ACTION_TABLES:
+        actions = list(skills)
+        costs = [None if skill is None else skill.get_sp_cost()
+                 for skill in skills.values()]
+        thresholds = sorted(set(cost for cost in costs if cost is not None))
+        masks = (0,) + tuple(
+            sum(1 << i for i, cost in enumerate(costs)
+                if cost is not None and cost <= threshold)
+            for threshold in thresholds)
+        actions_by_mask = tuple(
+            tuple(action for i, action in enumerate(actions) if mask >> i & 1)
+            for mask in range(1 << len(actions)))
+        _ACTION_TABLES[key] = ({action: 1 << i
+                                for i, action in enumerate(actions)},
+                               thresholds, masks, actions_by_mask)
+    return _ACTION_TABLES[key]
+
+
+def _set_up_actions_after(init: Callable) -> Callable:
+    """
+    Return init, changed to set up the action tables of the Character it
+    initializes from its own _skills once init has set them.
+    """
+    @wraps(init)
+    def __init__(self, *args, **kwargs) -> None:
+        init(self, *args, **kwargs)
+        self._set_up_actions()
+        self._update_actions()
+    return __init__
 
 
 class Character:
@@ -23,9 +70,64 @@ class Character:
     battle_queue - the BattleQueue that this Character will add to.
     playstyle - the Playstyle that this Character uses to pick actions.
     enemy - the Character that this Character attacks.
+    available_actions - the actions that this Character can afford, as a
+                        tuple shared by every Character of the same class
+                        that can afford them. Read it, but don't change it.
+    _skills - the Skill for each action, shared by every Character of the
+              same class
+    _action_mask - a bitmask of the actions that this Character can afford,
+                   where bit i is set if it can afford the i-th action in
+                   _skills. It changes only when this Character's SP does.
+    _action_bits - the bit for each action in _skills
+    _sp_thresholds - the SP costs of the actions in _skills, in order and
+                     without repeats
+    _masks_by_level - the _action_mask of a Character whose SP is at least
+                      the first i of _sp_thresholds, for each i
+    _actions_by_mask - available_actions for each _action_mask
+    _own_skills - whether each Character of this class is given its own
+                  _skills in __init__, because the class doesn't set all of
+                  them. Such a Character keeps its action tables itself, so
+                  its class needs a __dict__.
+    _playstyle - this Character's Playstyle, or None if it hasn't been
+                 copied from _playstyle_source yet
+    _playstyle_source - the Playstyle that a clone copies its playstyle from
+                        the first time it's used
+
+    Characters are copied at every step of a search, so they keep their
+    attributes in __slots__ instead of a __dict__.
     """
+    __slots__ = ('_name', 'battle_queue', '_playstyle', '_playstyle_source',
+                 '_hp', '_sp', '_defense', '_version', '_action_mask',
+                 'available_actions', 'enemy', '_character_type',
+                 '_current_state', '_current_frame')
     battle_queue: 'BattleQueue'
     playstyle: 'Playstyle'
+    available_actions: Tuple[str, ...]
+    _skills: Dict[str, 'Skill'] = {'A': None,
+                                   'S': None}
+    _action_mask: int
+    _action_bits: Dict[str, int]
+    _sp_thresholds: List[int]
+    _masks_by_level: Tuple[int, ...]
+    _actions_by_mask: Tuple[Tuple[str, ...], ...]
+    _own_skills: bool = True
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """
+        Set up the action tables of cls from its _skills, so that each of its
+        Characters only has to find its _action_mask when its SP changes.
+
+        If cls leaves some of its _skills to be set in __init__, like A2's
+        original Characters did, each of its Characters sets up its own
+        tables once its __init__ has run instead.
+        """
+        super().__init_subclass__(**kwargs)
+        cls._own_skills = None in cls._skills.values()
+        if not cls._own_skills:
+            cls._action_bits, cls._sp_thresholds, cls._masks_by_level, \
+                cls._actions_by_mask = _get_action_tables(cls._skills)
+        elif '__init__' in cls.__dict__:
+            cls.__init__ = _set_up_actions_after(cls.__init__)
 
     def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
         """
@@ -38,14 +140,35 @@ class Character:
         self._hp = 100
         self._sp = 100
         self._defense = 0
+        self._version = 0
+        if self._own_skills:
+            self._skills = dict(self._skills)
+            self._set_up_actions()
+        self._update_actions()
         self.enemy = None
 
         self._character_type = ''
         self._current_state = 'idle'
         self._current_frame = 0
 
-        self._skills = {'A': None,
-                        'S': None}
+    @property
+    def playstyle(self) -> 'Playstyle':
+        """
+        Return the Playstyle that this Character uses to pick actions. A
+        clone copies it for its BattleQueue the first time it's used.
+        """
+        if self._playstyle is None:
+            self._playstyle = self._playstyle_source.copy(self.battle_queue)
+            self._playstyle_source = None
+        return self._playstyle
+
+    @playstyle.setter
+    def playstyle(self, playstyle: 'Playstyle') -> None:
+        """
+        Set the Playstyle that this Character uses to pick actions.
+        """
+        self._playstyle = playstyle
+        self._playstyle_source = None
 
     def get_name(self) -> str:
         """
@@ -71,6 +194,14 @@ class Character:
         """
         return self._defense
 
+    def get_version(self) -> int:
+        """
+        Return the number of times this Character's HP, SP or skill decision
+        tree has been changed, so that results that depend on them can be
+        cached.
+        """
+        return self._version
+
     def get_next_sprite(self) -> str:
         """
         Return the next sprite that needs to be drawn for this Character.
@@ -87,19 +218,59 @@ class Character:
 
         return sprite_to_return
 
+    def get_skill(self, action: str) -> 'Skill':
+        """
+        Return the Skill this Character uses for action.
+        'A' corresponds to attack().
+        'S' corresponds to special_attack().
+        """
+        return self._skills[action]
+
     def get_available_actions(self) -> List[str]:
         """
         Return a list of all actions that this Character can perform.
         'A' means that the character can attack().
         'S' means that the character can special_attack().
+
+        The list is new, so it's the caller's to change. Code that only reads
+        the actions should read available_actions instead.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> bq = BattleQueue()
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c.get_available_actions()
+        ['A', 'S']
+        >>> c.set_sp(5)
+        >>> c.get_available_actions()
+        ['A']
+        >>> c.available_actions
+        ('A',)
         """
-        available = []
+        return list(self.available_actions)
 
-        for skill in self._skills:
-            if self.is_valid_action(skill):
-                available.append(skill)
+    def is_exhausted(self) -> bool:
+        """
+        Return True if this Character can't afford any of its skills, i.e.
+        if it has no available actions.
+        """
+        return not self._action_mask
 
-        return available
+    def _set_up_actions(self) -> None:
+        """
+        Set up this Character's own action tables from its own _skills.
+        """
+        self._action_bits, self._sp_thresholds, self._masks_by_level, \
+            self._actions_by_mask = _get_action_tables(self._skills)
+
+    def _update_actions(self) -> None:
+        """
+        Find the actions that this Character can afford at its current SP.
+        """
+        mask = self._masks_by_level[bisect_right(self._sp_thresholds,
+                                                 self._sp)]
+        self._action_mask = mask
+        self.available_actions = self._actions_by_mask[mask]
 
     def is_valid_action(self, action: str) -> bool:
         """
@@ -108,10 +279,7 @@ class Character:
         'A' corresponds to whether the character can use attack().
         'S' corresponds to whether the character can use special_attack().
         """
-        if action in self._skills:
-            return self._skills[action].get_sp_cost() <= self._sp
-
-        return False
+        return bool(self._action_mask & self._action_bits.get(action, 0))
 
     def attack(self) -> None:
         """
@@ -134,6 +302,18 @@ class Character:
         Reduce this Character's SP by cost.
         """
         self._sp -= cost
+        self._version += 1
+        self._update_actions()
+        self._leave_queue_if_exhausted()
+
+    def _leave_queue_if_exhausted(self) -> None:
+        """
+        Have this Character's BattleQueue purge all of its entries at once if
+        it can't afford any of its skills, instead of skipping them one at a
+        time as they reach the front.
+        """
+        if not self._action_mask:
+            self.battle_queue.purge(self)
 
     def apply_damage(self, damage: int) -> None:
         """
@@ -143,18 +323,23 @@ class Character:
         damage -= self._defense
         self._hp -= damage
         self._hp = max(self._hp, 0)
+        self._version += 1
 
     def set_sp(self, new_sp: int) -> None:
         """
         Sets this Character's SP to new_sp.
         """
         self._sp = new_sp
+        self._version += 1
+        self._update_actions()
+        self._leave_queue_if_exhausted()
 
     def set_hp(self, new_hp: int) -> None:
         """
         Sets this Character's HP to new_hp.
         """
         self._hp = new_hp
+        self._version += 1
 
     def __repr__(self):
         """
@@ -172,6 +357,55 @@ class Character:
         """
         raise NotImplementedError
 
+    def clone(self, new_battle_queue: 'BattleQueue') -> 'Character':
+        """
+        Return a copy of this Character whose BattleQueue is new_battle_queue,
+        like copy, but without calling __init__ or copying the playstyle.
+
+        Only what the game depends on is copied: the name, type, HP, SP and
+        defense. The clone's playstyle is copied for new_battle_queue the
+        first time it's used, so the copies made at every step of a search,
+        which never use their playstyles, never copy them.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> bq = BattleQueue()
+        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> c.set_sp(40)
+        >>> new_bq = BattleQueue()
+        >>> c_clone = c.clone(new_bq)
+        >>> c_clone
+        r (Rogue): 100/40
+        >>> c_clone.get_defense()
+        10
+        >>> c_clone._playstyle is None
+        True
+        >>> c_clone.playstyle.battle_queue is new_bq
+        True
+        """
+        clone = self.__class__.__new__(self.__class__)
+        clone._name = self._name
+        clone.battle_queue = new_battle_queue
+        clone._playstyle = None
+        if self._playstyle is None:
+            clone._playstyle_source = self._playstyle_source
+        else:
+            clone._playstyle_source = self._playstyle
+        clone._hp = self._hp
+        clone._sp = self._sp
+        clone._defense = self._defense
+        clone._version = 0
+        if self._own_skills:
+            clone._skills = self._skills
+            clone._set_up_actions()
+        clone._action_mask = self._action_mask
+        clone.available_actions = self.available_actions
+        clone.enemy = None
+        clone._character_type = self._character_type
+        clone._current_state = 'idle'
+        clone._current_frame = 0
+        return clone
+
     def _set_copy_attributes(self, other: 'Character') -> None:
         """
         Set other's attributes to match this Character's.
@@ -180,226 +414,185 @@ class Character:
         other.set_sp(self._sp)
 
 
-class Mage(Character):
+class SpecCharacter(Character):
     """
-    A class representing a Mage.
+    A Character described by its spec in a2_specs.json. Its defense and
+    skills come from the spec called _spec_type, which is also its type.
 
-    battle_queue - the BattleQueue that this Mage will add to.
-    playstyle - the Playstyle that this Mage uses to pick actions.
-    enemy - the Mage that this Mage attacks.
+    A new kind of character only needs a spec and a subclass that sets
+    _spec_type, or a class from make_character_class.
+
+    _spec_type - the name of the spec for this class of SpecCharacter
     """
-    battle_queue: 'BattleQueue'
-    playstyle: 'Playstyle'
+    __slots__ = ()
+    _skills = {}
+    _spec_type: str
 
-    def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
+    def __init_subclass__(cls, **kwargs) -> None:
         """
-        Initialize this Mage with the name name, battle_queue bq, and
-        playstyle ps.
+        Give cls the skills of its spec.
 
         Extends the super
+        """
+        if '_spec_type' in cls.__dict__:
+            cls._skills = SKILL_TABLE[cls._spec_type]
+        super().__init_subclass__(**kwargs)
 
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> bq = BattleQueue()
-        >>> c = Mage("m", bq, ManualPlaystyle(bq))
-        >>> c2 = Mage("m2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c
-        m (Mage): 100/100
+    def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
+        """
+        Initialize this SpecCharacter with the name name, battle_queue bq,
+        and playstyle ps.
+
+        Extends the super
         """
         super().__init__(name, bq, ps)
-        self._character_type = 'mage'
-        self._skills['A'] = MageAttack()
-        self._skills['S'] = MageSpecial()
-        self._defense = 8
+        self._character_type = self._spec_type
+        self._defense = SPECS['characters'][self._spec_type]['defense']
 
-    def copy(self, new_battle_queue: 'BattleQueue') -> 'Mage':
+    def copy(self, new_battle_queue: 'BattleQueue') -> 'SpecCharacter':
         """
-        Return a copy of this Mage whose BattleQueue is new_battle_queue.
+        Return a copy of this SpecCharacter whose BattleQueue is
+        new_battle_queue.
 
         Overrides the super
-
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> bq = BattleQueue()
-        >>> c = Mage("m", bq, ManualPlaystyle(bq))
-        >>> c2 = Mage("m2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c
-        m (Mage): 100/100
-        >>> new_bq = BattleQueue()
-        >>> c_copy = c.copy(new_bq)
-        >>> c2_copy = c2.copy(new_bq)
-        >>> c_copy.enemy = c2_copy
-        >>> c2_copy.enemy = c_copy
-        >>> c_copy.attack()
-        >>> c
-        m (Mage): 100/100
-        >>> c_copy
-        m (Mage): 100/95
-        >>> c2
-        m2 (Mage): 100/100
-        >>> c2_copy
-        m2 (Mage): 88/100
-        """
-        copy = Mage(self._name, new_battle_queue,
-                    self.playstyle.copy(new_battle_queue))
+        """
+        copy = self.__class__(self._name, new_battle_queue,
+                              self.playstyle.copy(new_battle_queue))
         self._set_copy_attributes(copy)
         return copy
 
 
-class Rogue(Character):
+class Mage(SpecCharacter):
     """
-    A class representing a Rogue.
+    A class representing a Mage.
 
-    battle_queue - the BattleQueue that this Rogue will add to.
-    playstyle - the Playstyle that this Rogue uses to pick actions.
-    enemy - the Rogue that this Rogue attacks.
+    battle_queue - the BattleQueue that this Mage will add to.
+    playstyle - the Playstyle that this Mage uses to pick actions.
+    enemy - the Mage that this Mage attacks.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> c = Mage("m", bq, ManualPlaystyle(bq))
+    >>> c2 = Mage("m2", bq, ManualPlaystyle(bq))
+    >>> c.enemy = c2
+    >>> c2.enemy = c
+    >>> c
+    m (Mage): 100/100
+    >>> new_bq = BattleQueue()
+    >>> c_copy = c.copy(new_bq)
+    >>> c2_copy = c2.copy(new_bq)
+    >>> c_copy.enemy = c2_copy
+    >>> c2_copy.enemy = c_copy
+    >>> c_copy.attack()
+    >>> c
+    m (Mage): 100/100
+    >>> c_copy
+    m (Mage): 100/95
+    >>> c2
+    m2 (Mage): 100/100
+    >>> c2_copy
+    m2 (Mage): 88/100
     """
+    __slots__ = ()
+    _spec_type = 'mage'
     battle_queue: 'BattleQueue'
     playstyle: 'Playstyle'
 
-    def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
-        """
-        Initialize this Rogue with the name name, battle_queue bq, and
-        playstyle ps.
 
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> bq = BattleQueue()
-        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
-        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c
-        r (Rogue): 100/100
-        """
-        super().__init__(name, bq, ps)
-        self._character_type = 'rogue'
-        self._skills['A'] = RogueAttack()
-        self._skills['S'] = RogueSpecial()
-        self._defense = 10
+class Rogue(SpecCharacter):
+    """
+    A class representing a Rogue.
 
-    def copy(self, new_battle_queue: 'BattleQueue') -> 'Rogue':
-        """
-        Return a copy of this Rogue whose BattleQueue is new_battle_queue.
+    battle_queue - the BattleQueue that this Rogue will add to.
+    playstyle - the Playstyle that this Rogue uses to pick actions.
+    enemy - the Rogue that this Rogue attacks.
 
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> bq = BattleQueue()
-        >>> c = Rogue("r", bq, ManualPlaystyle(bq))
-        >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c
-        r (Rogue): 100/100
-        >>> new_bq = BattleQueue()
-        >>> c_copy = c.copy(new_bq)
-        >>> c2_copy = c2.copy(new_bq)
-        >>> c_copy.enemy = c2_copy
-        >>> c2_copy.enemy = c_copy
-        >>> c_copy.attack()
-        >>> c
-        r (Rogue): 100/100
-        >>> c_copy
-        r (Rogue): 100/97
-        >>> c2
-        r2 (Rogue): 100/100
-        >>> c2_copy
-        r2 (Rogue): 95/100
-        """
-        copy = Rogue(self._name, new_battle_queue,
-                     self.playstyle.copy(new_battle_queue))
-        self._set_copy_attributes(copy)
-        return copy
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> c = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> c2 = Rogue("r2", bq, ManualPlaystyle(bq))
+    >>> c.enemy = c2
+    >>> c2.enemy = c
+    >>> c
+    r (Rogue): 100/100
+    >>> new_bq = BattleQueue()
+    >>> c_copy = c.copy(new_bq)
+    >>> c2_copy = c2.copy(new_bq)
+    >>> c_copy.enemy = c2_copy
+    >>> c2_copy.enemy = c_copy
+    >>> c_copy.attack()
+    >>> c
+    r (Rogue): 100/100
+    >>> c_copy
+    r (Rogue): 100/97
+    >>> c2
+    r2 (Rogue): 100/100
+    >>> c2_copy
+    r2 (Rogue): 95/100
+    """
+    __slots__ = ()
+    _spec_type = 'rogue'
+    battle_queue: 'BattleQueue'
+    playstyle: 'Playstyle'
 
 
-class Vampire(Character):
+class Vampire(SpecCharacter):
     """
-    A class representing a Vampire. Inherits from Character.
+    A class representing a Vampire. Inherits from SpecCharacter.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> c = Vampire("m", bq, ManualPlaystyle(bq))
+    >>> c2 = Vampire("m2", bq, ManualPlaystyle(bq))
+    >>> c.enemy = c2
+    >>> c2.enemy = c
+    >>> c
+    m (Vampire): 100/100
+    >>> new_bq = BattleQueue()
+    >>> c_copy = c.copy(new_bq)
+    >>> c2_copy = c2.copy(new_bq)
+    >>> c_copy.enemy = c2_copy
+    >>> c2_copy.enemy = c_copy
+    >>> new_bq
+    <BLANKLINE>
+    >>> c_copy.attack()
+    >>> new_bq
+    m (Vampire): 117/85
+    >>> c
+    m (Vampire): 100/100
+    >>> c_copy
+    m (Vampire): 117/85
+    >>> c2
+    m2 (Vampire): 100/100
+    >>> c2_copy
+    m2 (Vampire): 83/100
+    >>> c2_copy.attack()
+    >>> new_bq
+    m (Vampire): 100/85 -> m2 (Vampire): 100/85
+    >>> c2_copy
+    m2 (Vampire): 100/85
+    >>> c_copy
+    m (Vampire): 100/85
+    >>> c_copy.special_attack()
+    >>> new_bq  # doctest: +NORMALIZE_WHITESPACE
+    m (Vampire): 127/65 -> m2 (Vampire): 73/85 -> m (Vampire): 127/65 ->
+    m (Vampire): 127/65 -> m2 (Vampire): 73/85
     """
+    __slots__ = ()
+    _spec_type = 'vampire'
 
-    def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
-        """
-        Initialize this Vampire with the name name, battle_queue bq, and
-        playstyle ps.
-
-        Extends the super
-
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> bq = BattleQueue()
-        >>> c = Vampire("r", bq, ManualPlaystyle(bq))
-        >>> c2 = Vampire("r2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c
-        r (Vampire): 100/100
-        """
-        super().__init__(name, bq, ps)
-        self._character_type = 'vampire'
-        self._skills['A'] = VampireAttack()
-        self._skills['S'] = VampireSpecial()
-        self._defense = 3
-
-    def copy(self, new_battle_queue: 'BattleQueue') -> 'Vampire':
-        """
-        Return a copy of this Vampire whose BattleQueue is new_battle_queue.
-
-        Overrides the super
 
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> bq = BattleQueue()
-        >>> c = Vampire("m", bq, ManualPlaystyle(bq))
-        >>> c2 = Vampire("m2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c
-        m (Vampire): 100/100
-        >>> new_bq = BattleQueue()
-        >>> c_copy = c.copy(new_bq)
-        >>> c2_copy = c2.copy(new_bq)
-        >>> c_copy.enemy = c2_copy
-        >>> c2_copy.enemy = c_copy
-        >>> new_bq
-        <BLANKLINE>
-        >>> c_copy.attack()
-        >>> new_bq
-        m (Vampire): 117/85
-        >>> c
-        m (Vampire): 100/100
-        >>> c_copy
-        m (Vampire): 117/85
-        >>> c2
-        m2 (Vampire): 100/100
-        >>> c2_copy
-        m2 (Vampire): 83/100
-        >>> c2_copy.attack()
-        >>> new_bq
-        m (Vampire): 100/85 -> m2 (Vampire): 100/85
-        >>> c2_copy
-        m2 (Vampire): 100/85
-        >>> c_copy
-        m (Vampire): 100/85
-        >>> c_copy.special_attack()
-        >>> new_bq
-        m (Vampire): 127/65 -> m2 (Vampire): 73/85 -> m (Vampire): 127/65 -> m (Vampire): 127/65 -> m2 (Vampire): 73/85
-        """
-        copy = Vampire(self._name, new_battle_queue,
-                       self.playstyle.copy(new_battle_queue))
-        self._set_copy_attributes(copy)
-        return copy
-
-
-class Sorcerer(Character):
+class Sorcerer(SpecCharacter):
     """
-    A class representing a Sorcerer. Inherits from Charater.
+    A class representing a Sorcerer. Inherits from SpecCharacter.
 
     tree - a skill decision tree for this Sorcerer
     """
+    __slots__ = ('tree',)
+    _spec_type = 'sorcerer'
     tree: Union[None, 'SkillDecisionTree']
 
     def __init__(self, name: str, bq: 'BattleQueue', ps: 'Playstyle') -> None:
@@ -420,12 +613,28 @@ class Sorcerer(Character):
         r (Sorcerer): 100/100
         """
         super().__init__(name, bq, ps)
-        self._character_type = 'sorcerer'
-        self._skills['A'] = SorcererAttack()
-        self._skills['S'] = SorcererSpecial()
-        self._defense = 10
         self.tree = None
 
+    def clone(self, new_battle_queue: 'BattleQueue') -> 'Sorcerer':
+        """
+        Return a copy of this Sorcerer whose BattleQueue is new_battle_queue,
+        sharing its skill decision tree, as described in Character.clone.
+
+        Extends the super
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> from a2_skill_decision_tree import create_default_tree
+        >>> bq = BattleQueue()
+        >>> c = Sorcerer("s", bq, ManualPlaystyle(bq))
+        >>> c.set_skill_decision_tree(create_default_tree())
+        >>> c.clone(BattleQueue()).tree is c.tree
+        True
+        """
+        clone = super().clone(new_battle_queue)
+        clone.tree = self.tree
+        return clone
+
     def set_skill_decision_tree(self, tree) -> None:
         """
         Set a skill decision tree tree for this Sorcecer character.
@@ -447,13 +656,14 @@ class Sorcerer(Character):
         5
         """
         self.tree = tree
+        self._version += 1
         return None
 
     def copy(self, new_battle_queue: 'BattleQueue') -> 'Sorcerer':
         """
         Return a copy of this Sorcerer whose BattleQueue is new_battle_queue.
 
-        Overrides the super
+        Extends the super
 
         >>> from a2_battle_queue import BattleQueue
         >>> from a2_playstyle import ManualPlaystyle
@@ -482,13 +692,35 @@ class Sorcerer(Character):
         >>> r_copy
         r (Rogue): 90/100
         """
-        copy = Sorcerer(self._name, new_battle_queue,
-                        self.playstyle.copy(new_battle_queue))
+        copy = super().copy(new_battle_queue)
         copy.tree = self.tree
-        self._set_copy_attributes(copy)
         return copy
 
 
+def make_character_class(spec_type: str) -> type:
+    """
+    Return a new SpecCharacter class for the character spec spec_type. It's
+    a Sorcerer if any of its skills use a skill decision tree.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> Imp = make_character_class('vampire')
+    >>> bq = BattleQueue()
+    >>> c = Imp("i", bq, ManualPlaystyle(bq))
+    >>> c
+    i (Vampire): 100/100
+    >>> c.get_skill('A') is VampireAttack()
+    True
+    """
+    name = spec_type[0].upper() + spec_type[1:]
+    # Characters whose skills use a skill decision tree need one to use.
+    if any(skill.uses_tree() for skill in SKILL_TABLE[spec_type].values()):
+        base = Sorcerer
+    else:
+        base = SpecCharacter
+    return type(name, (base,), {'__slots__': (), '_spec_type': spec_type})
+
+
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config='a2_pyta.txt')
@@ -0,0 +1,92 @@
+"""
+The Checkpoint class for A2.
+
+A Checkpoint is a file that a long running search saves its progress to, so
+that the search can be resumed after a crash or restart instead of starting
+over.
+"""
+import os
+import pickle
+from typing import Any
+
+
+class Checkpoint:
+    """
+    A class representing a Checkpoint file.
+
+    path - the file that progress is saved to.
+    interval - the number of states searched between two saves.
+    """
+    path: str
+    interval: int
+
+    def __init__(self, path: str, interval: int = 10000) -> None:
+        """
+        Initialize this Checkpoint to save to path every interval states.
+
+        >>> c = Checkpoint('solve.ckpt')
+        >>> c.interval
+        10000
+        """
+        self.path = path
+        self.interval = interval
+
+    def save(self, key: Any, data: Any) -> None:
+        """
+        Save data to this Checkpoint's file, replacing any earlier save.
+        key identifies the search that data belongs to.
+
+        The file is written under a temporary name first, so a crash while
+        saving leaves the previous save intact.
+
+        >>> import os, tempfile
+        >>> c = Checkpoint(os.path.join(tempfile.mkdtemp(), 'solve.ckpt'))
+        >>> c.save('search', [1, 2, 3])
+        >>> c.load('search')
+        [1, 2, 3]
+        >>> c.discard()
+        """
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump((key, data), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+
+    def load(self, key: Any) -> Any:
+        """
+        Return the data last saved to this Checkpoint for the search key.
+
+        Return None if nothing was saved, or if the save belongs to a
+        different search.
+
+        >>> import os, tempfile
+        >>> c = Checkpoint(os.path.join(tempfile.mkdtemp(), 'solve.ckpt'))
+        >>> print(c.load('search'))
+        None
+        >>> c.save('search', 'progress')
+        >>> print(c.load('another search'))
+        None
+        >>> c.discard()
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, 'rb') as f:
+            saved_key, data = pickle.load(f)
+
+        if saved_key != key:
+            return None
+        return data
+
+    def discard(self) -> None:
+        """
+        Delete this Checkpoint's file, if there is one.
+
+        >>> Checkpoint('missing.ckpt').discard()
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
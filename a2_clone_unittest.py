@@ -0,0 +1,143 @@
+"""
+Unittests for Character.clone in A2.
+
+These tests check that clones play exactly like copies, and that a clone
+only copies its playstyle once the playstyle is used.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import ManualPlaystyle
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue, \
+    PersistentBattleQueue
+from a2_skill_decision_tree import create_default_tree
+
+QUEUE_CLASSES = [BattleQueue, RestrictedBattleQueue, PersistentBattleQueue]
+
+
+class CountingPlaystyle(ManualPlaystyle):
+    """
+    A ManualPlaystyle that counts how many times it and its copies have been
+    copied.
+    """
+
+    def __init__(self, battle_queue, copies=None):
+        """
+        Initialize this CountingPlaystyle, adding its copies to copies.
+        """
+        super().__init__(battle_queue)
+        self.copies = [] if copies is None else copies
+
+    def copy(self, new_battle_queue):
+        """
+        Return a copy of this CountingPlaystyle which uses new_battle_queue.
+        """
+        self.copies.append(new_battle_queue)
+        return CountingPlaystyle(new_battle_queue, self.copies)
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES, both
+    using one CountingPlaystyle.
+    """
+    battle_queue = queue_class()
+    playstyle = CountingPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+def get_game_state(battle_queue):
+    """
+    Return the order of battle_queue and the state of both its players,
+    whichever of them battle_queue counts as its first player.
+    """
+    snapshot = battle_queue.snapshot()
+    return repr(battle_queue), sorted(snapshot[:2]), snapshot[3:]
+
+
+class CloneUnitTests(unittest.TestCase):
+    def test_clone_matches_copy(self):
+        """
+        Test to make sure a clone of each class of character matches its
+        copy at any HP and SP.
+        """
+        rng = random.Random(47)
+        for key in 'mrvs':
+            for _ in range(20):
+                battle_queue = set_up_matchup(key, 'm')
+                character = battle_queue.peek()
+                character.set_hp(rng.randint(0, 100))
+                character.set_sp(rng.randint(0, 100))
+                copy = character.copy(BattleQueue())
+                clone = character.clone(BattleQueue())
+                self.assertIs(type(copy), type(clone))
+                self.assertEqual(repr(copy), repr(clone))
+                self.assertEqual(copy.get_defense(), clone.get_defense())
+                self.assertEqual(copy.get_available_actions(),
+                                 clone.get_available_actions())
+                self.assertEqual(copy.is_exhausted(), clone.is_exhausted())
+                self.assertIs(getattr(copy, 'tree', None),
+                              getattr(clone, 'tree', None))
+                self.assertIsNone(clone.enemy)
+
+    def test_games_on_copies(self):
+        """
+        Test to make sure a game played on a new copy of the queue after
+        every move plays out like the same game on the original queue.
+        """
+        rng = random.Random(7)
+        for queue_class in QUEUE_CLASSES:
+            for _ in range(50):
+                keys = rng.choice('mrvs'), rng.choice('mrvs')
+                expected = set_up_matchup(*keys, queue_class)
+                actual = set_up_matchup(*keys, queue_class)
+                while not expected.is_over():
+                    actual = actual.copy()
+                    self.assertFalse(actual.is_over())
+                    self.assertEqual(get_game_state(expected),
+                                     get_game_state(actual))
+                    move = rng.choice(expected.peek().get_available_actions())
+                    for battle_queue in [expected, actual]:
+                        if move == 'A':
+                            battle_queue.remove().attack()
+                        else:
+                            battle_queue.remove().special_attack()
+                self.assertTrue(actual.is_over())
+                self.assertEqual(get_game_state(expected),
+                                 get_game_state(actual))
+
+    def test_playstyle_is_copied_lazily(self):
+        """
+        Test to make sure copying a queue doesn't copy any playstyles, and
+        that a clone copies its playstyle for its own queue the first time
+        it's used.
+        """
+        for queue_class in QUEUE_CLASSES:
+            battle_queue = set_up_matchup('r', 'v', queue_class)
+            copies = battle_queue.peek().playstyle.copies
+            new_battle_queue = battle_queue
+            for _ in range(10):
+                new_battle_queue = new_battle_queue.copy()
+            self.assertEqual([], copies,
+                             "Copying a queue shouldn't copy playstyles.")
+
+            playstyle = new_battle_queue.peek().playstyle
+            self.assertIs(new_battle_queue, playstyle.battle_queue)
+            self.assertEqual([new_battle_queue], copies)
+            self.assertIs(playstyle, new_battle_queue.peek().playstyle,
+                          "The playstyle should only be copied once.")
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,223 @@
+"""
+The move-dominance rules for A2.
+
+A move is dominated if another available move is proven to score at least as
+much for the player making it. The minimax searches don't search dominated
+moves, since they can't change the score of the state they're made in.
+
+Each rule in DOMINANCE_RULES looks at a state and the states its moves lead
+to, and returns the moves it proves are dominated, each with a ceiling: a
+score that the dominated move can't beat and that a move that isn't
+dominated is known to reach.
+"""
+from typing import Callable, Dict, List, Tuple
+from a2_battle_queue import TeamBattleQueue
+from a2_bounds import get_damage_range, get_score_bounds
+from a2_endgame import solve_endgame
+
+# The states that each available move leads to, each with 1 if the player
+# who made the move moves next in it and -1 otherwise.
+Children = Dict[str, Tuple['BattleQueue', int]]
+
+
+def _has_lifesteal(character: 'Character') -> bool:
+    """
+    Return whether character heals itself with any of its skills.
+    """
+    return any(character.get_skill(action).has_lifesteal()
+               for action in ['A', 'S'])
+
+
+def _can_heal(caster: 'Character', target: 'Character') -> bool:
+    """
+    Return whether caster can heal target by dealing less damage than
+    target's defense.
+    """
+    return any(get_damage_range(caster, action)[0] < target.get_defense()
+               for action in ['A', 'S'])
+
+
+def _get_exact_score(child: 'BattleQueue', sign: int) -> Tuple[bool, int]:
+    """
+    Return whether the score of child is known without searching it, and if
+    so, that score for the player who moved into child.
+    """
+    lower, upper = get_score_bounds(child)
+    if lower != upper:
+        lower = solve_endgame(child)
+    if lower is None:
+        return False, 0
+    return True, lower * sign
+
+
+def kill_rule(battle_queue: 'BattleQueue', children: Children) \
+        -> Dict[str, int]:
+    """
+    Return every move other than a move that wins the game outright, if no
+    move can do better than winning straight away.
+
+    If the target can't gain HP and the player to move can only gain HP by
+    lifesteal, the best the player to move can ever win with is its HP now,
+    plus the target's HP now if it has lifesteal. A move that wins with that
+    much HP dominates every other move. This doesn't hold in a
+    TeamBattleQueue, where a teammate with more HP may win instead.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(r)
+    >>> bq.add(m)
+    >>> r.set_hp(60)
+    >>> m.set_hp(12)
+    >>> kill_rule(bq, get_children(bq))
+    {'A': 60}
+    >>> m.set_hp(13)
+    >>> kill_rule(bq, get_children(bq))
+    {}
+    """
+    if isinstance(battle_queue, TeamBattleQueue):
+        return {}
+    mover = battle_queue.peek()
+    target = mover.enemy
+    if _has_lifesteal(target) or _can_heal(mover, target) or \
+            _can_heal(target, mover):
+        return {}
+
+    best = mover.get_hp()
+    if _has_lifesteal(mover):
+        best += target.get_hp()
+    for move, (child, sign) in children.items():
+        if child.is_over() and _get_exact_score(child, sign) == (True, best):
+            return {other: best for other in children if other != move}
+    return {}
+
+
+def solved_rule(battle_queue: 'BattleQueue', children: Children) \
+        -> Dict[str, int]:
+    """
+    Return every move but the best one, if the moves' scores are known
+    without searching: because the game is over after them, or because only
+    one player can act after them. If only some scores are known, return
+    the other moves only if the best known score reaches the upper bound of
+    get_score_bounds.
+
+    This covers the last move a player can afford: once its SP is spent,
+    only the enemy acts, and solve_endgame scores what's left.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Vampire
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> v = Vampire("v", bq, ManualPlaystyle(bq))
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> v.enemy = r
+    >>> r.enemy = v
+    >>> bq.add(v)
+    >>> bq.add(r)
+    >>> v.set_sp(20)
+    >>> v.set_hp(30)
+    >>> solved_rule(bq, get_children(bq))
+    {'A': -80}
+    """
+    known = {}
+    for move, (child, sign) in children.items():
+        is_known, score = _get_exact_score(child, sign)
+        if is_known:
+            known[move] = score
+    if not known:
+        return {}
+
+    best_move = max(reversed(list(known)), key=lambda move: known[move])
+    best = known[best_move]
+    if len(known) < len(children) and \
+            best < get_score_bounds(battle_queue)[1]:
+        return {}
+    return {move: best for move in children if move != best_move}
+
+
+# The rules find_dominated_moves applies, in order.
+DOMINANCE_RULES: List[Callable[['BattleQueue', Children], Dict[str, int]]] = \
+    [kill_rule, solved_rule]
+
+
+def get_children(battle_queue: 'BattleQueue') -> Children:
+    """
+    Return the states that each move available to the next player in
+    battle_queue leads to, as used by the DOMINANCE_RULES.
+
+    battle_queue itself is not changed.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(r)
+    >>> bq.add(m)
+    >>> children = get_children(bq)
+    >>> children['A']
+    (m (Mage): 93/100 -> r (Rogue): 100/97, -1)
+    >>> children['S']
+    (m (Mage): 88/100 -> r (Rogue): 100/90 -> r (Rogue): 100/90, -1)
+    """
+    children = {}
+    for move in battle_queue.peek().available_actions:
+        child = battle_queue.copy()
+        cur = child.peek()
+        if move == 'A':
+            child.remove().attack()
+        else:
+            child.remove().special_attack()
+        children[move] = (child,
+                          1 if child.same_side(cur, child.peek()) else -1)
+    return children
+
+
+def find_dominated_moves(battle_queue: 'BattleQueue', children: Children) \
+        -> Dict[str, int]:
+    """
+    Return the moves in children that the DOMINANCE_RULES prove are
+    dominated in battle_queue, each mapped to a score that it can't beat and
+    that a move that isn't dominated reaches. At least one move is never
+    dominated.
+
+    children maps each move available to the next player in battle_queue to
+    the state it leads to, and 1 if the same player moves next in that state
+    or -1 otherwise, as returned by get_children.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(r)
+    >>> bq.add(m)
+    >>> find_dominated_moves(bq, get_children(bq))
+    {}
+    >>> m.set_hp(12)
+    >>> find_dominated_moves(bq, get_children(bq))
+    {'A': 100}
+    """
+    if len(children) < 2:
+        return {}
+    for rule in DOMINANCE_RULES:
+        dominated = rule(battle_queue, children)
+        if dominated:
+            return dominated
+    return {}
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
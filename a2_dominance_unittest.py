@@ -0,0 +1,131 @@
+"""
+Unittests for the move-dominance rules in A2.
+
+These tests check that the DOMINANCE_RULES only skip moves that can't change
+the score, and that a search verifying its pruning catches a rule that
+doesn't.
+"""
+import random
+import unittest
+
+import a2_dominance
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import get_state_score, get_state_score_iterative, \
+    ManualPlaystyle, SearchControl, PruningError
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_dominance import find_dominated_moves, get_children
+from a2_frontier import solve_frontier
+from a2_skill_decision_tree import create_default_tree
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+def wrong_rule(battle_queue, children):
+    """
+    A dominance rule that wrongly claims no move but the first can score
+    anything.
+    """
+    return {move: -1000 for move in list(children)[1:]}
+
+
+class DominanceUnitTests(unittest.TestCase):
+    def tearDown(self):
+        """
+        Remove wrong_rule from the DOMINANCE_RULES if a test added it.
+        """
+        if wrong_rule in a2_dominance.DOMINANCE_RULES:
+            a2_dominance.DOMINANCE_RULES.remove(wrong_rule)
+
+    def test_dominated_moves_are_no_better(self):
+        """
+        Test to make sure every dominated move scores at most its ceiling, and
+        a move that isn't dominated scores exactly the ceiling, on random
+        states of both kinds of Battle Queue.
+        """
+        rng = random.Random(33)
+        fired = 0
+        for _ in range(400):
+            queue_class = rng.choice([BattleQueue, RestrictedBattleQueue])
+            battle_queue = set_up_matchup(rng.choice('mrvs'),
+                                          rng.choice('mrvs'), queue_class)
+            p1 = battle_queue.peek()
+            characters = [p1, p1.enemy]
+            for character in characters:
+                character.set_hp(rng.randint(1, 100))
+                character.set_sp(rng.randint(0, 60))
+            for _ in range(rng.randint(0, 4)):
+                battle_queue.add(rng.choice(characters))
+            if battle_queue.is_over():
+                continue
+
+            children = get_children(battle_queue)
+            dominated = find_dominated_moves(battle_queue, children)
+            if not dominated:
+                continue
+            fired += 1
+            scores = {move: get_state_score(child,
+                                            SearchControl(prune=False)) * sign
+                      for move, (child, sign) in children.items()}
+            best_kept = max(score for move, score in scores.items()
+                            if move not in dominated)
+            for move, ceiling in dominated.items():
+                self.assertLessEqual(scores[move], ceiling,
+                                     ("In:\n{}\n{} was dominated with the " +
+                                      "ceiling {} but scores {}.").format(
+                                          battle_queue, move, ceiling,
+                                          scores[move]))
+                self.assertEqual(ceiling, best_kept)
+        self.assertGreater(fired, 50)
+
+    def test_searches_skip_dominated_moves(self):
+        """
+        Test to make sure both searches skip dominated moves, pass
+        verification, and find the same score as a search without pruning.
+        """
+        for p1_key, p2_key in [('r', 'm'), ('v', 'r'), ('m', 's')]:
+            for queue_class in [BattleQueue, RestrictedBattleQueue]:
+                battle_queue = set_up_matchup(p1_key, p2_key, queue_class)
+                battle_queue.peek().set_sp(40)
+                expected = solve_frontier(battle_queue)
+                for search in [get_state_score, get_state_score_iterative]:
+                    control = SearchControl(verify=True)
+                    actual = search(battle_queue, control)
+                    self.assertEqual(expected, actual,
+                                     ("{} on:\n{}\nShould return {} but " +
+                                      "got {} instead.").format(
+                                          search.__name__, battle_queue,
+                                          expected, actual))
+                    self.assertGreater(control.dominated, 0)
+
+    def test_verify_catches_wrong_rule(self):
+        """
+        Test to make sure verifying searches raise PruningError when a rule
+        skips a move that would have scored more.
+        """
+        a2_dominance.DOMINANCE_RULES.insert(0, wrong_rule)
+        battle_queue = set_up_matchup('r', 'm')
+        battle_queue.peek().set_sp(20)
+        for search in [get_state_score, get_state_score_iterative]:
+            with self.assertRaises(PruningError):
+                search(battle_queue, SearchControl(verify=True))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
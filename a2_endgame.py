@@ -0,0 +1,114 @@
+"""
+The single-actor endgame solver for A2.
+
+Once a character's SP drops below the cost of all of its skills, it has no
+actions available, so the BattleQueue skips it every time it reaches the
+front. SP never goes back up, so from then on only its enemy ever acts. In a
+BattleQueue every skill adds its caster back, so the enemy keeps acting until
+the target has no HP left or the enemy runs out of SP, and the order of the
+queue no longer matters.
+
+solve_endgame finds the score of these states from the HP, SP, skills and
+defense of the two characters alone, instead of searching every order in
+which the last character could use its skills.
+"""
+from typing import Union
+from a2_battle_queue import RestrictedBattleQueue, TeamBattleQueue
+
+
+def get_max_damage(sp: int, costs: tuple, damages: tuple) -> int:
+    """
+    Return the most damage that a character with sp SP can deal by using
+    skills that cost costs SP and deal damages damage each, as many times as
+    each.
+
+    Every cost must be positive. Any set of skills whose costs add up to at
+    most sp can all be used, by using the most expensive ones first.
+
+    >>> get_max_damage(100, (3, 10), (7, 12))
+    231
+    >>> get_max_damage(12, (5, 30), (12, 32))
+    24
+    >>> get_max_damage(2, (5, 30), (12, 32))
+    0
+    """
+    (cost_1, cost_2), (damage_1, damage_2) = costs, damages
+    best = 0
+    for uses_2 in range(sp // cost_2 + 1):
+        uses_1 = (sp - uses_2 * cost_2) // cost_1
+        best = max(best, uses_1 * damage_1 + uses_2 * damage_2)
+    return best
+
+
+def solve_endgame(battle_queue: 'BattleQueue') -> Union[None, int]:
+    """
+    Return the score that the next player in battle_queue can guarantee, as
+    described in get_state_score, if the next player is the only one who can
+    still act.
+
+    Return None if both players can still act, the game is over, or the
+    score can't be found without searching: in a RestrictedBattleQueue, which
+    may refuse to add the next player back, in a TeamBattleQueue, where
+    other characters fight on, or when the next player's damage depends on a
+    skill decision tree.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage, Vampire
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(m)
+    >>> bq.add(r)
+    >>> print(solve_endgame(bq))
+    None
+    >>> r.set_hp(40)
+    >>> m.set_hp(50)
+    >>> m.set_sp(4)
+    >>> solve_endgame(bq)
+    40
+    >>> r.set_sp(6)
+    >>> solve_endgame(bq)
+    0
+    >>> bq = BattleQueue()
+    >>> v = Vampire("v", bq, ManualPlaystyle(bq))
+    >>> v.enemy = r
+    >>> r.enemy = v
+    >>> bq.add(v)
+    >>> v.set_hp(30)
+    >>> r.set_hp(20)
+    >>> r.set_sp(2)
+    >>> solve_endgame(bq)
+    50
+    """
+    if isinstance(battle_queue, (RestrictedBattleQueue, TeamBattleQueue)) or \
+            battle_queue.is_over():
+        return None
+    actor = battle_queue.peek()
+    target = actor.enemy
+    if target.available_actions:
+        return None
+
+    skills = [actor.get_skill(action) for action in ['A', 'S']]
+    costs = tuple(skill.get_sp_cost() for skill in skills)
+    damages = tuple(skill.get_damage() - target.get_defense()
+                    for skill in skills)
+    lifesteal = [skill.has_lifesteal() for skill in skills]
+    if any(skill.uses_tree() for skill in skills) or \
+            min(costs) <= 0 or min(damages) < 0 or \
+            any(lifesteal) != all(lifesteal):
+        return None
+
+    if get_max_damage(actor.get_sp(), costs, damages) < target.get_hp():
+        return 0
+    if all(lifesteal):
+        # Every point of HP the target loses heals the actor.
+        return actor.get_hp() + target.get_hp()
+    return actor.get_hp()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
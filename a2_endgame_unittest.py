@@ -0,0 +1,111 @@
+"""
+Unittests for the single-actor endgame solver in A2.
+
+These tests check that solve_endgame scores the states it can solve exactly
+like a full search, and that the minimax searches use it as a leaf.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import get_state_score, get_state_score_iterative, \
+    ManualPlaystyle, SearchControl, search_mtdf
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_endgame import solve_endgame
+from a2_frontier import solve_frontier
+from a2_skill_decision_tree import create_default_tree
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+class EndgameUnitTests(unittest.TestCase):
+    def test_matches_full_search(self):
+        """
+        Test to make sure solve_endgame gives the score of a full search on
+        random states where the second player can't act any more.
+        """
+        rng = random.Random(31)
+        solved = 0
+        for _ in range(300):
+            battle_queue = set_up_matchup(rng.choice('mrv'),
+                                          rng.choice('mrvs'))
+            p1 = battle_queue.peek()
+            p1.set_hp(rng.randint(1, 100))
+            p1.set_sp(rng.randint(0, 100))
+            p1.enemy.set_hp(rng.randint(1, 100))
+            p1.enemy.set_sp(rng.randint(0, 2))
+            for _ in range(rng.randint(0, 4)):
+                battle_queue.add(rng.choice([p1, p1.enemy]))
+
+            actual = solve_endgame(battle_queue)
+            if battle_queue.is_over():
+                self.assertIsNone(actual)
+                continue
+            expected = solve_frontier(battle_queue)
+            self.assertEqual(expected, actual,
+                             ("solve_endgame on:\n{}\nShould return {} but " +
+                              "got {} instead.").format(battle_queue,
+                                                        expected, actual))
+            solved += 1
+        self.assertGreater(solved, 200)
+
+    def test_unsolved_states(self):
+        """
+        Test to make sure solve_endgame leaves the states it can't solve to
+        the search.
+        """
+        battle_queue = set_up_matchup('r', 'm')
+        self.assertIsNone(solve_endgame(battle_queue),
+                          "Both players can still act.")
+
+        battle_queue.peek().enemy.set_sp(0)
+        self.assertEqual(100, solve_endgame(battle_queue))
+        self.assertIsNone(solve_endgame(BattleQueue()),
+                          "An empty Battle Queue is over.")
+
+        sorcerer = set_up_matchup('s', 'r')
+        sorcerer.peek().enemy.set_sp(0)
+        self.assertIsNone(solve_endgame(sorcerer),
+                          "A Sorcerer's attack depends on its tree.")
+
+        restricted = set_up_matchup('r', 'm', RestrictedBattleQueue)
+        restricted.peek().enemy.set_sp(0)
+        self.assertIsNone(solve_endgame(restricted),
+                          "A RestrictedBattleQueue may refuse the actor.")
+
+    def test_searches_use_endgames(self):
+        """
+        Test to make sure every search scores single-actor states with
+        solve_endgame, and still finds the score of a full search.
+        """
+        battle_queue = set_up_matchup('r', 'v')
+        battle_queue.peek().set_sp(60)
+        expected = solve_frontier(battle_queue)
+        for search in [get_state_score, get_state_score_iterative,
+                       lambda bq, control: search_mtdf(bq, 0, None,
+                                                       control)[0]]:
+            control = SearchControl()
+            self.assertEqual(expected, search(battle_queue, control))
+            self.assertGreater(control.endgames, 0,
+                               "The search should have used solve_endgame.")
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -0,0 +1,351 @@
+"""
+The level-synchronous frontier solver for A2.
+
+solve_frontier finds the same score as get_state_score in a2_playstyle, but
+instead of searching one BattleQueue at a time, it keeps every state at the
+same depth of the game in NumPy arrays, moves them all forward together, and
+merges states that are equal before going a level deeper. Scores are then
+backed up one level at a time, from the deepest level to the first.
+
+Each state is one row of an int array: the HP and SP of both players, then
+the queue packed into bits. Bit i of the order is the player at position i
+of the queue (0 for the first player, 1 for the second) and bit i of the
+flags is whether that entry is able to add (RestrictedBattleQueue only).
+"""
+from typing import List
+import numpy as np
+from a2_battle_queue import RestrictedBattleQueue
+from a2_playstyle import get_state_score
+from a2_skills import SpecSkill
+
+# The columns of a state.
+HP = 0
+SP = 2
+ORDER = 4
+LENGTH = 5
+FLAGS = 6
+COLUMNS = 7
+
+# The longest queue that the packed order and flags can hold.
+MAX_QUEUE_LENGTH = 62
+
+MOVES = ['A', 'S']
+
+
+class FrontierSolver:
+    """
+    A class representing the solver for one game, found by solve_frontier.
+
+    restricted - whether the game is played in a RestrictedBattleQueue.
+    players - the first and second player of the game. Only their skills,
+              defense and skill decision trees are used.
+    _costs - the SP cost of each move in MOVES, for each player.
+    """
+    restricted: bool
+    players: List['Character']
+    _costs: List[List[int]]
+
+    def __init__(self, battle_queue: 'BattleQueue') -> None:
+        """
+        Initialize this FrontierSolver for the game in battle_queue, which
+        must not be over.
+
+        Raise ValueError if a player uses a Skill this solver doesn't know.
+        """
+        self.restricted = isinstance(battle_queue, RestrictedBattleQueue)
+        snapshot = battle_queue.snapshot()
+        front = battle_queue.peek()
+        if snapshot[2][0] == 0:
+            self.players = [front, front.enemy]
+        else:
+            self.players = [front.enemy, front]
+
+        for player in self.players:
+            for move in MOVES:
+                if not isinstance(player.get_skill(move), SpecSkill):
+                    raise ValueError("{} can't be solved by solve_frontier"
+                                     .format(type(player.get_skill(move))
+                                             .__name__))
+
+        self._costs = [[player.get_skill(move).get_sp_cost()
+                        for move in MOVES] for player in self.players]
+        self._min_cost = np.array([min(costs) for costs in self._costs])
+        self._tree_damage = {}
+
+        root = np.zeros((1, COLUMNS), dtype=np.int64)
+        for i, (_, _, hp, sp) in enumerate(snapshot[:2]):
+            root[0, HP + i] = hp
+            root[0, SP + i] = sp
+        for position, i in enumerate(snapshot[2]):
+            root[0, ORDER] |= i << position
+        root[0, LENGTH] = len(snapshot[2])
+        if self.restricted:
+            for position, able in enumerate(snapshot[3]):
+                root[0, FLAGS] |= int(able) << position
+        self._check_length(root)
+        self._root = root
+
+    def solve(self) -> int:
+        """
+        Return the score that the next player of this FrontierSolver's game
+        can guarantee.
+        """
+        frontier = self._root
+        levels = []
+        while len(frontier) > 0:
+            over = self._is_over(frontier)
+            front = frontier[:, ORDER] & 1
+            parents, children = [], []
+            for k in [0, 1]:
+                sp = frontier[:, SP + k]
+                acting = ~over & (front == k)
+                for move, cost in zip(MOVES, self._costs[k]):
+                    rows = np.nonzero(acting & (sp >= cost))[0]
+                    if rows.size > 0:
+                        parents.append(rows)
+                        children.append(self._move(frontier[rows], k, move))
+
+            scores = self._terminal_scores(frontier)
+            if not children:
+                levels.append((over, scores, None, None, None))
+                break
+            parents = np.concatenate(parents)
+            children = np.concatenate(children)
+            self._clean(children)
+            self._check_length(children)
+            signs = self._signs(frontier[parents, ORDER] & 1, children)
+            frontier, inverse = np.unique(children, axis=0,
+                                          return_inverse=True)
+            levels.append((over, scores, parents, inverse.reshape(-1), signs))
+
+        child_scores = None
+        for over, scores, parents, inverse, signs in reversed(levels):
+            level_scores = np.where(over, scores, -np.inf)
+            if parents is not None:
+                np.maximum.at(level_scores, parents,
+                              signs * child_scores[inverse])
+            child_scores = level_scores
+        return int(child_scores[0])
+
+    def _move(self, states: np.ndarray, k: int, move: str,
+              act_first: bool = False) -> np.ndarray:
+        """
+        Return the states after player k, at the front of each of states,
+        is removed from the queue and uses move on the other player.
+
+        If act_first, player k uses move first, and is then removed from the
+        front of the queue if it can still act, like a2_game.perform_attack
+        plays a turn, instead of being removed first like the searches do.
+        """
+        states = states.copy()
+        t = 1 - k
+        skill = self.players[k].get_skill(move)
+
+        if skill.uses_tree():
+            damage = self._get_tree_damage(states, k)
+        else:
+            damage = skill.get_damage()
+        defense = self.players[t].get_defense()
+
+        if not act_first:
+            self._pop(states)
+
+        states[:, SP + k] -= skill.get_sp_cost()
+        target_hp = states[:, HP + t].copy()
+        states[:, HP + t] = np.maximum(target_hp - (damage - defense), 0)
+        if skill.has_lifesteal():
+            states[:, HP + k] += np.where(states[:, HP + t] == 0, target_hp,
+                                          damage - defense)
+
+        for effect in skill.get_effects():
+            if effect == 'clear':
+                states[:, ORDER] = 0
+                states[:, FLAGS] = 0
+                states[:, LENGTH] = 0
+            elif effect == 'add_caster':
+                self._add(states, k)
+            elif effect == 'add_target':
+                self._add(states, t)
+
+        if act_first:
+            # A player that can't act any more is skipped once it's at the
+            # front instead.
+            can_act = np.nonzero(states[:, SP + k] >= self._min_cost[k])[0]
+            acted = states[can_act]
+            self._clean(acted)
+            self._pop(acted)
+            states[can_act] = acted
+        return states
+
+    @staticmethod
+    def _pop(states: np.ndarray) -> None:
+        """
+        Remove the entry at the front of the queue of each of states that
+        isn't empty.
+        """
+        full = states[:, LENGTH] > 0
+        states[full, ORDER] >>= 1
+        states[full, FLAGS] >>= 1
+        states[full, LENGTH] -= 1
+
+    def _get_tree_damage(self, states: np.ndarray, k: int) -> np.ndarray:
+        """
+        Return the damage of the skill that the skill decision tree of
+        player k picks in each of states.
+        """
+        caster, target = self.players[k], self.players[1 - k]
+        keys = np.stack([states[:, HP + k], states[:, SP + k],
+                         states[:, HP + 1 - k], states[:, SP + 1 - k]],
+                        axis=1)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        damage = np.empty(len(unique), dtype=np.int64)
+        for i, key in enumerate(map(tuple, unique.tolist())):
+            if (k,) + key not in self._tree_damage:
+                caster.set_hp(key[0])
+                caster.set_sp(key[1])
+                target.set_hp(key[2])
+                target.set_sp(key[3])
+                self._tree_damage[(k,) + key] = \
+                    caster.tree.pick_skill(caster, target).get_damage()
+            damage[i] = self._tree_damage[(k,) + key]
+        return damage[inverse.reshape(-1)]
+
+    def _add(self, states: np.ndarray, i: int) -> None:
+        """
+        Add player i to the back of the queue of each of states, following the
+        rules of this FrontierSolver's kind of BattleQueue.
+        """
+        length = states[:, LENGTH]
+        bit = np.left_shift(1, length)
+        if not self.restricted:
+            states[:, ORDER] |= i * bit
+            states[:, LENGTH] += 1
+            return
+
+        order, flags = states[:, ORDER], states[:, FLAGS]
+        same = (order if i == 1 else ~order) & (bit - 1)
+        present = same != 0
+        front_is_i = (order & 1) == i
+        flag = np.where(present,
+                        front_is_i & (np.bitwise_count(same & flags) < 2),
+                        True)
+        added = ~present | ((flags & 1) == 1)
+        states[added, ORDER] |= i * bit[added]
+        states[added, FLAGS] |= flag[added] * bit[added]
+        states[added, LENGTH] += 1
+
+    def _clean(self, states: np.ndarray) -> None:
+        """
+        Remove every entry from the front of the queue of each of states whose
+        player has no actions available.
+        """
+        while True:
+            front = states[:, ORDER] & 1
+            sp = np.where(front == 0, states[:, SP], states[:, SP + 1])
+            stuck = (states[:, LENGTH] > 0) & (sp < self._min_cost[front])
+            if not stuck.any():
+                return
+            states[stuck, ORDER] >>= 1
+            states[stuck, FLAGS] >>= 1
+            states[stuck, LENGTH] -= 1
+
+    def _signs(self, movers: np.ndarray, children: np.ndarray) -> np.ndarray:
+        """
+        Return 1 for each of children whose next player is the one in movers
+        who moved into it, and -1 otherwise.
+        """
+        if self.restricted:
+            # An empty RestrictedBattleQueue's next player is the one who
+            # emptied it.
+            empty_next = movers
+        else:
+            empty_next = np.zeros_like(movers)
+        next_players = np.where(children[:, LENGTH] > 0,
+                                children[:, ORDER] & 1, empty_next)
+        return np.where(next_players == movers, 1, -1)
+
+    @staticmethod
+    def _is_over(states: np.ndarray) -> np.ndarray:
+        """
+        Return whether the game in each of states is over.
+        """
+        return (states[:, LENGTH] == 0) | (states[:, HP] == 0) | \
+            (states[:, HP + 1] == 0)
+
+    def _winners(self, states: np.ndarray) -> np.ndarray:
+        """
+        Return the player who won the game in each of states as if it was
+        over, or -1 if nobody did, following the rules of get_winner.
+        """
+        hp_0, hp_1 = states[:, HP], states[:, HP + 1]
+        winner = np.where(hp_0 == 0, 1, 0)
+        won = (hp_0 == 0) | (hp_1 == 0)
+        if self.restricted:
+            # The winner of a RestrictedBattleQueue must still be in it.
+            order = states[:, ORDER]
+            winner_entries = np.where(winner == 1, order, ~order) & \
+                (np.left_shift(1, states[:, LENGTH]) - 1)
+            won &= winner_entries != 0
+        return np.where(won, winner, -1)
+
+    def _terminal_scores(self, states: np.ndarray) -> np.ndarray:
+        """
+        Return the score of each of states as if its game was over, as
+        described in get_state_score.
+        """
+        winner = self._winners(states)
+        if self.restricted:
+            first = states[:, ORDER] & 1
+        else:
+            first = np.where(states[:, LENGTH] > 0, states[:, ORDER] & 1, 0)
+        winner_hp = np.where(winner == 0, states[:, HP], states[:, HP + 1])
+        return np.where(winner >= 0,
+                        np.where(winner == first, winner_hp, -winner_hp),
+                        0).astype(np.float64)
+
+    def _check_length(self, states: np.ndarray) -> None:
+        """
+        Raise ValueError if any queue in states is too long to be packed.
+        """
+        if len(states) > 0 and states[:, LENGTH].max() > MAX_QUEUE_LENGTH:
+            raise ValueError("queues longer than {} can't be solved by "
+                             "solve_frontier".format(MAX_QUEUE_LENGTH))
+
+
+def solve_frontier(battle_queue: 'BattleQueue') -> int:
+    """
+    Return the score that the next player in battle_queue can guarantee, as
+    described in get_state_score.
+
+    Raise ValueError if battle_queue holds a character with a Skill that
+    isn't one of the skills in a2_skills, or a queue gets longer than
+    MAX_QUEUE_LENGTH.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(m)
+    >>> bq.add(r)
+    >>> r.set_hp(50)
+    >>> m.set_hp(50)
+    >>> solve_frontier(bq)
+    26
+    >>> r.set_hp(100)
+    >>> m.set_hp(100)
+    >>> solve_frontier(bq)
+    -10
+    """
+    bq = battle_queue.copy()
+    if bq.is_over():
+        return get_state_score(battle_queue)
+    return FrontierSolver(bq).solve()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
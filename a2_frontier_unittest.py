@@ -0,0 +1,127 @@
+"""
+Unittests for the level-synchronous frontier solver in A2.
+
+These tests check that solve_frontier finds exactly the same score as
+get_state_score, for every character class and both kinds of BattleQueue.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import get_state_score, ManualPlaystyle, search_mtdf
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_characters import make_character_class
+from a2_frontier import solve_frontier
+from a2_skills import SKILL_TABLE, make_skill
+from a2_skill_decision_tree import create_default_tree
+from a2_specs import SPECS
+
+# A character whose special attack is cheaper than its attack.
+MONK_SKILLS = {'Heavy': {'cost': 20, 'damage': 30, 'effects': ['add_caster']},
+               'Jab': {'cost': 2, 'damage': 12, 'effects': ['add_caster']}}
+MONK = {'defense': 5, 'skills': {'A': 'Heavy', 'S': 'Jab'}}
+
+
+class FrontierUnitTests(unittest.TestCase):
+    def set_up_game(self, p1_key, p2_key, queue_class):
+        """
+        Return a queue_class holding a new character of class p1_key followed
+        by a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+        """
+        battle_queue = queue_class()
+        playstyle = ManualPlaystyle(battle_queue)
+        p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+        p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+        for key, character in [(p1_key, p1), (p2_key, p2)]:
+            if key == 's':
+                character.set_skill_decision_tree(create_default_tree())
+        p1.enemy = p2
+        p2.enemy = p1
+        battle_queue.add(p1)
+        battle_queue.add(p2)
+        return battle_queue
+
+    def test_random_positions(self):
+        """
+        Test to make sure solve_frontier agrees with get_state_score on random
+        positions, including ones where the game is already over.
+        """
+        rng = random.Random(30)
+        for _ in range(150):
+            queue_class = rng.choice([BattleQueue, RestrictedBattleQueue])
+            battle_queue = self.set_up_game(rng.choice('mrvs'),
+                                            rng.choice('mrvs'), queue_class)
+            p1 = battle_queue.peek()
+            characters = [p1, p1.enemy]
+            for character in characters:
+                character.set_hp(rng.randint(0, 100))
+                character.set_sp(rng.randint(0, 45))
+            for _ in range(rng.randint(0, 5)):
+                battle_queue.add(rng.choice(characters))
+
+            bq = repr(battle_queue)
+            expected = get_state_score(battle_queue)
+            actual = solve_frontier(battle_queue)
+            self.assertEqual(expected, actual,
+                             ("solve_frontier on the {} that looks like:" +
+                              "\n{}\nShould return the score {} but got {} " +
+                              "instead.").format(queue_class.__name__, bq,
+                                                 expected, actual))
+            self.assertEqual(bq, repr(battle_queue),
+                             "solve_frontier should not change its input.")
+
+    def test_cheaper_special(self):
+        """
+        Test to make sure solve_frontier only lets a character use the
+        actions it can afford, when its special attack is cheaper than its
+        attack.
+        """
+        SPECS['skills'].update(MONK_SKILLS)
+        SPECS['characters']['monk'] = MONK
+        SKILL_TABLE['monk'] = {action: make_skill(name)
+                               for action, name in MONK['skills'].items()}
+        for name in MONK_SKILLS:
+            self.addCleanup(SPECS['skills'].pop, name)
+        self.addCleanup(SPECS['characters'].pop, 'monk')
+        self.addCleanup(SKILL_TABLE.pop, 'monk')
+        monk_class = make_character_class('monk')
+
+        for key in 'mrvs':
+            for queue_class in [BattleQueue, RestrictedBattleQueue]:
+                battle_queue = queue_class()
+                playstyle = ManualPlaystyle(battle_queue)
+                monk = monk_class("P1", battle_queue, playstyle)
+                enemy = CHARACTER_CLASSES[key]("P2", battle_queue, playstyle)
+                if key == 's':
+                    enemy.set_skill_decision_tree(create_default_tree())
+                monk.enemy = enemy
+                enemy.enemy = monk
+                battle_queue.add(monk)
+                battle_queue.add(enemy)
+                for sp in [12, 25]:
+                    monk.set_sp(sp)
+                    expected = get_state_score(battle_queue)
+                    actual = solve_frontier(battle_queue)
+                    self.assertEqual(expected, actual,
+                                     ("solve_frontier on:\n{}\nShould " +
+                                      "return {} but got {} instead.").format(
+                                          battle_queue, expected, actual))
+
+    def test_full_games(self):
+        """
+        Test to make sure solve_frontier solves whole games from full HP and
+        SP.
+        """
+        for p1_key, p2_key in [('r', 'm'), ('v', 'r'), ('s', 'v')]:
+            for queue_class in [BattleQueue, RestrictedBattleQueue]:
+                battle_queue = self.set_up_game(p1_key, p2_key, queue_class)
+                expected = search_mtdf(battle_queue)[0]
+                actual = solve_frontier(battle_queue)
+                self.assertEqual(expected, actual,
+                                 ("solve_frontier on:\n{}\nShould return " +
+                                  "{} but got {} instead.").format(
+                                      battle_queue, expected, actual))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
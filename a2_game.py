@@ -9,9 +9,10 @@ Do NOT run PythonTA on this file.
 We will not grade the documentation of this file.
 """
 # Import classes as needed
-from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue, \
+    TeamBattleQueue, MAX_TEAM_SIZE
 from a2_playstyle import ManualPlaystyle, RandomPlaystyle, RecursiveMinimax, \
-    IterativeMinimax
+    IterativeMinimax, BudgetedPlaystyle, MTDfMinimax
 from a2_characters import Mage, Rogue, Vampire, Sorcerer
 from a2_skill_decision_tree import create_default_tree
 
@@ -29,10 +30,13 @@ CHARACTER_CLASSES = {'m': Mage,
 PLAYSTYLE_CLASSES = {'m': ManualPlaystyle,
                      'r': RandomPlaystyle,
                      'mr': RecursiveMinimax,
-                     'mi': IterativeMinimax}
+                     'mi': IterativeMinimax,
+                     'mb': BudgetedPlaystyle,
+                     'mf': MTDfMinimax}
 
 BATTLE_QUEUE_CLASSES = {'n': BattleQueue,
-                        'r': RestrictedBattleQueue}
+                        'r': RestrictedBattleQueue,
+                        't': TeamBattleQueue}
 
 # Do not change any of the code below
 # You may NOT use or modify any of the variables defined below within your code
@@ -75,7 +79,7 @@ def perform_attack():
         # Call remove() to remove the next_character from the battle_queue
         # (if they still have SP; otherwise the next call to remove()
         # should skip them)
-        if next_character.get_available_actions() != []:
+        if next_character.available_actions:
             BATTLE_QUEUE.remove()
 
     # Check if the game is over.
@@ -96,7 +100,8 @@ def set_up_game():
     bq = ''
     while bq not in list(BATTLE_QUEUE_CLASSES.keys()):
         bq = input("Select a Battle Queue type (n for a Normal Battle Queue, " +
-                   "r for a Restricted Battle Queue): ").strip()
+                   "r for a Restricted Battle Queue, t for a Team Battle " +
+                   "Queue): ").strip()
 
     BATTLE_QUEUE = BATTLE_QUEUE_CLASSES[bq]()
 
@@ -115,7 +120,9 @@ def set_up_game():
         player_1_playstyle = input("Select a playstyle for the first " +
                                    "character (m for Manual, r for Random, " +
                                    "mr for Minimax (Recursive), " +
-                                   "mi for Minimax (Iterative)): ")
+                                   "mi for Minimax (Iterative), " +
+                                   "mb for Minimax (Time Budget), " +
+                                   "mf for Minimax (MTD(f))): ")
         player_1_playstyle = player_1_playstyle.strip()
 
     # Get the parameters for the second character
@@ -133,7 +140,9 @@ def set_up_game():
         player_2_playstyle = input("Select a playstyle for the second " +
                                    "character (m for Manual, r for Random, " +
                                    "mr for Minimax (Recursive), " +
-                                   "mi for Minimax (Iterative)): ")
+                                   "mi for Minimax (Iterative), " +
+                                   "mb for Minimax (Time Budget), " +
+                                   "mf for Minimax (MTD(f))): ")
         player_2_playstyle = player_2_playstyle.strip()
 
     # Store the classes in other variable names for convenience
@@ -162,8 +171,42 @@ def set_up_game():
     P2.enemy = P1
 
     # Add the characters to the Battle Queue
-    BATTLE_QUEUE.add(P1)
-    BATTLE_QUEUE.add(P2)
+    if isinstance(BATTLE_QUEUE, TeamBattleQueue):
+        team_size = ''
+        while not (team_size.isdigit() and
+                   1 <= int(team_size) <= MAX_TEAM_SIZE):
+            team_size = input("Select a team size (1 to {}): ".format(
+                MAX_TEAM_SIZE)).strip()
+
+        # Each team is led by the character chosen above, followed by more
+        # characters of the same class that share its playstyle
+        teams = []
+        for leader, key in [(P1, player_1), (P2, player_2)]:
+            team = [leader]
+            for i in range(2, int(team_size) + 1):
+                member = CHARACTER_CLASSES[key](
+                    "{} {}".format(leader.get_name(), i), BATTLE_QUEUE,
+                    leader.playstyle)
+                if key == 's':
+                    member.set_skill_decision_tree(create_default_tree())
+                team.append(member)
+            teams.append(team)
+        BATTLE_QUEUE.set_teams(teams[0], teams[1])
+    else:
+        BATTLE_QUEUE.add(P1)
+        BATTLE_QUEUE.add(P2)
+
+
+def end_game():
+    """
+    Stop any search the characters' playstyles are still running, e.g. when a
+    player quits or the session is torn down.
+    """
+    global P1, P2
+
+    for character in [P1, P2]:
+        if character is not None:
+            character.playstyle.cancel()
 
 
 def update_ui():
@@ -194,13 +237,14 @@ def update_ui():
 
     if not BATTLE_QUEUE.is_over():
         # Get the actions that the current player can make (this should be a
-        # list containing 'A' and/or 'S', or be empty if there are no actions.)
-        current_available_actions = BATTLE_QUEUE.peek().get_available_actions()
+        # tuple containing 'A' and/or 'S', or be empty if there are no
+        # actions.)
+        current_available_actions = BATTLE_QUEUE.peek().available_actions
 
         # Get the current player's name
         current_player = BATTLE_QUEUE.peek().get_name()
     else:
-        current_available_actions = []
+        current_available_actions = ()
         current_player = None
 
     ui_to_draw = {'p1_sprite': p1_current_sprite,
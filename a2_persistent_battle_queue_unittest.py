@@ -0,0 +1,99 @@
+"""
+Unittests for the PersistentBattleQueue in A2.
+
+These tests check that a PersistentBattleQueue plays games exactly like a
+BattleQueue, and that its copies share their order instead of copying it.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import get_state_score, get_state_score_iterative, \
+    ManualPlaystyle
+from a2_battle_queue import BattleQueue, PersistentBattleQueue
+from a2_skill_decision_tree import create_default_tree
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+class PersistentBattleQueueUnitTests(unittest.TestCase):
+    def test_plays_like_battle_queue(self):
+        """
+        Test to make sure random games play out the same way in a
+        PersistentBattleQueue as in a BattleQueue.
+        """
+        rng = random.Random(38)
+        for _ in range(100):
+            keys = rng.choice('mrvs'), rng.choice('mrvs')
+            expected = set_up_matchup(*keys)
+            actual = set_up_matchup(*keys, PersistentBattleQueue)
+            while not expected.is_over():
+                self.assertFalse(actual.is_over())
+                self.assertEqual(repr(expected), repr(actual))
+                self.assertEqual(expected.snapshot(), actual.snapshot())
+                move = rng.choice(expected.peek().get_available_actions())
+                for battle_queue in [expected, actual]:
+                    if move == 'A':
+                        battle_queue.remove().attack()
+                    else:
+                        battle_queue.remove().special_attack()
+            self.assertTrue(actual.is_over())
+            self.assertEqual(expected.snapshot(), actual.snapshot())
+            winner = actual.get_winner()
+            self.assertEqual(None if expected.get_winner() is None else
+                             expected.get_winner().get_name(),
+                             None if winner is None else winner.get_name())
+
+    def test_copy_shares_order(self):
+        """
+        Test to make sure copy shares the order with the original, and that
+        playing on the copy leaves the original as it was.
+        """
+        battle_queue = set_up_matchup('r', 'm', PersistentBattleQueue)
+        for _ in range(3):
+            battle_queue.remove().special_attack()
+        expected = repr(battle_queue)
+        new_battle_queue = battle_queue.copy()
+        self.assertIs(battle_queue._order, new_battle_queue._order,
+                      "copy should share the order, not copy it.")
+        new_battle_queue.remove().attack()
+        new_battle_queue.remove().special_attack()
+        self.assertEqual(expected, repr(battle_queue),
+                         "Playing on a copy should not change the original.")
+        self.assertNotEqual(expected, repr(new_battle_queue))
+
+    def test_searches_match_battle_queue(self):
+        """
+        Test to make sure the searches score a PersistentBattleQueue like the
+        same BattleQueue.
+        """
+        for p1_key, p2_key in [('r', 'm'), ('v', 'r'), ('s', 'm')]:
+            expected = set_up_matchup(p1_key, p2_key)
+            actual = set_up_matchup(p1_key, p2_key, PersistentBattleQueue)
+            for battle_queue in [expected, actual]:
+                battle_queue.peek().set_sp(40)
+                battle_queue.peek().enemy.set_sp(40)
+            for search in [get_state_score, get_state_score_iterative]:
+                self.assertEqual(search(expected), search(actual),
+                                 "{} on {}".format(search, actual))
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -6,8 +6,307 @@ You are responsible for implementing the get_state_score function, as well as
 creating classes for both Iterative Minimax and Recursive Minimax.
 """
 import random
-from typing import Any, Union, List
+import threading
+import time
+from typing import Any, Callable, Dict, Union, List, Sequence, Tuple
 from adts import Stack
+from a2_bounds import get_score_bounds
+from a2_dominance import find_dominated_moves, get_children
+from a2_endgame import solve_endgame
+
+# A bound beyond the score of any state.
+INFINITY = float('inf')
+
+
+class SearchCancelled(Exception):
+    """
+    Raised inside a minimax search once its SearchControl has been cancelled.
+    """
+
+
+class PruningError(Exception):
+    """
+    Raised by a minimax search that verifies its pruning, when a move it
+    skipped scores more than the score it was skipped for.
+    """
+
+
+def adjudicate_draw(battle_queue: 'BattleQueue') -> int:
+    """
+    Return the score of the unfinished game in battle_queue as a tie.
+    """
+    return 0
+
+
+def adjudicate_hp(battle_queue: 'BattleQueue') -> int:
+    """
+    Return the score of the unfinished game in battle_queue for its next
+    player as that player's HP lead over its enemy.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(r)
+    >>> m.set_hp(70)
+    >>> adjudicate_hp(bq)
+    30
+    """
+    player = battle_queue.peek()
+    return player.get_hp() - player.enemy.get_hp()
+
+
+# The rules that a search with max_plies can score unfinished games by.
+ADJUDICATION_RULES = {'draw': adjudicate_draw, 'hp': adjudicate_hp}
+
+
+class SearchControl:
+    """
+    A class representing the controls shared by the nodes of a minimax search.
+
+    A SearchControl lets another thread cancel a running search and lets the
+    caller watch the search's progress.
+
+    progress - a function called with the number of nodes visited so far and
+               the best move found so far, or None for no progress reports.
+    interval - the number of nodes visited between two progress reports.
+    prune - whether the search may skip moves whose bounds or dominance
+            rules show they can't change its score.
+    verify - whether every move skipped by pruning is checked with a full
+             search, raising PruningError if it could have changed the
+             score.
+    max_plies - the most moves searched past the state being scored, or None
+                to search every game to its end.
+    adjudication - the key in ADJUDICATION_RULES of the rule that scores
+                   games still going after max_plies moves.
+    nodes - the number of nodes visited so far.
+    best_move - the best move found so far, or None if no move has been fully
+                searched yet.
+    endgames - the number of nodes scored by solve_endgame instead of being
+               searched.
+    exact_bounds - the number of nodes scored by get_score_bounds, because
+                   their lower and upper bounds were equal.
+    bound_cutoffs - the number of moves that weren't searched because their
+                    bounds showed they couldn't change the score of the
+                    search.
+    dominated - the number of moves that weren't searched because the
+                DOMINANCE_RULES proved another move at least as good.
+    adjudicated - the number of nodes scored by the adjudication rule
+                  because they were max_plies moves deep.
+    """
+    progress: Union[None, Callable[[int, Union[None, str]], None]]
+    interval: int
+    prune: bool
+    verify: bool
+    max_plies: Union[None, int]
+    adjudication: str
+    nodes: int
+    best_move: Union[None, str]
+    endgames: int
+    exact_bounds: int
+    bound_cutoffs: int
+    dominated: int
+    adjudicated: int
+
+    def __init__(self, progress: Union[None, Callable[[int, Union[None, str]],
+                                                      None]] = None,
+                 interval: int = 1000, prune: bool = True,
+                 verify: bool = False, max_plies: Union[None, int] = None,
+                 adjudication: str = 'draw') -> None:
+        """
+        Initialize this SearchControl with the progress callback progress,
+        reported every interval nodes. If prune is False, the search visits
+        every move, even ones that can't change its score. If verify is True,
+        the moves that pruning skips are searched anyway to check them.
+
+        If max_plies is given, games still going max_plies moves past the
+        state being scored are scored by the rule adjudication in
+        ADJUDICATION_RULES instead of being searched further.
+
+        >>> control = SearchControl()
+        >>> control.nodes
+        0
+        >>> control.endgames
+        0
+        >>> control.is_cancelled()
+        False
+        """
+        self.progress = progress
+        self.interval = interval
+        self.prune = prune
+        self.verify = verify
+        self.max_plies = max_plies
+        self.adjudication = adjudication
+        self.nodes = 0
+        self.best_move = None
+        self.endgames = 0
+        self.exact_bounds = 0
+        self.bound_cutoffs = 0
+        self.dominated = 0
+        self.adjudicated = 0
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """
+        Cancel the search using this SearchControl, or the next one to use it
+        if none is running, until the cancel is cleared.
+
+        >>> control = SearchControl()
+        >>> control.cancel()
+        >>> control.is_cancelled()
+        True
+        """
+        self._cancelled = True
+
+    def reset(self) -> None:
+        """
+        Get this SearchControl ready for a new search: clear its counts and
+        best move. Its options and any cancel are kept, so a cancel made
+        just before the search still stops it.
+
+        >>> control = SearchControl(max_plies=4)
+        >>> control.visit()
+        >>> control.cancel()
+        >>> control.reset()
+        >>> control.nodes, control.is_cancelled(), control.max_plies
+        (0, True, 4)
+        """
+        self.nodes = 0
+        self.best_move = None
+        self.endgames = 0
+        self.exact_bounds = 0
+        self.bound_cutoffs = 0
+        self.dominated = 0
+        self.adjudicated = 0
+
+    def clear_cancel(self) -> None:
+        """
+        Undo any cancel, so the next search using this SearchControl runs.
+
+        >>> control = SearchControl()
+        >>> control.cancel()
+        >>> control.clear_cancel()
+        >>> control.is_cancelled()
+        False
+        """
+        self._cancelled = False
+
+    def is_cancelled(self) -> bool:
+        """
+        Return whether this SearchControl has been cancelled.
+
+        >>> SearchControl().is_cancelled()
+        False
+        """
+        return self._cancelled
+
+    def visit(self) -> None:
+        """
+        Record that the search visited one more node.
+
+        Raise SearchCancelled if this SearchControl has been cancelled.
+
+        >>> reports = []
+        >>> control = SearchControl(lambda n, move: reports.append(n), 2)
+        >>> for _ in range(5):
+        ...     control.visit()
+        >>> reports
+        [2, 4]
+        >>> control.cancel()
+        >>> try:
+        ...     control.visit()
+        ... except SearchCancelled:
+        ...     print('cancelled')
+        cancelled
+        """
+        if self._cancelled:
+            raise SearchCancelled
+        self.nodes += 1
+        if self.progress is not None and self.nodes % self.interval == 0:
+            self.progress(self.nodes, self.best_move)
+
+    def searches_whole_game(self) -> bool:
+        """
+        Return whether searches using this SearchControl play every game to
+        its end. Only then may they use solve_endgame and the
+        DOMINANCE_RULES, which score the rest of a game as if it was played
+        to the end.
+
+        >>> SearchControl().searches_whole_game()
+        True
+        >>> SearchControl(max_plies=10).searches_whole_game()
+        False
+        """
+        return self.max_plies is None
+
+    def adjudicate(self, battle_queue: 'BattleQueue', depth: int) \
+            -> Union[None, int]:
+        """
+        Return the adjudicated score of the state battle_queue, depth moves
+        past the state being scored, or None if it should still be searched.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> m.set_hp(70)
+        >>> control = SearchControl(max_plies=4, adjudication='hp')
+        >>> print(control.adjudicate(bq, 3))
+        None
+        >>> control.adjudicate(bq, 4)
+        30
+        >>> control.adjudicated
+        1
+        """
+        if self.max_plies is None or depth < self.max_plies:
+            return None
+        self.adjudicated += 1
+        return ADJUDICATION_RULES[self.adjudication](battle_queue)
+
+    def check_pruned(self, battle_queue: 'BattleQueue', sign: int,
+                     ceiling: Union[int, float], depth: int = 0) -> None:
+        """
+        If this SearchControl verifies its pruning, check that the skipped
+        state battle_queue, depth moves past the state being scored, scores
+        at most ceiling for the player who moved into it, where sign is 1 if
+        that player moves next in battle_queue and -1 otherwise.
+
+        Raise PruningError if it scores more.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> m.set_hp(0)
+        >>> control = SearchControl(verify=True)
+        >>> control.check_pruned(bq, 1, 100)
+        >>> try:
+        ...     control.check_pruned(bq, 1, 99)
+        ... except PruningError:
+        ...     print('wrongly pruned')
+        wrongly pruned
+        """
+        if not self.verify:
+            return
+        full_search = SearchControl(prune=False, max_plies=self.max_plies,
+                                    adjudication=self.adjudication)
+        score = get_state_score(battle_queue, full_search, depth)
+        if score * sign > ceiling:
+            raise PruningError("{} scores {}, more than the {} it was pruned "
+                               "for".format(battle_queue, score * sign,
+                                            ceiling))
 
 
 class Playstyle:
@@ -44,6 +343,13 @@ class Playstyle:
         """
         raise NotImplementedError
 
+    def cancel(self) -> None:
+        """
+        Stop any search this Playstyle is running. Playstyles that don't
+        search ignore this.
+        """
+        return None
+
 
 class ManualPlaystyle(Playstyle):
     """
@@ -90,7 +396,7 @@ class RandomPlaystyle(Playstyle):
 
         Return 'X' if a valid move cannot be found.
         """
-        actions = self.battle_queue.peek().get_available_actions()
+        actions = self.battle_queue.peek().available_actions
 
         if not actions:
             return 'X'
@@ -105,17 +411,30 @@ class RandomPlaystyle(Playstyle):
         return RandomPlaystyle(new_battle_queue)
 
 
-def get_state_score(battle_queue: 'BattleQueue') -> int:
+def get_state_score(battle_queue: 'BattleQueue',
+                    control: Union[None, SearchControl] = None,
+                    depth: int = 0) -> int:
     """
     Return an int corresponding to the highest score that the next player in
     battle_queue can guarantee.
 
+    If control is given, every node searched is reported to it, and the search
+    raises SearchCancelled once control is cancelled. If control has
+    max_plies, battle_queue is taken to be depth moves past the state being
+    scored, and games still going max_plies moves past that state are scored
+    by control's adjudication rule.
+
     For a state that's over, the score is the HP of the character who still has
     HP if the next player who was supposed to act is the winner. If the next
     player who was supposed to act is the loser, then the score is -1 * the
     HP of the character who still has HP. If there is no winner (i.e. there's
     a tie) then the score is 0.
 
+    States where only the next player can still act are scored by
+    solve_endgame without searching them. Moves that the DOMINANCE_RULES
+    prove no better than another move, and moves whose score, bounded by
+    get_score_bounds, can't beat a move searched before them, are skipped.
+
     >>> from a2_battle_queue import BattleQueue
     >>> from a2_characters import Rogue, Mage
     >>> bq = BattleQueue()
@@ -138,7 +457,7 @@ def get_state_score(battle_queue: 'BattleQueue') -> int:
     m (Mage): 3/100 -> r (Rogue): 40/100
     >>> get_state_score(bq)
     -10
-    >>> bq._content = []
+    >>> bq.clear()
     >>> bq.add(r)
     >>> bq.add(m)
     >>> r.set_hp(100)
@@ -147,7 +466,7 @@ def get_state_score(battle_queue: 'BattleQueue') -> int:
     >>> m.set_sp(100)
     >>> get_state_score(bq)
     40
-    >>> bq._content = []
+    >>> bq.clear()
     >>> bq.add(m)
     >>> bq.add(r)
     >>> r.set_hp(50)
@@ -156,48 +475,117 @@ def get_state_score(battle_queue: 'BattleQueue') -> int:
     >>> m.set_sp(100)
     >>> get_state_score(bq)
     26
+    >>> control = SearchControl()
+    >>> get_state_score(bq, control)
+    26
+    >>> control.nodes
+    65
+    >>> control.dominated
+    22
+    >>> full_window = SearchControl(prune=False)
+    >>> get_state_score(bq, full_window)
+    26
+    >>> full_window.nodes
+    259
+    >>> get_state_score(bq, SearchControl(max_plies=2))
+    0
+    >>> get_state_score(bq, SearchControl(max_plies=2, adjudication='hp'))
+    18
     """
+    if control is None:
+        control = SearchControl()
+    control.visit()
     bq_c = battle_queue.copy()
     first_player = bq_c.peek()
     curr_p = bq_c.peek()
     list_ = []
+    endgame = None
+    if control.searches_whole_game():
+        endgame = solve_endgame(bq_c)
+    adjudicated = None
+    if not bq_c.is_over():
+        adjudicated = control.adjudicate(bq_c, depth)
     if bq_c.is_over():
         if bq_c.get_winner() is None:
             return 0
-        if bq_c.get_winner() == first_player:
+        if bq_c.same_side(bq_c.get_winner(), first_player):
             return bq_c.get_winner().get_hp()
-        elif bq_c.get_winner() != first_player:
+        else:
             return bq_c.get_winner().get_hp() * -1
+    elif endgame is not None:
+        control.endgames += 1
+        return endgame
+    elif adjudicated is not None:
+        return adjudicated
     else:
-        if len(curr_p.get_available_actions()) == 2:
-            bq_1, bq_2 = bq_c.copy(), bq_c.copy()
-            cur_1, cur_2 = bq_1.peek(), bq_2.peek()
-            bq_1.remove().attack()
-            bq_2.remove().special_attack()
-            next_1, next_2 = bq_1.peek(), bq_2.peek()
-            if cur_1 == next_1:
-                list_.append(get_state_score(bq_1))
-            else:
-                list_.append(get_state_score(bq_1) * -1)
-            if cur_2 == next_2:
-                list_.append(get_state_score(bq_2))
-            else:
-                list_.append(get_state_score(bq_2) * -1)
-        elif len(curr_p.get_available_actions()) == 1:
-            cur = bq_c.peek()
-            bq_c.remove().attack()
-            next_ = bq_c.peek()
-            if cur == next_:
-                list_.append(get_state_score(bq_c))
-            else:
-                list_.append(get_state_score(bq_c) * -1)
+        # A game cut short by a draw scores 0, which always lies within the
+        # bounds, but an HP lead may not.
+        use_bounds = control.prune and (control.searches_whole_game() or
+                                        control.adjudication == 'draw')
+        lower, upper = -INFINITY, INFINITY
+        if use_bounds:
+            lower, upper = get_score_bounds(bq_c)
+        if lower == upper:
+            control.exact_bounds += 1
+            return lower
+        children = get_children(bq_c)
+        dominated = {}
+        if control.prune and control.searches_whole_game():
+            dominated = find_dominated_moves(bq_c, children)
+        for move, (bq_m, sign) in children.items():
+            if move in dominated:
+                control.dominated += 1
+                control.check_pruned(bq_m, sign, dominated[move], depth + 1)
+                continue
+            if list_ and use_bounds:
+                # Skip this move if it can't score more than upper or the
+                # best move searched so far.
+                child_upper = max(sign * bound
+                                  for bound in get_score_bounds(bq_m))
+                if max(list_) >= min(upper, child_upper):
+                    control.bound_cutoffs += 1
+                    control.check_pruned(bq_m, sign, max(list_), depth + 1)
+                    continue
+            list_.append(get_state_score(bq_m, control, depth + 1) * sign)
     return max(list_)
 
 
+def _select_best_move(battle_queue: 'BattleQueue', moves: Sequence[str],
+                      control: SearchControl,
+                      score_move: Callable[['BattleQueue', str], int]) -> str:
+    """
+    Return the move in moves with the highest score_move for the next player
+    in battle_queue, preferring later moves on ties.
+
+    Each move is scored on its own copy of battle_queue. If control is
+    cancelled, before or during the search, return the best move scored so
+    far, or the first move in moves if none has been scored yet. The cancel
+    is cleared once the search ends, so it only stops this search.
+    """
+    best_score = None
+    control.reset()
+    try:
+        for move in moves:
+            score = score_move(battle_queue.copy(), move)
+            if best_score is None or score >= best_score:
+                best_score = score
+                control.best_move = move
+    except SearchCancelled:
+        pass
+    finally:
+        control.clear_cancel()
+    if control.best_move is None:
+        return moves[0]
+    return control.best_move
+
+
 class RecursiveMinimax(Playstyle):
     """
     The RecursiveMinimax superclass. Inherits from Playstyle
+
+    control - the SearchControl used by this RecursiveMinimax's searches.
     """
+    control: SearchControl
 
     def __init__(self, battle_queue: 'BattleQueue') -> None:
         """
@@ -207,6 +595,7 @@ class RecursiveMinimax(Playstyle):
         """
         super().__init__(battle_queue)
         self.is_manual = False
+        self.control = SearchControl()
 
     def select_attack(self, parameter: Any = None) -> str:
         """
@@ -228,7 +617,7 @@ class RecursiveMinimax(Playstyle):
         >>> m.set_sp(35)
         >>> RecursiveMinimax(bq).select_attack()
         'A'
-        >>> bq._content = []
+        >>> bq.clear()
         >>> bq.add(r)
         >>> bq.add(m)
         >>> r.set_hp(100)
@@ -237,7 +626,7 @@ class RecursiveMinimax(Playstyle):
         >>> m.set_sp(100)
         >>> RecursiveMinimax(bq).select_attack()
         'A'
-        >>> bq._content = []
+        >>> bq.clear()
         >>> bq.add(m)
         >>> bq.add(r)
         >>> r.set_hp(30)
@@ -248,34 +637,44 @@ class RecursiveMinimax(Playstyle):
         m (Mage): 5/30 -> r (Rogue): 30/100
         >>> RecursiveMinimax(bq).select_attack()
         'S'
+        >>> ps = RecursiveMinimax(bq)
+        >>> ps.cancel()
+        >>> ps.select_attack()
+        'A'
+        >>> ps.select_attack()
+        'S'
         """
-        bq_a = self.battle_queue.copy()
-        bq_s = self.battle_queue.copy()
-        char = self.battle_queue.peek()
-        moves = char.get_available_actions()
-        d = {}
-        if 'A' in moves:
-            char = bq_a.peek()
-            bq_a.remove().attack()
-            new_char = bq_a.peek()
-            score = get_state_score(bq_a)
-            if char == new_char:
-                d[score] = 'A'
-            else:
-                d[score * -1] = 'A'
-        if 'S' in moves:
-            char = bq_s.peek()
-            bq_s.remove().special_attack()
-            new_char = bq_s.peek()
-            score = get_state_score(bq_s)
-            if char == new_char:
-                d[score] = 'S'
-            else:
-                d[score * -1] = 'S'
-        if d == {}:
+        moves = self.battle_queue.peek().available_actions
+        if not moves:
             return ''
-        max_score = max(d.keys())
-        return d[max_score]
+        return _select_best_move(self.battle_queue, moves, self.control,
+                                 self._score_move)
+
+    def _score_move(self, bq: 'BattleQueue', move: str) -> int:
+        """
+        Perform move on bq and return the score it guarantees the player who
+        made it.
+        """
+        char = bq.peek()
+        if move == 'A':
+            bq.remove().attack()
+        else:
+            bq.remove().special_attack()
+        new_char = bq.peek()
+        score = get_state_score(bq, self.control)
+        if bq.same_side(char, new_char):
+            return score
+        return score * -1
+
+    def cancel(self) -> None:
+        """
+        Cancel this RecursiveMinimax's running search, which then returns the
+        best move it has found so far straight away. If no search is running,
+        the next one is cancelled instead. Later searches aren't cancelled.
+
+        Overrides the super
+        """
+        self.control.cancel()
 
     def copy(self, new_battle_queue: 'BattleQueue') -> 'Playstyle':
         """
@@ -294,11 +693,14 @@ class StateTree:
     score - the score that this StateTree will have
     need_to_mult - an atribute containing a boolean whether a state needs to
                    be multiplied by * -1
+    depth - the number of moves between the state being scored and this
+            StateTree
     """
     bq: 'BattleQueue'
     children: Union[None, List['StateTree']]
     score: Union[None, int]
     need_to_mult: bool
+    depth: int
 
     def __init__(self, bq: 'BattleQueue') -> None:
         """
@@ -326,13 +728,102 @@ class StateTree:
         self.children = None
         self.score = None
         self.need_to_mult = False
+        self.depth = 0
+
+
+def _save_stack(s: Stack, list_: List[int], checkpoint: 'Checkpoint',
+                key: Any) -> None:
+    """
+    Save the StateTrees on s and the scores in list_ to checkpoint as plain
+    data, under the search key key.
+
+    States that already have a score are saved without their BattleQueue or
+    children, since the search only needs their score.
+    """
+    stack = []
+    while not s.is_empty():
+        stack.append(s.remove())
+    stack.reverse()
+    for state in stack:
+        s.add(state)
+
+    ids = {}
+    to_visit = stack[:]
+    while to_visit:
+        state = to_visit.pop()
+        if id(state) not in ids:
+            ids[id(state)] = (len(ids), state)
+            if state.score is None and state.children is not None:
+                to_visit.extend(state.children)
 
+    records = [None] * len(ids)
+    for i, state in ids.values():
+        if state.score is not None:
+            records[i] = (None, state.score, state.need_to_mult,
+                          state.depth, None)
+        else:
+            children = None
+            if state.children is not None:
+                children = [ids[id(child)][0] for child in state.children]
+            records[i] = (state.bq.snapshot(), None, state.need_to_mult,
+                          state.depth, children)
+
+    checkpoint.save(key, (records, [ids[id(state)][0] for state in stack],
+                          list_[-1:]))
+
+
+def _load_stack(battle_queue: 'BattleQueue', checkpoint: 'Checkpoint',
+                key: Any) -> Union[None, tuple]:
+    """
+    Return the Stack and score list saved to checkpoint by _save_stack for the
+    search key, rebuilding each BattleQueue from a copy of battle_queue.
 
-def get_state_score_iterative(battle_queue: 'BattleQueue') -> int:
+    Return None if checkpoint holds nothing for this search.
+    """
+    data = checkpoint.load(key)
+    if data is None:
+        return None
+
+    records, stack, list_ = data
+    states = []
+    for snapshot, score, need_to_mult, depth, _ in records:
+        bq = None
+        if snapshot is not None:
+            bq = battle_queue.copy()
+            bq.restore(snapshot)
+        state = StateTree(bq)
+        state.score = score
+        state.need_to_mult = need_to_mult
+        state.depth = depth
+        states.append(state)
+    for state, record in zip(states, records):
+        if record[4] is not None:
+            state.children = [states[i] for i in record[4]]
+
+    s = Stack()
+    for i in stack:
+        s.add(states[i])
+    return s, list_
+
+
+def get_state_score_iterative(battle_queue: 'BattleQueue',
+                              control: Union[None, SearchControl] = None,
+                              checkpoint: Union[None, 'Checkpoint'] = None) \
+        -> int:
     """
     Return an int corresponding to the highest score that the next player in
     battle_queue can guarantee.
 
+    If control is given, every state taken off the stack is reported to it,
+    and the search raises SearchCancelled once control is cancelled. If
+    control has max_plies, games still going max_plies moves past
+    battle_queue are scored by control's adjudication rule.
+
+    If checkpoint is given, the search saves its stack to checkpoint every
+    checkpoint.interval states and when it is cancelled, and resumes from the
+    last save for the same battle_queue instead of starting over. The save is
+    discarded once the search finishes.
+
     >>> from a2_battle_queue import BattleQueue
     >>> from a2_characters import Rogue, Mage
     >>> bq = BattleQueue()
@@ -355,7 +846,7 @@ def get_state_score_iterative(battle_queue: 'BattleQueue') -> int:
     m (Mage): 3/100 -> r (Rogue): 40/100
     >>> get_state_score_iterative(bq)
     -10
-    >>> bq._content = []
+    >>> bq.clear()
     >>> bq.add(r)
     >>> bq.add(m)
     >>> r.set_hp(100)
@@ -364,7 +855,7 @@ def get_state_score_iterative(battle_queue: 'BattleQueue') -> int:
     >>> m.set_sp(100)
     >>> get_state_score_iterative(bq)
     40
-    >>> bq._content = []
+    >>> bq.clear()
     >>> bq.add(r)
     >>> bq.add(m)
     >>> r.set_hp(30)
@@ -373,7 +864,7 @@ def get_state_score_iterative(battle_queue: 'BattleQueue') -> int:
     >>> m.set_sp(30)
     >>> get_state_score_iterative(bq)
     30
-    >>> bq._content = []
+    >>> bq.clear()
     >>> bq.add(m)
     >>> bq.add(r)
     >>> r.set_hp(50)
@@ -382,49 +873,94 @@ def get_state_score_iterative(battle_queue: 'BattleQueue') -> int:
     >>> m.set_sp(100)
     >>> get_state_score_iterative(bq)
     26
+    >>> get_state_score_iterative(bq, SearchControl(max_plies=2))
+    0
     """
-    bq_c = battle_queue.copy()
-    first_state = StateTree(bq_c)
-    s = Stack()
-    s.add(first_state)
-    list_ = []
+    if control is None:
+        control = SearchControl()
+    key = (type(battle_queue).__name__, battle_queue.snapshot(),
+           control.max_plies, control.adjudication)
+    saved = None
+    if checkpoint is not None:
+        saved = _load_stack(battle_queue, checkpoint, key)
+    if saved is not None:
+        s, list_ = saved
+    else:
+        bq_c = battle_queue.copy()
+        first_state = StateTree(bq_c)
+        s = Stack()
+        s.add(first_state)
+        list_ = []
+    try:
+        _search_stack(s, list_, control, checkpoint, key)
+    except SearchCancelled:
+        if checkpoint is not None:
+            _save_stack(s, list_, checkpoint, key)
+        raise
+    if checkpoint is not None:
+        checkpoint.discard()
+    return list_[-1]
+
+
+def _search_stack(s: Stack, list_: List[int], control: SearchControl,
+                  checkpoint: Union[None, 'Checkpoint'], key: Any) -> None:
+    """
+    Score the StateTrees on s until s is empty, appending the score of every
+    expanded state to list_.
+
+    If checkpoint is given, save s and list_ to it under the search key every
+    checkpoint.interval states.
+    """
+    since_save = 0
     while not s.is_empty():
+        if checkpoint is not None:
+            if since_save >= checkpoint.interval:
+                _save_stack(s, list_, checkpoint, key)
+                since_save = 0
+            since_save += 1
+        control.visit()
         state = s.remove()
         first_player = state.bq.peek()
+        endgame = None
+        adjudicated = None
+        if state.children is None and not state.bq.is_over():
+            if control.searches_whole_game():
+                endgame = solve_endgame(state.bq)
+            adjudicated = control.adjudicate(state.bq, state.depth)
         if state.bq.is_over():
             if state.bq.get_winner() is None:
                 state.score = 0
-            elif state.bq.get_winner() == first_player:
+            elif state.bq.same_side(state.bq.get_winner(), first_player):
                 state.score = state.bq.get_winner().get_hp()
-            elif state.bq.get_winner() != first_player:
+            else:
                 state.score = state.bq.get_winner().get_hp() * -1
+        elif endgame is not None or adjudicated is not None:
+            if endgame is not None:
+                control.endgames += 1
+                state.score = endgame
+            else:
+                state.score = adjudicated
+            if state.need_to_mult:
+                list_.append(state.score * -1)
+            else:
+                list_.append(state.score)
         else:
             if state.children is None:
-                moves = first_player.get_available_actions()
-                if 'A' in moves:
-                    bq_a = state.bq.copy()
-                    cur = bq_a.peek()
-                    bq_a.remove().attack()
-                    next_ = bq_a.peek()
-                    attack_state = StateTree(bq_a)
-                    if cur != next_:
-                        attack_state.need_to_mult = True
-                    if state.children is None:
-                        state.children = [attack_state]
-                    else:
-                        state.children.append(attack_state)
-                if 'S' in moves:
-                    bq_s = state.bq.copy()
-                    cur = bq_s.peek()
-                    bq_s.remove().special_attack()
-                    next_ = bq_s.peek()
-                    special_state = StateTree(bq_s)
-                    if cur != next_:
-                        special_state.need_to_mult = True
-                    if state.children is None:
-                        state.children = [special_state]
-                    else:
-                        state.children.append(special_state)
+                children = get_children(state.bq)
+                dominated = {}
+                if control.prune and control.searches_whole_game():
+                    dominated = find_dominated_moves(state.bq, children)
+                state.children = []
+                for move, (bq_m, sign) in children.items():
+                    if move in dominated:
+                        control.dominated += 1
+                        control.check_pruned(bq_m, sign, dominated[move],
+                                             state.depth + 1)
+                        continue
+                    child = StateTree(bq_m)
+                    child.need_to_mult = sign == -1
+                    child.depth = state.depth + 1
+                    state.children.append(child)
                 s.add(state)
                 for child in state.children:
                     s.add(child)
@@ -436,17 +972,21 @@ def get_state_score_iterative(battle_queue: 'BattleQueue') -> int:
                     else:
                         child_scores.append(child.score)
                 state.score = max(child_scores)
+                # Only the score of a scored state is needed from now on.
+                state.children = None
                 if state.need_to_mult:
                     list_.append(state.score * -1)
                 else:
                     list_.append(state.score)
-    return list_[-1]
 
 
 class IterativeMinimax(Playstyle):
     """
     The IterativeMinimax superclass. Inherits from Playstyle
+
+    control - the SearchControl used by this IterativeMinimax's searches.
     """
+    control: SearchControl
 
     def __init__(self, battle_queue: 'BattleQueue') -> None:
         """
@@ -456,6 +996,7 @@ class IterativeMinimax(Playstyle):
         """
         super().__init__(battle_queue)
         self.is_manual = False
+        self.control = SearchControl()
 
     def select_attack(self, parameter: Any = None) -> str:
         """
@@ -477,7 +1018,7 @@ class IterativeMinimax(Playstyle):
         >>> m.set_sp(35)
         >>> IterativeMinimax(bq).select_attack()
         'A'
-        >>> bq._content = []
+        >>> bq.clear()
         >>> bq.add(r)
         >>> bq.add(m)
         >>> r.set_hp(100)
@@ -488,7 +1029,7 @@ class IterativeMinimax(Playstyle):
         r (Rogue): 100/12 -> m (Mage): 28/100
         >>> IterativeMinimax(bq).select_attack()
         'A'
-        >>> bq._content = []
+        >>> bq.clear()
         >>> bq.add(m)
         >>> bq.add(r)
         >>> r.set_hp(30)
@@ -500,46 +1041,473 @@ class IterativeMinimax(Playstyle):
         >>> IterativeMinimax(bq).select_attack()
         'S'
         """
-        bq_a = self.battle_queue.copy()
-        bq_s = self.battle_queue.copy()
-        char = self.battle_queue.peek()
-        moves = char.get_available_actions()
-        d = {}
-        if 'A' in moves:
-            char = bq_a.peek()
-            score_to_return = char.get_hp()
-            bq_a.remove().attack()
-            new_char = bq_a.peek()
-            if bq_a.is_over():
-                score = score_to_return
+        moves = self.battle_queue.peek().available_actions
+        if not moves:
+            return ''
+        return _select_best_move(self.battle_queue, moves, self.control,
+                                 self._score_move)
+
+    def _score_move(self, bq: 'BattleQueue', move: str) -> int:
+        """
+        Perform move on bq and return the score it guarantees the player who
+        made it.
+        """
+        char = bq.peek()
+        score_to_return = char.get_hp()
+        if move == 'A':
+            bq.remove().attack()
+        else:
+            bq.remove().special_attack()
+        new_char = bq.peek()
+        if bq.is_over():
+            score = score_to_return
+        else:
+            score = get_state_score_iterative(bq, self.control)
+        if bq.same_side(char, new_char):
+            return score
+        return score * -1
+
+    def cancel(self) -> None:
+        """
+        Cancel this IterativeMinimax's running search, which then returns the
+        best move it has found so far straight away. If no search is running,
+        the next one is cancelled instead. Later searches aren't cancelled.
+
+        Overrides the super
+        """
+        self.control.cancel()
+
+    def copy(self, new_battle_queue: 'BattleQueue') -> 'Playstyle':
+        """
+        Return a copy of this IterativeMinimax which uses the BattleQueue
+        new_battle_queue.
+        """
+        return IterativeMinimax(new_battle_queue)
+
+
+def _get_terminal_score(bq: 'BattleQueue') -> int:
+    """
+    Return the score of the game that is over in bq for the next player in bq,
+    as described in get_state_score.
+    """
+    winner = bq.get_winner()
+    if winner is None:
+        return 0
+    if bq.same_side(winner, bq.peek()):
+        return winner.get_hp()
+    return winner.get_hp() * -1
+
+
+def _alpha_beta(battle_queue: 'BattleQueue', alpha: float, beta: float,
+                cache: Dict[Tuple, Tuple[float, float]],
+                control: SearchControl, depth: int = 0) -> int:
+    """
+    Return the score the next player in battle_queue can guarantee if it lies
+    strictly between alpha and beta. Otherwise, return a bound on the score
+    that lies on the same side of the window as the score.
+
+    cache maps the fingerprint of every state searched to the lower and
+    upper bounds on its score found so far, so the same position reached by
+    different moves, or with the players the other way round, is only
+    searched once. States that aren't in cache start from the bounds found by
+    get_score_bounds. If control has max_plies, battle_queue is depth moves
+    past the state being scored, and the fingerprint is cached with the
+    number of moves left to search after it.
+    """
+    control.visit()
+    bq_c = battle_queue.copy()
+    key = bq_c.fingerprint()
+    if not control.searches_whole_game():
+        key = (key, control.max_plies - depth)
+    if key in cache:
+        lower, upper = cache[key]
+    elif not control.prune or (not control.searches_whole_game() and
+                               control.adjudication != 'draw'):
+        lower, upper = -INFINITY, INFINITY
+    else:
+        lower, upper = get_score_bounds(bq_c)
+        if lower == upper and not bq_c.is_over():
+            control.exact_bounds += 1
+        elif lower >= beta or upper <= alpha:
+            control.bound_cutoffs += 1
+    if lower >= beta or lower == upper:
+        return lower
+    if upper <= alpha:
+        return upper
+    alpha, beta = max(alpha, lower), min(beta, upper)
+
+    endgame = None
+    adjudicated = None
+    if not bq_c.is_over():
+        if control.searches_whole_game():
+            endgame = solve_endgame(bq_c)
+        adjudicated = control.adjudicate(bq_c, depth)
+    if bq_c.is_over():
+        best = _get_terminal_score(bq_c)
+    elif endgame is not None:
+        control.endgames += 1
+        best = endgame
+    elif adjudicated is not None:
+        best = adjudicated
+    else:
+        best = -INFINITY
+        a = alpha
+        for move in bq_c.peek().available_actions:
+            child = bq_c.copy()
+            cur = child.peek()
+            if move == 'A':
+                child.remove().attack()
             else:
-                score = get_state_score_iterative(bq_a)
-            if char == new_char:
-                d[score] = 'A'
+                child.remove().special_attack()
+            if child.same_side(cur, child.peek()):
+                score = _alpha_beta(child, a, beta, cache, control,
+                                    depth + 1)
             else:
-                d[score * -1] = 'A'
-        if 'S' in moves:
-            char = bq_s.peek()
-            score_to_return = char.get_hp()
-            bq_s.remove().special_attack()
-            new_char = bq_s.peek()
-            if bq_s.is_over():
-                score = score_to_return
+                score = -_alpha_beta(child, -beta, -a, cache, control,
+                                     depth + 1)
+            best = max(best, score)
+            a = max(a, best)
+            if best >= beta:
+                break
+
+    if best <= alpha:
+        cache[key] = (lower, best)
+    elif best >= beta:
+        cache[key] = (best, upper)
+    else:
+        cache[key] = (best, best)
+    return best
+
+
+def search_mtdf(battle_queue: 'BattleQueue', guess: int = 0,
+                cache: Union[None, Dict[Tuple, Tuple[float, float]]] = None,
+                control: Union[None, SearchControl] = None) -> Tuple[int, int]:
+    """
+    Return the score that the next player in battle_queue can guarantee, as
+    described in get_state_score, and the number of passes it took to find.
+
+    Each pass is a zero-window search around the current guess, starting
+    from guess, that proves the score is above or below it. Bounds found by
+    earlier passes are kept in cache, so later passes only search the parts
+    of the game that the earlier ones couldn't settle.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(m)
+    >>> bq.add(r)
+    >>> r.set_hp(50)
+    >>> m.set_hp(50)
+    >>> search_mtdf(bq)
+    (26, 4)
+    >>> search_mtdf(bq, 26)
+    (26, 2)
+    """
+    if cache is None:
+        cache = {}
+    if control is None:
+        control = SearchControl()
+
+    score = guess
+    lower, upper = -INFINITY, INFINITY
+    passes = 0
+    while lower < upper:
+        beta = score + 1 if score == lower else score
+        score = _alpha_beta(battle_queue, beta - 1, beta, cache, control)
+        passes += 1
+        if score < beta:
+            upper = score
+        else:
+            lower = score
+    return score, passes
+
+
+class MTDfMinimax(Playstyle):
+    """
+    A minimax Playstyle that scores moves with search_mtdf. Inherits from
+    Playstyle
+
+    control - the SearchControl used by this MTDfMinimax's searches.
+    passes - the number of search_mtdf passes that scoring each move took in
+             the last call to select_attack.
+    """
+    control: SearchControl
+    passes: Dict[str, int]
+
+    def __init__(self, battle_queue: 'BattleQueue') -> None:
+        """
+        Initialize this MTDfMinimax with BattleQueue as its battle queue.
+
+        Extends the super
+        """
+        super().__init__(battle_queue)
+        self.is_manual = False
+        self.control = SearchControl()
+        self.passes = {}
+        self._cache = {}
+        self._guess = 0
+
+    def select_attack(self, parameter: Any = None) -> str:
+        """
+        Return the attack for the next character in this MTDfMinimax's
+        battle_queue to perform.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(m)
+        >>> bq.add(r)
+        >>> r.set_hp(30)
+        >>> m.set_hp(5)
+        >>> m.set_sp(30)
+        >>> ps = MTDfMinimax(bq)
+        >>> ps.select_attack()
+        'S'
+        >>> ps.passes
+        {'A': 2, 'S': 2}
+        """
+        moves = self.battle_queue.peek().available_actions
+        if not moves:
+            return ''
+        self.passes = {}
+        self._cache = {}
+        self._guess = 0
+        return _select_best_move(self.battle_queue, moves, self.control,
+                                 self._score_move)
+
+    def _score_move(self, bq: 'BattleQueue', move: str) -> int:
+        """
+        Perform move on bq and return the score it guarantees the player who
+        made it.
+        """
+        char = bq.peek()
+        if move == 'A':
+            bq.remove().attack()
+        else:
+            bq.remove().special_attack()
+        sign = 1 if bq.same_side(char, bq.peek()) else -1
+        score, self.passes[move] = search_mtdf(bq, self._guess * sign,
+                                               self._cache, self.control)
+        self._guess = score * sign
+        return score * sign
+
+    def cancel(self) -> None:
+        """
+        Cancel this MTDfMinimax's running search, which then returns the
+        best move it has found so far straight away. If no search is running,
+        the next one is cancelled instead. Later searches aren't cancelled.
+
+        Overrides the super
+        """
+        self.control.cancel()
+
+    def copy(self, new_battle_queue: 'BattleQueue') -> 'Playstyle':
+        """
+        Return a copy of this MTDfMinimax which uses the BattleQueue
+        new_battle_queue.
+        """
+        return MTDfMinimax(new_battle_queue)
+
+
+def get_greedy_move(battle_queue: 'BattleQueue') -> str:
+    """
+    Return the move for the next player in battle_queue that looks best one
+    move ahead: a move that wins the game, otherwise the move that leaves
+    the largest HP lead over the enemy.
+
+    Return 'X' if the next player has no moves.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(m)
+    >>> bq.add(r)
+    >>> get_greedy_move(bq)
+    'S'
+    >>> m.set_sp(29)
+    >>> get_greedy_move(bq)
+    'A'
+    """
+    moves = battle_queue.peek().available_actions
+    if not moves:
+        return 'X'
+
+    best_score = None
+    best_move = moves[0]
+    for move in moves:
+        bq = battle_queue.copy()
+        char = bq.peek()
+        if move == 'A':
+            bq.remove().attack()
+        else:
+            bq.remove().special_attack()
+        if bq.is_over():
+            winner = bq.get_winner()
+            if winner is None:
+                score = 0
+            elif bq.same_side(winner, char):
+                score = winner.get_hp()
             else:
-                score = get_state_score_iterative(bq_s)
-            if char == new_char:
-                d[score] = 'S'
+                score = winner.get_hp() * -1
+        else:
+            score = char.get_hp() - char.enemy.get_hp()
+        if best_score is None or score >= best_score:
+            best_score = score
+            best_move = move
+    return best_move
+
+
+class BudgetedPlaystyle(Playstyle):
+    """
+    A Playstyle that picks moves using another Playstyle, but never takes
+    longer than a fixed time budget to do so. Inherits from Playstyle
+
+    If the inner Playstyle hasn't picked a move when the budget runs out, its
+    search is cancelled and the best move it found so far is used. If it
+    hadn't found any move yet, a greedy move is used instead.
+
+    A cancelled search that doesn't stop within the grace period is left to
+    stop in the background, and the next select_attack waits for it, within
+    its own budget, before it starts searching.
+
+    inner - the Playstyle that this BudgetedPlaystyle asks for moves.
+    budget - the number of seconds that picking a move may take.
+    grace - the part of budget kept back for cancelling the inner Playstyle
+            and falling back to another move.
+    tier_counts - how many moves came from each tier: 'search' for moves
+                  the inner Playstyle finished picking, 'best_so_far' for
+                  moves from a cancelled search, and 'greedy' for greedy
+                  moves.
+    """
+    inner: Playstyle
+    budget: float
+    grace: float
+    tier_counts: Dict[str, int]
+
+    def __init__(self, battle_queue: 'BattleQueue',
+                 inner: Union[None, Playstyle] = None,
+                 budget: float = 1.0) -> None:
+        """
+        Initialize this BudgetedPlaystyle with BattleQueue as its battle queue,
+        picking moves with inner within budget seconds. inner defaults to a
+        RecursiveMinimax.
+
+        Extends the super
+        """
+        super().__init__(battle_queue)
+        if inner is None:
+            inner = RecursiveMinimax(battle_queue)
+        self.inner = inner
+        self.is_manual = inner.is_manual
+        self.budget = budget
+        self.grace = min(0.02, budget / 4)
+        self.tier_counts = {'search': 0, 'best_so_far': 0, 'greedy': 0}
+        self._running = None
+        self._leftover = None
+
+    def select_attack(self, parameter: Any = None) -> str:
+        """
+        Return the attack for the next character in this BudgetedPlaystyle's
+        battle_queue to perform, within budget seconds.
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(m)
+        >>> bq.add(r)
+        >>> r.set_hp(30)
+        >>> m.set_hp(5)
+        >>> m.set_sp(30)
+        >>> ps = BudgetedPlaystyle(bq)
+        >>> ps.select_attack()
+        'S'
+        >>> ps.tier_counts
+        {'search': 1, 'best_so_far': 0, 'greedy': 0}
+        """
+        search_deadline = time.monotonic() + self.budget - self.grace
+        # A search that outlasted the last grace period is finished first, so
+        # searches on this BudgetedPlaystyle never run at the same time.
+        if self._leftover is not None \
+                and self._stop_search(*self._leftover, search_deadline):
+            self._leftover = None
+
+        result = []
+        tier = 'greedy'
+        if self._leftover is None:
+            # The inner Playstyle searches its own copy of the battle queue,
+            # so a search that overruns can't see the game move on without
+            # it.
+            inner = self.inner.copy(self.battle_queue.copy())
+            self._running = inner
+            thread = threading.Thread(
+                target=lambda: result.append(inner.select_attack(parameter)),
+                daemon=True)
+            thread.start()
+            thread.join(max(0.0, search_deadline - time.monotonic()))
+
+            if result:
+                tier = 'search'
+            elif self._stop_search(inner, thread,
+                                   time.monotonic() + self.grace):
+                control = getattr(inner, 'control', None)
+                if result and control is not None \
+                        and control.best_move is not None:
+                    tier = 'best_so_far'
             else:
-                d[score * -1] = 'S'
-        max_score = max(d.keys())
-        return d[max_score]
+                self._leftover = (inner, thread)
+        if tier == 'greedy':
+            result = [get_greedy_move(self.battle_queue)]
+        self._running = None
+        self.tier_counts[tier] += 1
+        return result[0]
+
+    @staticmethod
+    def _stop_search(inner: Playstyle, thread: threading.Thread,
+                     deadline: float) -> bool:
+        """
+        Cancel inner's search, running in thread, and wait until deadline, as
+        given by time.monotonic, for it to stop. Return whether it stopped.
+        """
+        # A cancel made before the search starts still stops it, and inner
+        # is never used again, so one cancel is enough.
+        inner.cancel()
+        thread.join(max(0.0, deadline - time.monotonic()))
+        return not thread.is_alive()
+
+    def cancel(self) -> None:
+        """
+        Cancel the inner Playstyle's search, if one is running.
+
+        Overrides the super
+        """
+        running = self._running
+        if running is not None:
+            running.cancel()
 
     def copy(self, new_battle_queue: 'BattleQueue') -> 'Playstyle':
         """
-        Return a copy of this IterativeMinimax which uses the BattleQueue
+        Return a copy of this BudgetedPlaystyle which uses the BattleQueue
         new_battle_queue.
         """
-        return IterativeMinimax(new_battle_queue)
+        return BudgetedPlaystyle(new_battle_queue,
+                                 self.inner.copy(new_battle_queue),
+                                 self.budget)
 
 
 if __name__ == '__main__':
@@ -11,14 +11,17 @@ errors.
 Try playing your game through multiple times and trying various combinations of
 actions.
 """
+import random
 import unittest
 
 # Import the student solution
 from a2_game import CHARACTER_CLASSES
-from a2_playstyle import ManualPlaystyle
+from a2_playstyle import ManualPlaystyle, IterativeMinimax
 from a2_battle_queue import RestrictedBattleQueue
+from a2_skill_decision_tree import create_default_tree
 MageConstructor = CHARACTER_CLASSES['m']
 RogueConstructor = CHARACTER_CLASSES['r']
+SorcererConstructor = CHARACTER_CLASSES['s']
 
 class RestrictedBattleQueueUnitTests(unittest.TestCase):
     def setUp(self):
@@ -82,6 +85,36 @@ class RestrictedBattleQueueUnitTests(unittest.TestCase):
                           "RestrictedBattleQueue, the original should still " +
                           "have elements in it."))
     
+    def test_copy_first_player_is_front(self):
+        """
+        Test to make sure the first player of a copy is the character at the
+        front of the queue when it was copied, so an emptied copy peeks at
+        that character.
+        """
+        self.battle_queue.remove()
+        bq = self.battle_queue.copy()
+        while not bq.is_empty():
+            bq.remove()
+        self.assertEqual("M", bq.peek().get_name(),
+                         "An emptied copy of M -> nobody should peek at M.")
+
+        battle_queue = RestrictedBattleQueue()
+        playstyle = ManualPlaystyle(battle_queue)
+        mage = MageConstructor("P1", battle_queue, playstyle)
+        sorcerer = SorcererConstructor("P2", battle_queue, playstyle)
+        sorcerer.set_skill_decision_tree(create_default_tree())
+        mage.enemy = sorcerer
+        sorcerer.enemy = mage
+        battle_queue.add(mage)
+        battle_queue.add(sorcerer)
+        battle_queue.remove()
+        sorcerer.set_hp(21)
+        sorcerer.set_sp(30)
+        mage.set_sp(0)
+        self.assertEqual('S', IterativeMinimax(battle_queue).select_attack(),
+                         "A Sorcerer at 21/30 against a Mage with no SP "
+                         "should special attack.")
+
     def test_copy_maintains_add_order(self):
         """
         Test to make sure copy maintains the order in which characters
@@ -290,6 +323,67 @@ class RestrictedBattleQueueUnitTests(unittest.TestCase):
                                                         self.p2,
                                                         expected,
                                                         actual))    
-        
+
+    def test_add_matches_rules(self):
+        """
+        Test to make sure add follows the RestrictedBattleQueue rules over a
+        long random run of adds and removes, checked against a plain list of
+        (character, able to add) entries.
+        """
+        rng = random.Random(36)
+        expected = [(self.p1, True), (self.p2, True)]
+        for _ in range(2000):
+            if expected and rng.random() < 0.4:
+                self.assertIs(expected.pop(0)[0], self.battle_queue.remove())
+                continue
+            character = rng.choice([self.p1, self.p2])
+            adder = expected[0] if expected else None
+            if all(entry[0] is not character for entry in expected):
+                expected.append((character, True))
+            elif adder[1] and adder[0] is not character:
+                expected.append((character, False))
+            elif adder[1]:
+                addable = expected.count((character, True))
+                expected.append((character, addable < 2))
+            self.battle_queue.add(character)
+            actual = list(zip(self.battle_queue._content,
+                              self.battle_queue.able_to_add))
+            self.assertEqual(expected, actual,
+                             "After adding {}, the RestrictedBattleQueue "
+                             "should hold:\n{}\nBut got:\n{}".format(
+                                 character.get_name(), expected, actual))
+
+    def test_get_winner_matches_scan(self):
+        """
+        Test to make sure get_winner picks the same winner as scanning the
+        queue for the last entry with HP left, over random finished games.
+        """
+        rng = random.Random(41)
+        checked = 0
+        for _ in range(500):
+            battle_queue = RestrictedBattleQueue()
+            playstyle = ManualPlaystyle(battle_queue)
+            p1 = RogueConstructor("R", battle_queue, playstyle)
+            p2 = MageConstructor("M", battle_queue, playstyle)
+            p1.enemy = p2
+            p2.enemy = p1
+            for _ in range(rng.randint(1, 6)):
+                battle_queue.add(rng.choice([p1, p2]))
+            for player in [p1, p2]:
+                player.set_hp(rng.choice([0, 0, 1, 50]))
+                player.set_sp(rng.choice([0, 4, 100]))
+            if not battle_queue.is_over():
+                continue
+            expected = None
+            for character in battle_queue._content:
+                if character.get_hp() != 0:
+                    expected = character
+            self.assertIs(expected, battle_queue.get_winner(),
+                          "get_winner on {} with R at {} HP and M at {} "
+                          "HP".format(battle_queue, p1.get_hp(), p2.get_hp()))
+            checked += 1
+        self.assertGreater(checked, 200)
+
+
 if __name__ == "__main__":
     unittest.main(exit = False)
\ No newline at end of file
@@ -0,0 +1,431 @@
+"""
+Unittests for the search controls shared by the minimax playstyles in A2.
+
+These tests check that searches can be cancelled and report their progress,
+and that the extra search options never change the score a search returns.
+"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from a2_game import CHARACTER_CLASSES, PLAYSTYLE_CLASSES
+from a2_playstyle import get_state_score, get_state_score_iterative, \
+    ManualPlaystyle, RandomPlaystyle, SearchControl, SearchCancelled, \
+    BudgetedPlaystyle, search_mtdf
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_checkpoint import Checkpoint
+from a2_skill_decision_tree import create_default_tree
+MageConstructor = CHARACTER_CLASSES['m']
+RogueConstructor = CHARACTER_CLASSES['r']
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+class SlowPlaystyle(RandomPlaystyle):
+    """
+    A RandomPlaystyle that takes delay seconds to pick each move and ignores
+    cancels, recording how many of it and its copies were picking at once.
+    """
+
+    def __init__(self, battle_queue, delay, counts=None):
+        """
+        Initialize this SlowPlaystyle, sharing counts with its copies.
+        """
+        super().__init__(battle_queue)
+        self.delay = delay
+        self.counts = {'running': 0, 'most': 0, 'started': 0} \
+            if counts is None else counts
+
+    def select_attack(self, parameter=None):
+        """
+        Return a random move after waiting delay seconds.
+        """
+        self.counts['running'] += 1
+        self.counts['started'] += 1
+        self.counts['most'] = max(self.counts['most'], self.counts['running'])
+        time.sleep(self.delay)
+        self.counts['running'] -= 1
+        return super().select_attack(parameter)
+
+    def copy(self, new_battle_queue):
+        """
+        Return a copy of this SlowPlaystyle which uses new_battle_queue.
+        """
+        return SlowPlaystyle(new_battle_queue, self.delay, self.counts)
+
+
+class SearchControlUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Sets up a Battle Queue containing a Rogue and a Mage at full HP and SP,
+        the slowest position to search completely.
+        """
+        self.battle_queue = BattleQueue()
+        playstyle = ManualPlaystyle(self.battle_queue)
+
+        self.p1 = RogueConstructor("R", self.battle_queue, playstyle)
+        self.p2 = MageConstructor("M", self.battle_queue, playstyle)
+
+        self.p1.enemy = self.p2
+        self.p2.enemy = self.p1
+
+        self.battle_queue.add(self.p1)
+        self.battle_queue.add(self.p2)
+
+    def tearDown(self):
+        """
+        Delete the attributes that were created in setUp.
+        """
+        del self.battle_queue
+        del self.p1
+        del self.p2
+
+    def test_cancelled_search_raises(self):
+        """
+        Test to make sure both searches stop as soon as their control is
+        cancelled.
+        """
+        for search in [get_state_score, get_state_score_iterative]:
+            control = SearchControl()
+            control.cancel()
+            with self.assertRaises(SearchCancelled):
+                search(self.battle_queue, control)
+            self.assertEqual(0, control.nodes,
+                             "A cancelled search should not visit any nodes.")
+
+    def test_progress_reports(self):
+        """
+        Test to make sure progress is reported every interval nodes.
+        """
+        self.p1.set_sp(20)
+        self.p2.set_sp(40)
+        reports = []
+        control = SearchControl(lambda n, move: reports.append(n), 10)
+        get_state_score(self.battle_queue, control)
+
+        expected = list(range(10, control.nodes + 1, 10))
+        self.assertEqual(expected, reports,
+                         "Progress should be reported every 10 nodes.")
+
+    def test_cancel_select_attack_from_another_thread(self):
+        """
+        Test to make sure cancelling a running select_attack makes it return a
+        valid move within a few milliseconds.
+        """
+        for key in ['mr', 'mi']:
+            minimax = PLAYSTYLE_CLASSES[key](self.battle_queue)
+            result = []
+            thread = threading.Thread(
+                target=lambda: result.append(minimax.select_attack()))
+            thread.start()
+            time.sleep(0.05)
+
+            start = time.perf_counter()
+            minimax.cancel()
+            thread.join(1)
+            elapsed = time.perf_counter() - start
+
+            self.assertFalse(thread.is_alive(),
+                             "A cancelled search should stop.")
+            self.assertIn(result[0], ['A', 'S'])
+            self.assertLess(elapsed, 0.1,
+                            ("A cancelled search took {:.3f}s to " +
+                             "return.").format(elapsed))
+
+    def test_cancel_only_stops_next_search(self):
+        """
+        Test to make sure a cancel made before select_attack stops its
+        search, and a cancelled minimax playstyle searches properly the time
+        after.
+        """
+        self.p1.set_hp(30)
+        self.p2.set_hp(5)
+        self.p2.set_sp(30)
+        self.battle_queue.clear()
+        self.battle_queue.add(self.p2)
+        self.battle_queue.add(self.p1)
+        for key in ['mr', 'mi', 'mf']:
+            minimax = PLAYSTYLE_CLASSES[key](self.battle_queue)
+            minimax.cancel()
+            self.assertEqual('A', minimax.select_attack(),
+                             "A cancel before select_attack should stop its "
+                             "search before any move is scored.")
+            self.assertEqual(0, minimax.control.nodes)
+            self.assertFalse(minimax.control.is_cancelled(),
+                             "The cancel should end with the search.")
+            self.assertEqual('S', minimax.select_attack(),
+                             "A cancel shouldn't stop later searches.")
+            self.assertGreater(minimax.control.nodes, 0)
+
+    def test_budget_falls_back_to_best_so_far(self):
+        """
+        Test to make sure a BudgetedPlaystyle returns a move within its budget
+        when the inner search can't finish in time.
+        """
+        for key in ['mr', 'mi']:
+            inner = PLAYSTYLE_CLASSES[key](self.battle_queue)
+            budgeted = BudgetedPlaystyle(self.battle_queue, inner, 0.2)
+
+            start = time.perf_counter()
+            move = budgeted.select_attack()
+            elapsed = time.perf_counter() - start
+
+            self.assertIn(move, ['A', 'S'])
+            self.assertLess(elapsed, 0.25,
+                            ("A move with a 0.2s budget took {:.3f}s to " +
+                             "pick.").format(elapsed))
+            self.assertEqual(0, budgeted.tier_counts['search'],
+                             "The full game can't be searched in 0.2s.")
+            self.assertEqual(1, budgeted.tier_counts['best_so_far'] +
+                             budgeted.tier_counts['greedy'])
+
+    def test_budget_waits_for_leftover_search(self):
+        """
+        Test to make sure a BudgetedPlaystyle whose cancelled search doesn't
+        stop in time never starts another search until it has, and still
+        keeps to its budget.
+        """
+        inner = SlowPlaystyle(self.battle_queue, 0.3)
+        budgeted = BudgetedPlaystyle(self.battle_queue, inner, 0.1)
+        for _ in range(3):
+            start = time.perf_counter()
+            self.assertIn(budgeted.select_attack(), ['A', 'S'])
+            elapsed = time.perf_counter() - start
+            self.assertLess(elapsed, 0.15,
+                            ("A move with a 0.1s budget took {:.3f}s to " +
+                             "pick.").format(elapsed))
+        self.assertEqual(1, inner.counts['started'],
+                         "No search should start while one is still running.")
+        self.assertEqual(3, budgeted.tier_counts['greedy'])
+
+        time.sleep(0.3)
+        budgeted.select_attack()
+        self.assertEqual(2, inner.counts['started'])
+        self.assertEqual(1, inner.counts['most'],
+                         "Searches shouldn't run at the same time.")
+
+    def test_budget_uses_finished_search(self):
+        """
+        Test to make sure a BudgetedPlaystyle uses the inner Playstyle's move
+        when it finishes in time.
+        """
+        budgeted = BudgetedPlaystyle(self.battle_queue,
+                                     RandomPlaystyle(self.battle_queue), 0.5)
+        for _ in range(3):
+            self.assertIn(budgeted.select_attack(), ['A', 'S'])
+        self.assertEqual({'search': 3, 'best_so_far': 0, 'greedy': 0},
+                         budgeted.tier_counts)
+
+
+class CheckpointUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        Sets up a Checkpoint in a temporary directory and a Rogue and a Mage
+        for each kind of Battle Queue.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint = Checkpoint(os.path.join(self.directory.name,
+                                                  'solve.ckpt'), 50)
+        self.battle_queues = []
+        for queue_class in [BattleQueue, RestrictedBattleQueue]:
+            battle_queue = queue_class()
+            playstyle = ManualPlaystyle(battle_queue)
+            p1 = RogueConstructor("R", battle_queue, playstyle)
+            p2 = MageConstructor("M", battle_queue, playstyle)
+            p1.enemy = p2
+            p2.enemy = p1
+            battle_queue.add(p1)
+            battle_queue.add(p2)
+            p1.set_sp(40)
+            p2.set_sp(70)
+            self.battle_queues.append(battle_queue)
+
+    def tearDown(self):
+        """
+        Delete the attributes that were created in setUp.
+        """
+        self.directory.cleanup()
+        del self.checkpoint
+        del self.battle_queues
+
+    def test_resume_after_crash(self):
+        """
+        Test to make sure a search that crashed resumes from its last save and
+        returns the same score as an uninterrupted search.
+        """
+        def crash(nodes, _):
+            """
+            Simulate a crash part of the way through the search.
+            """
+            if nodes == 300:
+                raise RuntimeError("crash")
+
+        for battle_queue in self.battle_queues:
+            full_search = SearchControl()
+            expected = get_state_score_iterative(battle_queue, full_search)
+
+            with self.assertRaises(RuntimeError):
+                get_state_score_iterative(battle_queue,
+                                          SearchControl(crash, 100),
+                                          self.checkpoint)
+            self.assertTrue(os.path.exists(self.checkpoint.path),
+                            "The crashed search should have saved.")
+
+            control = SearchControl()
+            actual = get_state_score_iterative(battle_queue, control,
+                                               self.checkpoint)
+            self.assertEqual(expected, actual,
+                             ("The resumed search on:\n{}\nShould return " +
+                              "{} but got {} instead.").format(battle_queue,
+                                                               expected,
+                                                               actual))
+            self.assertLessEqual(control.nodes, full_search.nodes - 250,
+                                 "The resumed search should not start over.")
+            self.assertFalse(os.path.exists(self.checkpoint.path),
+                             "A finished search should discard its save.")
+
+    def test_cancelled_search_saves(self):
+        """
+        Test to make sure a cancelled search saves its progress, and that the
+        save is ignored by searches on another Battle Queue.
+        """
+        battle_queue, other = self.battle_queues
+        control = SearchControl()
+        control.progress = lambda nodes, _: control.cancel()
+        control.interval = 20
+        with self.assertRaises(SearchCancelled):
+            get_state_score_iterative(battle_queue, control, self.checkpoint)
+        self.assertTrue(os.path.exists(self.checkpoint.path))
+
+        expected = get_state_score_iterative(other)
+        actual = get_state_score_iterative(other, None, self.checkpoint)
+        self.assertEqual(expected, actual)
+
+
+class MTDfUnitTests(unittest.TestCase):
+    def test_matches_get_state_score(self):
+        """
+        Test to make sure search_mtdf finds the same score as get_state_score
+        on the standard matchups, while searching fewer nodes.
+        """
+        for p1_key, p2_key in [('s', 'm'), ('v', 's'), ('m', 'm'),
+                               ('r', 'v')]:
+            for queue_class in [BattleQueue, RestrictedBattleQueue]:
+                battle_queue = set_up_matchup(p1_key, p2_key, queue_class)
+                battle_queue.peek().set_sp(60)
+                full_window = SearchControl(prune=False)
+                expected = get_state_score(battle_queue, full_window)
+                mtdf = SearchControl()
+                actual, passes = search_mtdf(battle_queue, 0, None, mtdf)
+
+                self.assertEqual(expected, actual,
+                                 ("search_mtdf on:\n{}\nShould return {} " +
+                                  "but got {} instead.").format(battle_queue,
+                                                                expected,
+                                                                actual))
+                self.assertGreaterEqual(passes, 1)
+                self.assertLess(mtdf.nodes, full_window.nodes,
+                                ("search_mtdf on:\n{}\nSearched {} nodes, " +
+                                 "get_state_score only {}.").format(
+                                     battle_queue, mtdf.nodes,
+                                     full_window.nodes))
+
+    def test_select_attack_reports_passes(self):
+        """
+        Test to make sure the MTD(f) playstyle picks the same moves as the
+        recursive minimax playstyle and reports its passes for each move.
+        """
+        battle_queue = set_up_matchup('r', 'm')
+        rogue, mage = battle_queue.peek(), battle_queue.peek().enemy
+        for rogue_sp, mage_hp in [(12, 28), (100, 27), (5, 100)]:
+            rogue.set_sp(rogue_sp)
+            mage.set_hp(mage_hp)
+            mtdf = PLAYSTYLE_CLASSES['mf'](battle_queue)
+            expected = PLAYSTYLE_CLASSES['mr'](battle_queue).select_attack()
+            self.assertEqual(expected, mtdf.select_attack())
+            self.assertEqual(rogue.get_available_actions(),
+                             list(mtdf.passes.keys()))
+
+
+class MaxPliesUnitTests(unittest.TestCase):
+    def test_searches_agree(self):
+        """
+        Test to make sure every search finds the same score when games are
+        cut short after max_plies moves, under either adjudication rule.
+        """
+        for p1_key, p2_key in [('r', 'm'), ('v', 'r'), ('s', 'm')]:
+            for queue_class in [BattleQueue, RestrictedBattleQueue]:
+                battle_queue = set_up_matchup(p1_key, p2_key, queue_class)
+                for adjudication in ['draw', 'hp']:
+                    expected = get_state_score(
+                        battle_queue, SearchControl(prune=False, max_plies=6,
+                                                    adjudication=adjudication))
+                    for search in [get_state_score, get_state_score_iterative,
+                                   lambda bq, control: search_mtdf(
+                                       bq, 0, None, control)[0]]:
+                        control = SearchControl(max_plies=6, verify=True,
+                                                adjudication=adjudication)
+                        actual = search(battle_queue, control)
+                        self.assertEqual(expected, actual,
+                                         ("{} with {} adjudication on:\n{}\n"
+                                          "Should return {} but got {} "
+                                          "instead.").format(
+                                              search, adjudication,
+                                              battle_queue, expected, actual))
+
+    def test_nodes_are_bounded(self):
+        """
+        Test to make sure a search with max_plies visits at most the states
+        within max_plies moves, however long the game.
+        """
+        battle_queue = set_up_matchup('r', 'm')
+        for max_plies in range(5):
+            control = SearchControl(prune=False, max_plies=max_plies)
+            get_state_score(battle_queue, control)
+            self.assertLessEqual(control.nodes, 2 ** (max_plies + 1) - 1)
+            self.assertGreater(control.adjudicated, 0)
+
+    def test_adjudication_rules(self):
+        """
+        Test to make sure unfinished games are scored as a draw or by the HP
+        lead of the next player, and that a long enough search is exact.
+        """
+        battle_queue = set_up_matchup('m', 'r')
+        battle_queue.peek().set_hp(70)
+        hp = SearchControl(max_plies=0, adjudication='hp')
+        self.assertEqual(-30, get_state_score(battle_queue, hp))
+        self.assertEqual(1, hp.adjudicated)
+        self.assertEqual(0, get_state_score(battle_queue,
+                                            SearchControl(max_plies=0)))
+
+        battle_queue.peek().set_sp(30)
+        battle_queue.peek().enemy.set_sp(30)
+        expected = get_state_score(battle_queue)
+        for adjudication in ['draw', 'hp']:
+            control = SearchControl(max_plies=100, adjudication=adjudication)
+            self.assertEqual(expected, get_state_score(battle_queue, control))
+            self.assertEqual(0, control.adjudicated,
+                             "No game lasts 100 moves.")
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
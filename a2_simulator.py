@@ -0,0 +1,179 @@
+"""
+The lockstep random game simulator for A2.
+
+RandomGameSimulator plays thousands of games from the same position at once,
+with every player picking a random available action like a RandomPlaystyle.
+Instead of one BattleQueue per game, the games are the rows of the NumPy
+arrays used by FrontierSolver in a2_frontier (the HP and SP of both players
+and the queue packed into bits), and every step moves each game that isn't
+over forward by one turn.
+
+Each turn is played like a2_game.perform_attack plays it: the next character
+uses its action, and is then removed from the queue if it can still act,
+following the rules of a BattleQueue or RestrictedBattleQueue and the skills
+in a2_skills. The searches remove the character first instead, which plays
+differently when a skill clears the queue or a RestrictedBattleQueue checks
+the entry at the front.
+"""
+from typing import Dict, List, Union
+import numpy as np
+from a2_frontier import FrontierSolver, HP, SP, ORDER
+
+# The number that stands for each move in RandomGameSimulator.moves.
+MOVE_NUMBERS = {'A': 0, 'S': 1}
+
+
+class RandomGameSimulator(FrontierSolver):
+    """
+    A class representing games played by random moves from one position.
+    Inherits from FrontierSolver.
+
+    games - the number of games played.
+    states - the state of each game, as a row of FrontierSolver's columns.
+    moves - the move made in each game at each turn so far, as an array of
+            MOVE_NUMBERS with one row per turn, or -1 if the game was over.
+    _rng - the NumPy Generator that picks the moves.
+    """
+    games: int
+    states: np.ndarray
+    moves: List[np.ndarray]
+    _rng: np.random.Generator
+
+    def __init__(self, battle_queue: 'BattleQueue', games: int,
+                 seed: Union[None, int] = None) -> None:
+        """
+        Initialize this RandomGameSimulator to play games games from the
+        position in battle_queue, picking moves with a NumPy Generator seeded
+        with seed.
+
+        Extends the super
+
+        >>> from a2_battle_queue import BattleQueue
+        >>> from a2_characters import Rogue, Mage
+        >>> from a2_playstyle import ManualPlaystyle
+        >>> bq = BattleQueue()
+        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+        >>> m = Mage("m", bq, ManualPlaystyle(bq))
+        >>> r.enemy = m
+        >>> m.enemy = r
+        >>> bq.add(r)
+        >>> bq.add(m)
+        >>> simulator = RandomGameSimulator(bq, 1000, seed=50)
+        >>> simulator.states.shape[0]
+        1000
+        """
+        bq = battle_queue.copy()
+        if bq.is_empty():
+            # An empty queue has no next player to look the players up by.
+            raise ValueError("can't simulate games from an empty queue")
+        super().__init__(bq)
+        self.games = games
+        self.states = np.repeat(self._root, games, axis=0)
+        self._clean(self.states)
+        self.moves = []
+        self._rng = np.random.default_rng(seed)
+
+    def step(self) -> bool:
+        """
+        Play one turn of every game that isn't over. Return whether any game
+        was still going.
+        """
+        states = self.states
+        going = ~self._is_over(states)
+        moves = np.full(self.games, -1, dtype=np.int8)
+        if not going.any():
+            return False
+
+        front = states[:, ORDER] & 1
+        # Like random.choice, pick each available action equally often.
+        coin = self._rng.random(self.games) < 0.5
+        for k in [0, 1]:
+            sp = states[:, SP + k]
+            can_attack = sp >= self._costs[k][0]
+            can_special = sp >= self._costs[k][1]
+            acting = going & (front == k)
+            special = acting & can_special & (coin | ~can_attack)
+            for move, rows in [('A', acting & can_attack & ~special),
+                               ('S', special)]:
+                rows = np.nonzero(rows)[0]
+                if rows.size > 0:
+                    states[rows] = self._move(states[rows], k, move,
+                                              act_first=True)
+                    moves[rows] = MOVE_NUMBERS[move]
+
+        self._clean(states)
+        self._check_length(states)
+        self.moves.append(moves)
+        return True
+
+    def run(self) -> np.ndarray:
+        """
+        Play every game until it's over, and return the winners, as given by
+        get_winners.
+        """
+        while self.step():
+            pass
+        return self.get_winners()
+
+    def get_winners(self) -> np.ndarray:
+        """
+        Return the player who won each game, as their position in the
+        snapshot of the BattleQueue the games started from, or -1 if nobody
+        has won it (yet).
+        """
+        return np.where(self._is_over(self.states),
+                        self._winners(self.states), -1)
+
+    def get_hp(self) -> np.ndarray:
+        """
+        Return the HP of both players in each game, one row per game.
+        """
+        return self.states[:, HP:HP + 2].copy()
+
+    def get_sp(self) -> np.ndarray:
+        """
+        Return the SP of both players in each game, one row per game.
+        """
+        return self.states[:, SP:SP + 2].copy()
+
+
+def get_win_rates(battle_queue: 'BattleQueue', games: int = 10000,
+                  seed: Union[None, int] = None) \
+        -> Dict[Union[None, int], float]:
+    """
+    Return the fraction of games games from the position in battle_queue that
+    each character wins, by the character's position in the snapshot of
+    battle_queue (0 or 1), and that nobody wins under None, when both
+    characters pick random available actions. Characters with the same name
+    are still told apart.
+
+    Raise ValueError if battle_queue is empty or can't be simulated by a
+    FrontierSolver.
+
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> bq.add(r)
+    >>> bq.add(m)
+    >>> rates = get_win_rates(bq, 1000, seed=50)
+    >>> sorted(rates, key=str)
+    [0, 1, None]
+    >>> bq.snapshot()[0][1]
+    'r'
+    >>> round(sum(rates.values()), 6)
+    1.0
+    """
+    winners = RandomGameSimulator(battle_queue, games, seed).run()
+    return {0: float(np.mean(winners == 0)),
+            1: float(np.mean(winners == 1)),
+            None: float(np.mean(winners == -1))}
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
@@ -0,0 +1,146 @@
+"""
+Unittests for the lockstep random game simulator in A2.
+
+These tests check that every game the simulator plays ends exactly like the
+same moves played one at a time by a2_game.perform_attack on a BattleQueue or
+RestrictedBattleQueue, and that the moves are picked at random among the
+available actions.
+"""
+import random
+import unittest
+
+import numpy as np
+
+import a2_game
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import ManualPlaystyle
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue
+from a2_simulator import RandomGameSimulator, get_win_rates, MOVE_NUMBERS
+from a2_skill_decision_tree import create_default_tree
+
+QUEUE_CLASSES = [BattleQueue, RestrictedBattleQueue]
+
+
+def set_up_matchup(p1_key, p2_key, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_key followed by
+    a new character of class p2_key, as keyed in CHARACTER_CLASSES.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = CHARACTER_CLASSES[p1_key]("P1", battle_queue, playstyle)
+    p2 = CHARACTER_CLASSES[p2_key]("P2", battle_queue, playstyle)
+    for key, character in [(p1_key, p1), (p2_key, p2)]:
+        if key == 's':
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+class SimulatorUnitTests(unittest.TestCase):
+    def test_games_match_battle_queues(self):
+        """
+        Test to make sure replaying the moves of simulated games, from full
+        and random positions, with perform_attack ends each game with the
+        same HP, SP and winner.
+        """
+        for name in ['BATTLE_QUEUE', 'LAST_KEY_PRESSED', 'GAME_IS_OVER',
+                     'GAME_WINNER']:
+            self.addCleanup(setattr, a2_game, name, getattr(a2_game, name))
+        rng = random.Random(50)
+        names = {number: move for move, number in MOVE_NUMBERS.items()}
+        for queue_class in QUEUE_CLASSES:
+            for _ in range(20):
+                keys = rng.choice('mrvs'), rng.choice('mrvs')
+                start = set_up_matchup(*keys, queue_class)
+                if rng.random() < 0.5:
+                    for character in [start.peek(), start.peek().enemy]:
+                        character.set_hp(rng.randint(1, 100))
+                        character.set_sp(rng.randint(10, 100))
+                simulator = RandomGameSimulator(start, 30,
+                                                rng.randrange(2 ** 32))
+                winners = simulator.run()
+                moves = np.array(simulator.moves).reshape(-1, 30)
+                hp, sp = simulator.get_hp(), simulator.get_sp()
+
+                for game in range(30):
+                    battle_queue = start.copy()
+                    players = [battle_queue.peek(), battle_queue.peek().enemy]
+                    if battle_queue.snapshot()[2][0] == 1:
+                        players.reverse()
+                    a2_game.BATTLE_QUEUE = battle_queue
+                    for move in moves[:, game]:
+                        if move == -1:
+                            break
+                        self.assertFalse(battle_queue.is_over())
+                        self.assertIn(names[move], battle_queue.peek()
+                                      .get_available_actions())
+                        a2_game.LAST_KEY_PRESSED = names[move]
+                        a2_game.perform_attack()
+                    self.assertTrue(battle_queue.is_over())
+                    self.assertEqual([p.get_hp() for p in players],
+                                     list(hp[game]))
+                    self.assertEqual([p.get_sp() for p in players],
+                                     list(sp[game]))
+                    winner = battle_queue.get_winner()
+                    self.assertEqual(-1 if winner is None else
+                                     players.index(winner), winners[game],
+                                     "{} v {} on a {}".format(
+                                         *keys, queue_class.__name__))
+
+    def test_moves_are_random(self):
+        """
+        Test to make sure both moves are picked about equally often when both
+        are available, and that the same seed plays the same games.
+        """
+        battle_queue = set_up_matchup('r', 'm')
+        simulator = RandomGameSimulator(battle_queue, 2000, 1)
+        simulator.step()
+        first_moves = simulator.moves[0]
+        self.assertTrue(900 < np.sum(first_moves == MOVE_NUMBERS['S']) < 1100,
+                        "A full Rogue should special attack half the time.")
+
+        self.assertEqual(get_win_rates(battle_queue, 500, 7),
+                         get_win_rates(battle_queue, 500, 7))
+        rates = get_win_rates(battle_queue, 500, 7)
+        self.assertEqual({0, 1, None}, set(rates))
+        self.assertAlmostEqual(1.0, sum(rates.values()))
+
+    def test_win_rates_with_same_names(self):
+        """
+        Test to make sure get_win_rates tells apart characters with the same
+        name.
+        """
+        battle_queue = BattleQueue()
+        playstyle = ManualPlaystyle(battle_queue)
+        p1 = CHARACTER_CLASSES['r']("P", battle_queue, playstyle)
+        p2 = CHARACTER_CLASSES['m']("P", battle_queue, playstyle)
+        p1.enemy = p2
+        p2.enemy = p1
+        battle_queue.add(p1)
+        battle_queue.add(p2)
+        p2.set_hp(5)
+        rates = get_win_rates(battle_queue, 500, 7)
+        self.assertEqual({0: 1.0, 1: 0.0, None: 0.0}, rates,
+                         "The Rogue finishes the Mage straight away.")
+
+    def test_over_and_empty_queues(self):
+        """
+        Test to make sure games that are already over aren't played, and that
+        an empty queue can't be simulated.
+        """
+        battle_queue = set_up_matchup('v', 'r')
+        battle_queue.peek().enemy.set_hp(0)
+        simulator = RandomGameSimulator(battle_queue, 10, 0)
+        self.assertEqual([0] * 10, list(simulator.run()))
+        self.assertEqual([], simulator.moves)
+
+        with self.assertRaises(ValueError):
+            RandomGameSimulator(BattleQueue(), 10)
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
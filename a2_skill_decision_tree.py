@@ -150,6 +150,26 @@ class SkillDecisionTree:
         skill = self.find_skill_by_priority(priority)
         return skill[0]
 
+    def get_structure(self) -> tuple:
+        """
+        Return a tuple describing this SkillDecisionTree, equal for trees
+        that pick the same skills. Conditions are told apart by their code and
+        the values they close over, so the same function defined again gives
+        the same structure.
+
+        >>> t = create_default_tree()
+        >>> t.get_structure() == create_default_tree().get_structure()
+        True
+        >>> t = SkillDecisionTree(MageAttack(), lambda c, t: True, 1)
+        >>> t.get_structure() == create_default_tree().get_structure()
+        False
+        """
+        closure = getattr(self.condition, '__closure__', None) or ()
+        return (self.value, self.priority,
+                getattr(self.condition, '__code__', self.condition),
+                tuple(cell.cell_contents for cell in closure),
+                tuple(child.get_structure() for child in self.children))
+
 
 def create_default_tree() -> SkillDecisionTree:
     """
@@ -4,13 +4,41 @@ The Skill classes for A2.
 See a2_characters.py for how these are used.
 For any skills you make, you're responsible for making sure their style adheres
 to PythonTA and that you include all documentation for it.
+
+Every skill is described by a spec in a2_specs.json (see a2_specs.py), which
+SpecSkill compiles into the effects it has when it's used. SKILL_TABLE holds
+the Skill for each action of each character spec.
 """
+from typing import Callable, Dict, Tuple, Union
+from a2_specs import SPECS
 
 
 class Skill:
     """
     An abstract superclass for all Skills.
+
+    Skills never change once they're made, so each Skill class (with each
+    cost and damage) only ever has one instance, shared by every character
+    that uses it: making it again returns the same Skill.
+
+    _instances - the instance of each Skill class, cost and damage
     """
+    __slots__ = ('_cost', '_damage')
+    _instances: Dict[Tuple, 'Skill'] = {}
+
+    def __new__(cls, *args: Union[int, str]) -> 'Skill':
+        """
+        Return the one instance of cls with args, making it the first time.
+
+        >>> MageAttack() is MageAttack()
+        True
+        >>> MageAttack() is RogueAttack()
+        False
+        """
+        key = (cls,) + args
+        if key not in Skill._instances:
+            Skill._instances[key] = super().__new__(cls)
+        return Skill._instances[key]
 
     def __init__(self, cost: int, damage: int) -> None:
         """
@@ -38,350 +66,359 @@ class Skill:
         """
         raise NotImplementedError
 
-    def _deal_damage(self, caster: 'Character', target: 'Character') -> None:
-        """
-        Reduces the SP of caster and inflicts damage on target.
-        """
-        caster.reduce_sp(self._cost)
-        target.apply_damage(self._damage)
+
+Effect = Callable[['Character', 'Character', int, int], None]
 
 
-class NormalAttack(Skill):
+def _add_caster(caster: 'Character', target: 'Character', damage: int,
+                target_hp: int) -> None:
     """
-    A class representing a NormalAttack.
-    Not to be instantiated.
+    Add caster to its BattleQueue.
     """
-
-    def use(self, caster: 'Character', target: 'Character') -> None:
-        """
-        Makes caster use this Skill on target.
-        """
-        self._deal_damage(caster, target)
-        caster.battle_queue.add(caster)
+    caster.battle_queue.add(caster)
 
 
-class MageAttack(NormalAttack):
+def _add_target(caster: 'Character', target: 'Character', damage: int,
+                target_hp: int) -> None:
     """
-    A class representing a Mage's Attack.
+    Add target to caster's BattleQueue.
     """
+    caster.battle_queue.add(target)
 
-    def __init__(self) -> None:
-        """
-        Initialize this MageAttack.
 
-        >>> m = MageAttack()
-        >>> m.get_sp_cost()
-        5
-        """
-        super().__init__(5, 20)
+def _clear(caster: 'Character', target: 'Character', damage: int,
+           target_hp: int) -> None:
+    """
+    Remove everything from caster's BattleQueue.
+    """
+    caster.battle_queue.clear()
 
 
-class MageSpecial(Skill):
+def _lifesteal(caster: 'Character', target: 'Character', damage: int,
+               target_hp: int) -> None:
     """
-    A class representing a Mage's Special Attack.
+    Heal caster by the damage target took, or by the target_hp that target
+    had before the damage if it fell.
     """
+    if target.get_hp() == 0:
+        caster.set_hp(caster.get_hp() + target_hp)
+    else:
+        caster.set_hp(caster.get_hp() + (damage - target.get_defense()))
 
-    def __init__(self) -> None:
-        """
-        Initialize this MageAttack.
 
-        >>> m = MageSpecial()
-        >>> m.get_sp_cost()
-        30
-        """
-        super().__init__(30, 40)
-
-    def use(self, caster: 'Character', target: 'Character') -> None:
-        """
-        Makes caster use a Mage's SpecialAttack on target.
-
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_characters import Rogue, Mage
-        >>> bq = BattleQueue()
-        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
-        >>> m = Mage("m", bq, ManualPlaystyle(bq))
-        >>> r.enemy = m
-        >>> m.enemy = r
-        >>> m.special_attack()
-        >>> m.get_sp()
-        70
-        >>> r.get_hp()
-        70
-        """
-        self._deal_damage(caster, target)
-        caster.battle_queue.add(target)
-        caster.battle_queue.add(caster)
+# The function for each effect named in a skill spec.
+EFFECTS: Dict[str, Effect] = {'add_caster': _add_caster,
+                              'add_target': _add_target,
+                              'clear': _clear,
+                              'lifesteal': _lifesteal}
 
 
-class RogueAttack(NormalAttack):
+class SpecSkill(Skill):
     """
-    A class representing a Rogue's Attack.
+    A Skill described by its spec in a2_specs.json.
+
+    Using a SpecSkill makes the caster pay its cost and deals its damage to
+    the target, then calls the function for each of its effects in order.
+
+    _name - the name of this SpecSkill's spec
+    _tree_damage - whether this SpecSkill deals the damage of the skill
+                   picked by the caster's skill decision tree
+    _effect_names - the names of this SpecSkill's effects, in order
+    _effects - the function for each of _effect_names
+    _classes - the subclass for each spec that has one, by name
+
+    >>> skill = SpecSkill('MageAttack')
+    >>> skill.get_sp_cost(), skill.get_damage(), skill.get_effects()
+    (5, 20, ('add_caster',))
+    >>> skill is SpecSkill('MageAttack')
+    True
     """
+    __slots__ = ('_name', '_tree_damage', '_effect_names', '_effects')
+    _name: str
+    _tree_damage: bool
+    _effect_names: Tuple[str, ...]
+    _effects: Tuple[Effect, ...]
+    _classes: Dict[str, type] = {}
 
-    def __init__(self) -> None:
+    def __init_subclass__(cls, **kwargs) -> None:
         """
-        Initialize this RogueAttack.
-
-        >>> r = RogueAttack()
-        >>> r.get_sp_cost()
-        3
+        Record cls as the class for the spec with its name.
         """
-        super().__init__(3, 15)
-
+        super().__init_subclass__(**kwargs)
+        SpecSkill._classes[cls.__name__] = cls
 
-class RogueSpecial(Skill):
-    """
-    A class representing a Rogue's Special Attack.
-    """
-
-    def __init__(self) -> None:
+    def __init__(self, name: Union[None, str] = None) -> None:
         """
-        Initialize this RogueSpecial.
+        Initialize this SpecSkill from the spec called name, or the spec
+        named after its class if name is None.
 
-        >>> r = RogueSpecial()
-        >>> r.get_sp_cost()
-        10
+        Extends the super
         """
-        super().__init__(10, 20)
+        if name is None:
+            name = type(self).__name__
+        spec = SPECS['skills'][name]
+        super().__init__(spec['cost'], spec['damage'])
+        self._name = name
+        self._tree_damage = spec.get('tree_damage', False)
+        self._effect_names = tuple(spec['effects'])
+        self._effects = tuple(EFFECTS[effect] for effect in spec['effects'])
 
-    def use(self, caster: 'Character', target: 'Character') -> None:
+    def get_effects(self) -> Tuple[str, ...]:
         """
-        Makes caster use a Rogue's SpecialAttack on target.
-
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_characters import Rogue, Mage
-        >>> bq = BattleQueue()
-        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
-        >>> m = Mage("m", bq, ManualPlaystyle(bq))
-        >>> r.enemy = m
-        >>> m.enemy = r
-        >>> r.special_attack()
-        >>> r.get_sp()
-        90
-        >>> m.get_hp()
-        88
+        Return the names of the effects of this SpecSkill, in order.
         """
-        self._deal_damage(caster, target)
-        caster.battle_queue.add(caster)
-        caster.battle_queue.add(caster)
+        return self._effect_names
 
-
-class VampireAttack(NormalAttack):
-    """
-    A class representing a Vampire's Attack. Inherits from the NormallAttack.
-    """
-
-    def __init__(self) -> None:
+    def has_lifesteal(self) -> bool:
         """
-        Initialize this VampireAttack.
-
-        Inherits from the Super
+        Return whether this SpecSkill heals its caster.
+        """
+        return 'lifesteal' in self._effect_names
 
-        >>> v = VampireAttack()
-        >>> v.get_sp_cost()
-        15
+    def uses_tree(self) -> bool:
+        """
+        Return whether this SpecSkill deals the damage of the skill picked
+        by the caster's skill decision tree instead of its own.
         """
-        super().__init__(15, 20)
+        return self._tree_damage
 
     def use(self, caster: 'Character', target: 'Character') -> None:
         """
         Makes caster use this Skill on target.
 
-        Extends the Super()
-
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> from a2_characters import Vampire
-        >>> bq = BattleQueue()
-        >>> c = Vampire("r", bq, ManualPlaystyle(bq))
-        >>> c2 = Vampire("r2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c.get_defense()
-        3
-        >>> c.get_hp()
-        100
-        >>> c2.get_hp()
-        100
-        >>> c.attack()
-        >>> c.get_hp()
-        117
-        >>> c2.get_hp()
-        83
-        >>> c2._hp = 3
-        >>> c.attack()
-        >>> c.get_hp()
-        120
+        Overrides the super
         """
-        orig_target_hp = target.get_hp()
-        super().use(caster, target)
-        if target.get_hp() == 0:
-            new_hp = caster.get_hp() + orig_target_hp
+        if self._tree_damage:
+            damage = caster.tree.pick_skill(caster, target).get_damage()
         else:
-            new_hp = caster.get_hp() + (self._damage - target.get_defense())
-        caster.set_hp(new_hp)
+            damage = self._damage
+        target_hp = target.get_hp()
+        caster.reduce_sp(self._cost)
+        target.apply_damage(damage)
+        for effect in self._effects:
+            effect(caster, target, damage, target_hp)
 
 
-class VampireSpecial(Skill):
+def make_skill(name: str) -> SpecSkill:
     """
-    A class representing a Vampire's Special Attack. Inherits from the SKill.
+    Return the Skill for the spec called name, as an instance of the
+    SpecSkill subclass named after it if there is one.
+
+    >>> make_skill('MageAttack') is MageAttack()
+    True
     """
+    if name in SpecSkill._classes:
+        return SpecSkill._classes[name]()
+    return SpecSkill(name)
 
-    def __init__(self) -> None:
-        """
-        Initialize this VampireSpecial.
 
-        Inherits from the Super
+class MageAttack(SpecSkill):
+    """
+    A class representing a Mage's Attack.
 
-        >>> v = VampireSpecial()
-        >>> v.get_sp_cost()
-        20
-        """
-        super().__init__(20, 30)
+    >>> m = MageAttack()
+    >>> m.get_sp_cost()
+    5
+    """
+    __slots__ = ()
 
-    def use(self, caster: 'Character', target: 'Character') -> None:
-        """
-        Makes caster use a Vampire's SpecialAttack on target.
 
-        Overrides the super
+class MageSpecial(SpecSkill):
+    """
+    A class representing a Mage's Special Attack.
 
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_characters import Vampire, Mage
-        >>> bq = BattleQueue()
-        >>> v = Vampire("r", bq, ManualPlaystyle(bq))
-        >>> m = Mage("m", bq, ManualPlaystyle(bq))
-        >>> v.enemy = m
-        >>> m.enemy = v
-        >>> bq.add(v)
-        >>> bq.add(m)
-        >>> bq
-        r (Vampire): 100/100 -> m (Mage): 100/100
-        >>> v.special_attack()
-        >>> v.get_sp()
-        80
-        >>> m.get_hp()
-        78
-        """
-        orig_target_hp = target.get_hp()
-        self._deal_damage(caster, target)
-        if target.get_hp() == 0:
-            new_hp = caster.get_hp() + orig_target_hp
-        else:
-            new_hp = caster.get_hp() + (self._damage - target.get_defense())
-        caster.set_hp(new_hp)
-        caster.battle_queue.add(caster)
-        caster.battle_queue.add(caster)
-        caster.battle_queue.add(target)
+    >>> m = MageSpecial()
+    >>> m.get_sp_cost()
+    30
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> m.special_attack()
+    >>> m.get_sp()
+    70
+    >>> r.get_hp()
+    70
+    """
+    __slots__ = ()
 
 
-class SorcererAttack(NormalAttack):
+class RogueAttack(SpecSkill):
     """
-    A class representing a Sorcerer's Attack. Inherits from the NormalAttack
+    A class representing a Rogue's Attack.
+
+    >>> r = RogueAttack()
+    >>> r.get_sp_cost()
+    3
     """
+    __slots__ = ()
 
-    def __init__(self) -> None:
-        """
-        Initialize this SorcererAttzck.
 
-        Inherits from the Super
+class RogueSpecial(SpecSkill):
+    """
+    A class representing a Rogue's Special Attack.
 
-        >>> s = SorcererAttack()
-        >>> s.get_sp_cost()
-        15
-        """
-        super().__init__(15, 0)
+    >>> r = RogueSpecial()
+    >>> r.get_sp_cost()
+    10
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Rogue, Mage
+    >>> bq = BattleQueue()
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> r.enemy = m
+    >>> m.enemy = r
+    >>> r.special_attack()
+    >>> r.get_sp()
+    90
+    >>> m.get_hp()
+    88
+    """
+    __slots__ = ()
 
-    def use(self, caster: 'Character', target: 'Character') -> None:
-        """
-        Makes caster use this Skill on target.
 
-        Overrides the Super
-
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> from a2_characters import Sorcerer
-        >>> from a2_skill_decision_tree import create_default_tree
-        >>> t = create_default_tree()
-        >>> bq = BattleQueue()
-        >>> c = Sorcerer("r", bq, ManualPlaystyle(bq))
-        >>> c2 = Sorcerer("r2", bq, ManualPlaystyle(bq))
-        >>> c.enemy = c2
-        >>> c2.enemy = c
-        >>> c.set_skill_decision_tree(t)
-        >>> c.get_defense()
-        10
-        >>> c2.get_hp()
-        100
-        >>> c.get_sp()
-        100
-        >>> c.attack()
-        >>> c.get_sp()
-        85
-        >>> c2.get_hp()
-        90
-        """
-        skill_to_use = caster.tree.pick_skill(caster, target)
-        caster.reduce_sp(self.get_sp_cost())
-        target.apply_damage(skill_to_use.get_damage())
-        caster.battle_queue.add(caster)
+class VampireAttack(SpecSkill):
+    """
+    A class representing a Vampire's Attack. Inherits from SpecSkill.
+
+    >>> v = VampireAttack()
+    >>> v.get_sp_cost()
+    15
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> from a2_characters import Vampire
+    >>> bq = BattleQueue()
+    >>> c = Vampire("r", bq, ManualPlaystyle(bq))
+    >>> c2 = Vampire("r2", bq, ManualPlaystyle(bq))
+    >>> c.enemy = c2
+    >>> c2.enemy = c
+    >>> c.get_defense()
+    3
+    >>> c.get_hp()
+    100
+    >>> c2.get_hp()
+    100
+    >>> c.attack()
+    >>> c.get_hp()
+    117
+    >>> c2.get_hp()
+    83
+    >>> c2._hp = 3
+    >>> c.attack()
+    >>> c.get_hp()
+    120
+    """
+    __slots__ = ()
 
 
-class SorcererSpecial(Skill):
+class VampireSpecial(SpecSkill):
     """
-    A class representing a Sorcerer's Special Attack. Inherits from the Skill.
+    A class representing a Vampire's Special Attack. Inherits from SpecSkill.
+
+    >>> v = VampireSpecial()
+    >>> v.get_sp_cost()
+    20
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Vampire, Mage
+    >>> bq = BattleQueue()
+    >>> v = Vampire("r", bq, ManualPlaystyle(bq))
+    >>> m = Mage("m", bq, ManualPlaystyle(bq))
+    >>> v.enemy = m
+    >>> m.enemy = v
+    >>> bq.add(v)
+    >>> bq.add(m)
+    >>> bq
+    r (Vampire): 100/100 -> m (Mage): 100/100
+    >>> v.special_attack()
+    >>> v.get_sp()
+    80
+    >>> m.get_hp()
+    78
     """
+    __slots__ = ()
 
-    def __init__(self) -> None:
-        """
-        Initialize this SorcererSpecial.
 
-        Inherits from the Super
+class SorcererAttack(SpecSkill):
+    """
+    A class representing a Sorcerer's Attack, which deals the damage of the
+    skill its caster's skill decision tree picks. Inherits from SpecSkill.
+
+    >>> s = SorcererAttack()
+    >>> s.get_sp_cost()
+    15
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> from a2_characters import Sorcerer
+    >>> from a2_skill_decision_tree import create_default_tree
+    >>> t = create_default_tree()
+    >>> bq = BattleQueue()
+    >>> c = Sorcerer("r", bq, ManualPlaystyle(bq))
+    >>> c2 = Sorcerer("r2", bq, ManualPlaystyle(bq))
+    >>> c.enemy = c2
+    >>> c2.enemy = c
+    >>> c.set_skill_decision_tree(t)
+    >>> c.get_defense()
+    10
+    >>> c2.get_hp()
+    100
+    >>> c.get_sp()
+    100
+    >>> c.attack()
+    >>> c.get_sp()
+    85
+    >>> c2.get_hp()
+    90
+    """
+    __slots__ = ()
 
-        >>> s = SorcererSpecial()
-        >>> s.get_sp_cost()
-        20
-        """
-        super().__init__(20, 25)
 
-    def use(self, caster: 'Character', target: 'Character') -> None:
-        """
-        Makes caster use a Sorcerer's SpecialAttack on target.
-
-        Overrides the Super
-
-        >>> from a2_playstyle import ManualPlaystyle
-        >>> from a2_battle_queue import BattleQueue
-        >>> from a2_characters import Sorcerer, Rogue
-        >>> bq = BattleQueue()
-        >>> s = Sorcerer("s", bq, ManualPlaystyle(bq))
-        >>> r = Rogue("r", bq, ManualPlaystyle(bq))
-        >>> s.enemy = r
-        >>> r.enemy = s
-        >>> bq.add(s)
-        >>> bq.add(r)
-        >>> bq.add(r)
-        >>> bq.add(s)
-        >>> bq.add(r)
-        >>> bq
-        s (Sorcerer): 100/100 -> r (Rogue): 100/100 -> r (Rogue): 100/100 -> s (Sorcerer): 100/100 -> r (Rogue): 100/100
-        >>> s.special_attack()
-        >>> bq
-        s (Sorcerer): 100/80 -> r (Rogue): 85/100 -> s (Sorcerer): 100/80
-        >>> s.get_sp()
-        80
-        >>> r.get_hp()
-        85
-        """
-        self._deal_damage(caster, target)
-        while not caster.battle_queue.is_empty():
-            caster.battle_queue.remove()
-        caster.battle_queue.add(caster)
-        caster.battle_queue.add(target)
-        caster.battle_queue.add(caster)
+class SorcererSpecial(SpecSkill):
+    """
+    A class representing a Sorcerer's Special Attack. Inherits from
+    SpecSkill.
+
+    >>> s = SorcererSpecial()
+    >>> s.get_sp_cost()
+    20
+    >>> from a2_playstyle import ManualPlaystyle
+    >>> from a2_battle_queue import BattleQueue
+    >>> from a2_characters import Sorcerer, Rogue
+    >>> bq = BattleQueue()
+    >>> s = Sorcerer("s", bq, ManualPlaystyle(bq))
+    >>> r = Rogue("r", bq, ManualPlaystyle(bq))
+    >>> s.enemy = r
+    >>> r.enemy = s
+    >>> bq.add(s)
+    >>> bq.add(r)
+    >>> bq.add(r)
+    >>> bq.add(s)
+    >>> bq.add(r)
+    >>> bq  # doctest: +NORMALIZE_WHITESPACE
+    s (Sorcerer): 100/100 -> r (Rogue): 100/100 -> r (Rogue): 100/100 ->
+    s (Sorcerer): 100/100 -> r (Rogue): 100/100
+    >>> s.special_attack()
+    >>> bq
+    s (Sorcerer): 100/80 -> r (Rogue): 85/100 -> s (Sorcerer): 100/80
+    >>> s.get_sp()
+    80
+    >>> r.get_hp()
+    85
+    """
+    __slots__ = ()
+
 
+# The Skill for each action of each character spec, shared by every
+# character of that type in live play and in search.
+SKILL_TABLE: Dict[str, Dict[str, SpecSkill]] = {
+    character_type: {action: make_skill(name)
+                     for action, name in spec['skills'].items()}
+    for character_type, spec in SPECS['characters'].items()}
 
 if __name__ == '__main__':
     import python_ta
@@ -16,7 +16,8 @@ import unittest
 # Import the student solution
 from a2_game import CHARACTER_CLASSES
 from a2_playstyle import ManualPlaystyle
-from a2_battle_queue import BattleQueue
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue, \
+    PersistentBattleQueue
 from a2_skill_decision_tree import create_default_tree
 SorcererConstructor = CHARACTER_CLASSES['s']
 
@@ -341,5 +342,43 @@ class SorcererUnitTests(unittest.TestCase):
                               ", ".join(expected_sprites), 
                               ", ".join(obtained_sprites)))
 
+    def test_special_attack_clears_every_queue(self):
+        """
+        Test to make sure the special attack leaves every kind of battle
+        queue as removing its characters one at a time would.
+        """
+        for queue_class in [BattleQueue, RestrictedBattleQueue,
+                            PersistentBattleQueue]:
+            battle_queues = []
+            for _ in range(2):
+                battle_queue = queue_class()
+                playstyle = ManualPlaystyle(battle_queue)
+                p1 = SorcererConstructor("P1", battle_queue, playstyle)
+                p2 = SorcererConstructor("P2", battle_queue, playstyle)
+                p1.enemy = p2
+                p2.enemy = p1
+                for character in [p1, p2, p2, p1, p1, p2, p1]:
+                    battle_queue.add(character)
+                battle_queues.append(battle_queue)
+
+            cleared, removed = battle_queues
+
+            def remove_all():
+                """
+                Remove the characters in removed one at a time.
+                """
+                while not removed.is_empty():
+                    removed.remove()
+            removed.clear = remove_all
+
+            cleared.peek().special_attack()
+            removed.peek().special_attack()
+
+            self.assertEqual(removed.snapshot(), cleared.snapshot(),
+                             "The special attack on a {} should leave "
+                             "{} but left {}".format(queue_class.__name__,
+                                                      removed, cleared))
+            self.assertEqual(removed.get_winner(), cleared.get_winner())
+
 if __name__ == "__main__":
     unittest.main(exit = False)
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""
+The character and skill specs for A2.
+
+A spec describes a character or skill as data instead of code: a skill's SP
+cost, damage and the effects it has once the damage is dealt, and a
+character's defense and the skill it uses for each action. The specs for
+every character are loaded from a2_specs.json, and a2_skills compiles them
+into the Skills that both live play and search use.
+
+Each skill spec has:
+    cost - the SP the skill costs.
+    damage - the damage the skill deals, before the target's defense.
+    tree_damage - optional, whether the damage is that of the skill picked
+                  by the caster's skill decision tree instead.
+    effects - the effects the skill has, in order, after the caster pays
+              for it and the damage is dealt. Each is one of EFFECT_NAMES:
+              'add_caster' and 'add_target' add the caster or target to the
+              BattleQueue, 'clear' empties it, and 'lifesteal' heals the
+              caster by the damage the target took, or by the HP the target
+              had left if it fell.
+
+Each character spec has:
+    defense - the character's defense.
+    skills - the name of the skill spec for each of the actions in ACTIONS.
+"""
+import json
+import os
+from typing import Any, Dict
+
+ACTIONS = ('A', 'S')
+EFFECT_NAMES = ('add_caster', 'add_target', 'clear', 'lifesteal')
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'a2_specs.json')
+
+
+def load_specs(path: str = SPEC_PATH) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the specs in the JSON file at path, as a dict with the skill
+    specs under 'skills' and the character specs under 'characters', both
+    keyed by name.
+
+    Raise a ValueError if a spec is missing a field, has a field of the
+    wrong type, or names an effect or skill that doesn't exist.
+
+    >>> specs = load_specs()
+    >>> specs['characters']['mage']['skills']['S']
+    'MageSpecial'
+    >>> specs['skills']['MageSpecial']['effects']
+    ['add_target', 'add_caster']
+    """
+    with open(path) as f:
+        specs = json.load(f)
+    check_specs(specs)
+    return specs
+
+
+def check_specs(specs: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Raise a ValueError if specs, as returned by load_specs, aren't valid.
+
+    >>> check_specs({'skills': {'Kick': {'cost': 1, 'damage': 5,
+    ...                                  'effects': ['add_caster']}},
+    ...              'characters': {'monk': {'defense': 2,
+    ...                                      'skills': {'A': 'Kick',
+    ...                                                 'S': 'Kick'}}}})
+    >>> check_specs({'skills': {'Kick': {'cost': 1, 'damage': 5,
+    ...                                  'effects': ['jump']}},
+    ...              'characters': {}})
+    Traceback (most recent call last):
+    ...
+    ValueError: skill Kick has unknown effect 'jump'
+    """
+    skills = specs.get('skills', {})
+    for name, spec in skills.items():
+        for field in ['cost', 'damage']:
+            if not isinstance(spec.get(field), int):
+                raise ValueError("skill {} needs an int {}".format(name, field))
+        if not isinstance(spec.get('tree_damage', False), bool):
+            raise ValueError("skill {} needs a bool tree_damage".format(name))
+        if not isinstance(spec.get('effects'), list):
+            raise ValueError("skill {} needs a list of effects".format(name))
+        for effect in spec['effects']:
+            if effect not in EFFECT_NAMES:
+                raise ValueError("skill {} has unknown effect {!r}"
+                                 .format(name, effect))
+
+    for name, spec in specs.get('characters', {}).items():
+        if not isinstance(spec.get('defense'), int):
+            raise ValueError("character {} needs an int defense".format(name))
+        if sorted(spec.get('skills', {})) != sorted(ACTIONS):
+            raise ValueError("character {} needs a skill for each of {}"
+                             .format(name, ACTIONS))
+        for skill in spec['skills'].values():
+            if skill not in skills:
+                raise ValueError("character {} has unknown skill {!r}"
+                                 .format(name, skill))
+
+
+SPECS = load_specs()
+
+
+if __name__ == '__main__':
+    import python_ta
+    python_ta.check_all(config='a2_pyta.txt')
@@ -0,0 +1,149 @@
+"""
+Unittests for the character and skill specs in A2.
+
+These tests check that the specs load and are checked, that characters made
+from the specs alone play exactly like the characters of A2, and that the
+skills are shared through SKILL_TABLE.
+"""
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import ManualPlaystyle, get_state_score
+from a2_battle_queue import BattleQueue, RestrictedBattleQueue, \
+    PersistentBattleQueue
+from a2_characters import make_character_class
+from a2_skills import SKILL_TABLE, SpecSkill, MageAttack, VampireSpecial
+from a2_skill_decision_tree import create_default_tree
+from a2_specs import SPEC_PATH, load_specs
+
+QUEUE_CLASSES = [BattleQueue, RestrictedBattleQueue, PersistentBattleQueue]
+SPEC_TYPES = {'m': 'mage', 'r': 'rogue', 'v': 'vampire', 's': 'sorcerer'}
+
+
+def set_up_matchup(p1_class, p2_class, queue_class=BattleQueue):
+    """
+    Return a Battle Queue holding a new character of class p1_class followed
+    by a new character of class p2_class.
+    """
+    battle_queue = queue_class()
+    playstyle = ManualPlaystyle(battle_queue)
+    p1 = p1_class("P1", battle_queue, playstyle)
+    p2 = p2_class("P2", battle_queue, playstyle)
+    for character in [p1, p2]:
+        if hasattr(character, 'tree'):
+            character.set_skill_decision_tree(create_default_tree())
+    p1.enemy = p2
+    p2.enemy = p1
+    battle_queue.add(p1)
+    battle_queue.add(p2)
+    return battle_queue
+
+
+class SpecUnitTests(unittest.TestCase):
+    def test_specs_match_characters(self):
+        """
+        Test to make sure every character's defense and skills are the ones
+        in its spec.
+        """
+        specs = load_specs()
+        for key, spec_type in SPEC_TYPES.items():
+            character = set_up_matchup(CHARACTER_CLASSES[key],
+                                       CHARACTER_CLASSES['m']).peek()
+            spec = specs['characters'][spec_type]
+            self.assertEqual(spec['defense'], character.get_defense())
+            for action, name in spec['skills'].items():
+                skill = character.get_skill(action)
+                self.assertIs(SKILL_TABLE[spec_type][action], skill)
+                self.assertEqual(name, type(skill).__name__)
+                self.assertEqual(specs['skills'][name]['cost'],
+                                 skill.get_sp_cost())
+
+    def test_bad_specs_are_rejected(self):
+        """
+        Test to make sure load_specs raises a ValueError for specs with a
+        missing field, an unknown effect or an unknown skill.
+        """
+        with open(SPEC_PATH) as f:
+            good = json.load(f)
+        bad_specs = []
+        for change in [lambda specs: specs['skills']['MageAttack']
+                       .pop('cost'),
+                       lambda specs: specs['skills']['MageAttack']['effects']
+                       .append('teleport'),
+                       lambda specs: specs['characters']['mage']['skills']
+                       .update({'S': 'Fireball'}),
+                       lambda specs: specs['characters']['rogue']['skills']
+                       .pop('A')]:
+            specs = json.loads(json.dumps(good))
+            change(specs)
+            bad_specs.append(specs)
+
+        directory = tempfile.mkdtemp()
+        for i, specs in enumerate(bad_specs):
+            path = os.path.join(directory, '{}.json'.format(i))
+            with open(path, 'w') as f:
+                json.dump(specs, f)
+            with self.assertRaises(ValueError):
+                load_specs(path)
+
+    def test_spec_characters_play_like_characters(self):
+        """
+        Test to make sure characters made from their specs alone by
+        make_character_class play random games and score like the characters
+        of A2.
+        """
+        spec_classes = {key: make_character_class(spec_type)
+                        for key, spec_type in SPEC_TYPES.items()}
+        rng = random.Random(49)
+        for queue_class in QUEUE_CLASSES:
+            for _ in range(50):
+                keys = rng.choice('mrvs'), rng.choice('mrvs')
+                expected = set_up_matchup(CHARACTER_CLASSES[keys[0]],
+                                          CHARACTER_CLASSES[keys[1]],
+                                          queue_class)
+                actual = set_up_matchup(spec_classes[keys[0]],
+                                        spec_classes[keys[1]], queue_class)
+                while not expected.is_over():
+                    self.assertFalse(actual.is_over())
+                    self.assertEqual(repr(expected), repr(actual))
+                    move = rng.choice(expected.peek().get_available_actions())
+                    for battle_queue in [expected, actual]:
+                        if move == 'A':
+                            battle_queue.remove().attack()
+                        else:
+                            battle_queue.remove().special_attack()
+                self.assertTrue(actual.is_over())
+                self.assertEqual(expected.snapshot(), actual.snapshot())
+
+        for keys in [('v', 'r'), ('s', 'm')]:
+            expected = set_up_matchup(CHARACTER_CLASSES[keys[0]],
+                                      CHARACTER_CLASSES[keys[1]])
+            actual = set_up_matchup(spec_classes[keys[0]],
+                                    spec_classes[keys[1]])
+            for battle_queue in [expected, actual]:
+                battle_queue.peek().set_sp(40)
+                battle_queue.peek().enemy.set_sp(40)
+            self.assertEqual(get_state_score(expected),
+                             get_state_score(actual))
+
+    def test_generic_skills(self):
+        """
+        Test to make sure a SpecSkill made from a spec's name alone has the
+        spec's cost, damage and effects, and is shared.
+        """
+        skill = SpecSkill('VampireSpecial')
+        self.assertIsNot(VampireSpecial(), skill)
+        self.assertIs(SpecSkill('VampireSpecial'), skill)
+        self.assertEqual((20, 30), (skill.get_sp_cost(), skill.get_damage()))
+        self.assertEqual(VampireSpecial().get_effects(), skill.get_effects())
+        self.assertTrue(skill.has_lifesteal())
+        self.assertFalse(MageAttack().has_lifesteal())
+        self.assertTrue(SKILL_TABLE['sorcerer']['A'].uses_tree())
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
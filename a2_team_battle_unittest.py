@@ -0,0 +1,212 @@
+"""
+Unittests for the TeamBattleQueue in A2.
+
+These tests check that team battles play by the rules of a BattleQueue, that
+every character attacks the first character of the other team with HP left,
+and that a battle ends once a team has fallen.
+"""
+import random
+import unittest
+
+from a2_game import CHARACTER_CLASSES
+from a2_playstyle import ManualPlaystyle, get_state_score, \
+    get_state_score_iterative, search_mtdf
+from a2_battle_queue import BattleQueue, TeamBattleQueue, MAX_TEAM_SIZE
+from a2_skill_decision_tree import create_default_tree
+
+
+def set_up_teams(keys_1, keys_2, battle_queue=None):
+    """
+    Return a TeamBattleQueue for a battle between a team with a new character
+    of each class in keys_1 and a team with a new character of each class in
+    keys_2, as keyed in CHARACTER_CLASSES.
+    """
+    if battle_queue is None:
+        battle_queue = TeamBattleQueue()
+    playstyle = ManualPlaystyle(battle_queue)
+    teams = []
+    for team, keys in enumerate([keys_1, keys_2]):
+        teams.append([])
+        for i, key in enumerate(keys):
+            character = CHARACTER_CLASSES[key]("P{}.{}".format(team + 1, i),
+                                               battle_queue, playstyle)
+            if key == 's':
+                character.set_skill_decision_tree(create_default_tree())
+            teams[-1].append(character)
+    battle_queue.set_teams(teams[0], teams[1])
+    return battle_queue
+
+
+def play(battle_queue, rng):
+    """
+    Make the next character in battle_queue use a random available action.
+    """
+    character = battle_queue.remove()
+    if rng.choice(character.get_available_actions()) == 'A':
+        character.attack()
+    else:
+        character.special_attack()
+
+
+def get_side(character):
+    """
+    Return the team of character, as named by set_up_teams.
+    """
+    return character.get_name().split('.')[0]
+
+
+def find_team_score(battle_queue):
+    """
+    Return the score the team of the next character in battle_queue can
+    guarantee, as described in get_state_score, by searching every move and
+    telling the teams apart by name.
+    """
+    if battle_queue.is_over():
+        winner = battle_queue.get_winner()
+        if winner is None:
+            return 0
+        if get_side(winner) == get_side(battle_queue.peek()):
+            return winner.get_hp()
+        return -winner.get_hp()
+    scores = []
+    for move in battle_queue.peek().get_available_actions():
+        child = battle_queue.copy()
+        character = child.remove()
+        if move == 'A':
+            character.attack()
+        else:
+            character.special_attack()
+        sign = 1 if get_side(character) == get_side(child.peek()) else -1
+        scores.append(find_team_score(child) * sign)
+    return max(scores)
+
+
+class TeamBattleQueueUnitTests(unittest.TestCase):
+    def test_one_on_one_plays_like_battle_queue(self):
+        """
+        Test to make sure a battle between two teams of one plays out exactly
+        like the same game in a BattleQueue.
+        """
+        rng = random.Random(43)
+        for _ in range(100):
+            keys = rng.choice('mrvs'), rng.choice('mrvs')
+            actual = set_up_teams(keys[0], keys[1])
+            expected = BattleQueue()
+            p1, p2 = [character.copy(expected)
+                      for team in actual.get_teams() for character in team]
+            p1.enemy = p2
+            p2.enemy = p1
+            expected.add(p1)
+            expected.add(p2)
+
+            seed = rng.random()
+            expected_rng, actual_rng = random.Random(seed), random.Random(seed)
+            while not expected.is_over():
+                self.assertFalse(actual.is_over())
+                self.assertEqual(expected.snapshot(), actual.snapshot())
+                play(expected, expected_rng)
+                play(actual, actual_rng)
+            self.assertTrue(actual.is_over())
+            # A character with no HP left is out of a team battle for good,
+            # so only the characters have to match once the game is over.
+            self.assertEqual(expected.snapshot()[:2], actual.snapshot()[:2])
+            winner = expected.get_winner()
+            self.assertEqual(None if winner is None else winner.get_name(),
+                             None if actual.get_winner() is None else
+                             actual.get_winner().get_name())
+
+    def test_large_teams(self):
+        """
+        Test to make sure every character in random battles between full
+        teams has HP left and attacks the first character of the other team
+        with HP left, and that the battle ends once a team has fallen.
+        """
+        rng = random.Random(16)
+        for _ in range(20):
+            battle_queue = set_up_teams(
+                [rng.choice('mrvs') for _ in range(MAX_TEAM_SIZE)],
+                [rng.choice('mrvs') for _ in range(MAX_TEAM_SIZE)])
+            teams = battle_queue.get_teams()
+            while not battle_queue.is_over():
+                character = battle_queue.peek()
+                self.assertGreater(character.get_hp(), 0)
+                other_team = teams[1] if character in teams[0] else teams[0]
+                living = [other for other in other_team if other.get_hp() > 0]
+                self.assertIs(living[0], character.enemy)
+                play(battle_queue, rng)
+
+            fallen = [all(character.get_hp() == 0 for character in team)
+                      for team in teams]
+            winner = battle_queue.get_winner()
+            if fallen == [False, True] or fallen == [True, False]:
+                winning_team = teams[fallen.index(False)]
+                self.assertIn(winner, winning_team)
+            else:
+                self.assertIsNone(winner)
+
+    def test_copy(self):
+        """
+        Test to make sure a copy of a TeamBattleQueue plays on without
+        changing the original.
+        """
+        rng = random.Random(8)
+        battle_queue = set_up_teams('mrvs', 'svrm')
+        for _ in range(5):
+            play(battle_queue, rng)
+        expected = battle_queue.snapshot()
+        new_battle_queue = battle_queue.copy()
+        self.assertEqual(expected, new_battle_queue.snapshot())
+        while not new_battle_queue.is_over():
+            play(new_battle_queue, rng)
+        self.assertEqual(expected, battle_queue.snapshot(),
+                         "Playing on a copy should not change the original.")
+
+    def test_teammate_win_scores_for_team(self):
+        """
+        Test to make sure the searches score a win by a teammate as a win,
+        both in a game a teammate wins next move and in random small games.
+        """
+        battle_queue = set_up_teams('mm', 'mm')
+        others = battle_queue.get_teams()[1]
+        battle_queue.remove()
+        battle_queue.remove()
+        others[0].set_hp(0)
+        others[1].set_hp(3)
+        for actual in [get_state_score(battle_queue),
+                       get_state_score_iterative(battle_queue),
+                       search_mtdf(battle_queue)[0]]:
+            self.assertEqual(100, actual,
+                             "P1.1 kills P2's last character, so P1.0 wins "
+                             "with 100 HP.")
+
+        rng = random.Random(43)
+        for _ in range(100):
+            keys = [rng.choice('mrvs') + rng.choice('mrvs') for _ in range(2)]
+            battle_queue = set_up_teams(*keys)
+            for team in battle_queue.get_teams():
+                for character in team:
+                    character.set_hp(rng.randint(0, 30))
+                    character.set_sp(rng.randint(0, 40))
+            for _ in range(rng.randint(0, 3)):
+                if not battle_queue.is_over():
+                    battle_queue.remove()
+            if battle_queue.is_over():
+                continue
+            expected = find_team_score(battle_queue)
+            for actual in [get_state_score(battle_queue),
+                           get_state_score_iterative(battle_queue),
+                           search_mtdf(battle_queue)[0]]:
+                self.assertEqual(expected, actual,
+                                 "Scoring:\n{}".format(battle_queue))
+
+    def test_team_size(self):
+        """
+        Test to make sure teams must have 1 to MAX_TEAM_SIZE characters.
+        """
+        for keys in ['', 'm' * (MAX_TEAM_SIZE + 1)]:
+            with self.assertRaises(ValueError):
+                set_up_teams(keys, 'r')
+
+
+if __name__ == "__main__":
+    unittest.main(exit=False)
@@ -138,6 +138,7 @@ if __name__ == '__main__':
     
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                a2_game.end_game()
                 pygame.quit()
                 sys.exit(0)
             if event.type == pygame.KEYDOWN and not a2_game.GAME_IS_OVER:
@@ -95,6 +95,7 @@ if __name__ == '__main__':
                     update_game()
                 
                 if k == 'Q':
+                    a2_game.end_game()
                     break
         else:
             prompt = ("Select an action (U: Update Display, Q: Quit Game): ")
@@ -103,4 +104,5 @@ if __name__ == '__main__':
             if k == 'U':
                 update_game()
             if k == 'Q':
+                a2_game.end_game()
                 break
@@ -1,11 +1,13 @@
 """
 The ADTs implemented from lecture.
 
-This includes the Stack, Queue, and an abstract parent class (Container)
+This includes the Stack, Queue, and an abstract parent class (Container),
+and a PersistentQueue whose versions share their structure.
 
 REMINDER: NEVER USE THE NAME stack.py OR queue.py FOR YOUR FILES.
           PythonTA will break. :(
 """
+from typing import Iterator, Tuple, Union
 
 
 class Container:
@@ -142,6 +144,135 @@ class Queue(Container):
         return self._content == []
 
 
+class PersistentQueue:
+    """
+    An immutable first-in first-out queue. add and remove return a new
+    PersistentQueue and leave this one as it was, so copying a
+    PersistentQueue is free and its versions share their entries.
+
+    The entries are kept in two linked lists: the front in order, as
+    (value, rest) pairs, and the back in reverse, as [value, rest, reversed]
+    lists. The back is reversed onto the front only once the front runs out,
+    and the reversed front is remembered in the back's first node, so every
+    version sharing that back, like the copies of one version that each
+    remove from it, reverses it only once. A version that adds to a shared
+    back makes a new back, which is reversed again, so remove is O(1)
+    amortized along one line of versions, but can take O(n) time on each of
+    many versions branching off the same one.
+
+    _front - the first entries of this PersistentQueue, in order
+    _back - the last entries of this PersistentQueue, in reverse order
+    _length - the number of entries in this PersistentQueue
+    """
+    _front: Union[None, tuple]
+    _back: Union[None, list]
+    _length: int
+
+    def __init__(self, front: Union[None, tuple] = None,
+                 back: Union[None, list] = None, length: int = 0) -> None:
+        """
+        Initialize this PersistentQueue with the linked lists front and back,
+        holding length entries between them. Only the front is empty if the
+        whole PersistentQueue is.
+
+        >>> q = PersistentQueue()
+        >>> q.is_empty()
+        True
+        >>> q = q.add(1).add(2).add(3)
+        >>> q.remove()[1]._front is q.remove()[1]._front
+        True
+        """
+        if front is None and back is not None:
+            if back[2] is None:
+                node = back
+                while node is not None:
+                    front = (node[0], front)
+                    node = node[1]
+                back[2] = front
+            front = back[2]
+            back = None
+        self._front = front
+        self._back = back
+        self._length = length
+
+    def add(self, value: object) -> 'PersistentQueue':
+        """
+        Return this PersistentQueue with value added to the back.
+
+        >>> q = PersistentQueue().add(5)
+        >>> q2 = q.add("A")
+        >>> list(q)
+        [5]
+        >>> list(q2)
+        [5, 'A']
+        """
+        return PersistentQueue(self._front, [value, self._back, None],
+                               self._length + 1)
+
+    def remove(self) -> Tuple[object, 'PersistentQueue']:
+        """
+        Return the value at the front of this PersistentQueue and this
+        PersistentQueue without it.
+
+        >>> q = PersistentQueue().add(5).add("A")
+        >>> value, q2 = q.remove()
+        >>> value
+        5
+        >>> list(q2)
+        ['A']
+        >>> list(q)
+        [5, 'A']
+        """
+        value, front = self._front
+        return value, PersistentQueue(front, self._back, self._length - 1)
+
+    def peek(self) -> object:
+        """
+        Return the value at the front of this PersistentQueue.
+
+        >>> PersistentQueue().add(5).add("A").peek()
+        5
+        """
+        return self._front[0]
+
+    def is_empty(self) -> bool:
+        """
+        Return whether this PersistentQueue is empty or not.
+
+        >>> PersistentQueue().add(5).is_empty()
+        False
+        """
+        return self._front is None
+
+    def __len__(self) -> int:
+        """
+        Return the number of entries in this PersistentQueue.
+
+        >>> len(PersistentQueue().add(5).add("A"))
+        2
+        """
+        return self._length
+
+    def __iter__(self) -> Iterator:
+        """
+        Return an iterator over the entries of this PersistentQueue, from
+        front to back.
+
+        >>> list(PersistentQueue().add(1).add(2).add(3).remove()[1].add(4))
+        [2, 3, 4]
+        """
+        node = self._front
+        while node is not None:
+            yield node[0]
+            node = node[1]
+        back = []
+        node = self._back
+        while node is not None:
+            back.append(node[0])
+            node = node[1]
+        yield from reversed(back)
+
+
 if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config='a2_pyta.txt')